@@ -17,6 +17,27 @@ if "bpy" in locals():
     print("Force reloading the plugin.")
     import importlib
 
+    importlib.reload(pose_array)
+    importlib.reload(icosphere)
+    importlib.reload(render_journal)
+    importlib.reload(farm_protocol)
+    importlib.reload(farm)
+    importlib.reload(multiview)
+    importlib.reload(render_timer)
+    importlib.reload(image_io)
+    importlib.reload(tiles)
+    importlib.reload(encoder)
+    importlib.reload(pack_file)
+    importlib.reload(manifest)
+    importlib.reload(render_session)
+    importlib.reload(planner)
+    importlib.reload(static_frames)
+    importlib.reload(frame_paths)
+    importlib.reload(animation)
+    importlib.reload(lease_board)
+    importlib.reload(leases)
+    importlib.reload(job_manifest)
+    importlib.reload(cli)
     importlib.reload(lightfield)
     importlib.reload(lightfield_plane)
     importlib.reload(lightfield_cuboid)
@@ -25,10 +46,32 @@ if "bpy" in locals():
     importlib.reload(gui)
     importlib.reload(operators)
     importlib.reload(update)
+    importlib.reload(config_writer)
     importlib.reload(config)
     importlib.reload(utils)
 else:
-    from . import lightfield, \
+    from . import pose_array, \
+        icosphere, \
+        render_journal, \
+        farm_protocol, \
+        farm, \
+        multiview, \
+        render_timer, \
+        image_io, \
+        tiles, \
+        encoder, \
+        pack_file, \
+        manifest, \
+        render_session, \
+        planner, \
+        static_frames, \
+        frame_paths, \
+        animation, \
+        lease_board, \
+        leases, \
+        job_manifest, \
+        cli, \
+        lightfield, \
         lightfield_plane, \
         lightfield_cuboid, \
         lightfield_cylinder, \
@@ -36,6 +79,7 @@ else:
         gui, \
         operators, \
         update, \
+        config_writer, \
         config, \
         utils
 
@@ -87,13 +131,13 @@ classes = (
     operators.LIGHTFIELD_OT_move,
     operators.LIGHTFIELD_OT_delete_override,
     operators.LIGHTFIELD_OT_update,
-    operators.LIGHTFIELD_OT_update_size,
     operators.LIGHTFIELD_OT_update_camera,
     operators.LIGHTFIELD_OT_update_preview,
     operators.LIGHTFIELD_OT_render,
     operators.OBJECT_OT_lightfield_delete,
     config.EXPORT_OT_lightfield_config,
     config.EXPORT_OT_lightfield_config_append,
+    config.EXPORT_OT_lightfield_config_finish,
 )
 
 # Handler for keeping lightfield list in sync with active selection.
@@ -106,21 +150,10 @@ def load_handler(temp):
                              args=(),
                              notify=update.notify_active_object)
 
-# Needed for updating the size correctly (no recursion).
+# Loading a file and undo reallocate the objects the lightfield lookup refers to.
 @bpy.app.handlers.persistent
-def update_depsgraph(scene):
-    # Get the dependency graph.
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-    # Check if there is an object that was updated
-    if depsgraph.id_type_updated('OBJECT'):
-        # Check if it was the lightfield
-        lf = utils.get_active_lightfield(bpy.context)
-        if (lf is not None) and (
-                lf.obj_empty.evaluated_get(depsgraph) in [_update.id for _update in depsgraph.updates]):
-            # Update the lightfield.
-            bpy.app.handlers.depsgraph_update_post.remove(update_depsgraph)
-            update.update_size()
-            bpy.app.handlers.depsgraph_update_post.append(update_depsgraph)
+def rebuild_lookup_handler(temp):
+    utils.rebuild_lightfield_indices()
 
 # Register all classes + the collection property for storing lightfields
 def register():
@@ -138,7 +171,46 @@ def register():
     bpy.types.Scene.lightfield_dryrun = bpy.props.BoolProperty(default=False,
             description="Dry-run the render, producing config and directories without actual renders.")
     bpy.types.Scene.lightfield_donotoverwrite = bpy.props.BoolProperty(default=False,
-            description="Do not render views corresponding existing files.")
+            description="Do not render views that were completely written by a previous render.")
+    bpy.types.Scene.lightfield_render_mode = bpy.props.EnumProperty(
+            items=[
+                ('LOCAL', "Local", "Render all views one by one in this Blender instance"),
+                ('FARM', "Local Farm", "Render the views in parallel in background Blender processes"),
+                ('MULTIVIEW', "Multi-View Batches",
+                 "Render batches of views in a single render job, using Blender multi-view"),
+                ('DISTRIBUTED', "Distributed",
+                 "Render together with other Blender instances writing to the same output directory"),
+            ],
+            default='LOCAL',
+            description="How the views of the light field are rendered")
+    bpy.types.Scene.lightfield_farm_workers = bpy.props.IntProperty(default=2, min=1, max=256,
+            description="Number of background Blender processes rendering views")
+    bpy.types.Scene.lightfield_farm_threads = bpy.props.IntProperty(default=0, min=0, max=1024,
+            description="Render threads per background process (0 for automatic)")
+    bpy.types.Scene.lightfield_farm_chunk_size = bpy.props.IntProperty(default=8, min=1,
+            description="Number of views handed to a background process at once")
+    bpy.types.Scene.lightfield_farm_whole_frames = bpy.props.BoolProperty(default=False,
+            description="Hand whole frames of a sequence to the background processes, "
+                        "each writing the config of its frames")
+    bpy.types.Scene.lightfield_lease_views = bpy.props.IntProperty(default=8, min=1,
+            description="Number of views a Blender instance claims at once in distributed mode")
+    bpy.types.Scene.lightfield_lease_seconds = bpy.props.IntProperty(default=300, min=10,
+            description="Seconds after which the views claimed by a Blender instance that stopped "
+                        "responding are rendered by another one")
+    bpy.types.Scene.lightfield_batch_size = bpy.props.IntProperty(default=16, min=1, max=1024,
+            description="Number of views rendered in a single multi-view render job")
+    bpy.types.Scene.lightfield_view_major = bpy.props.BoolProperty(default=False,
+            description="Render sequences view by view, rendering all frames of a view in one animation job")
+    bpy.types.Scene.lightfield_skip_static = bpy.props.BoolProperty(default=False,
+            description="Reuse the images of the previous frame of a sequence when nothing in the scene changed, "
+                        "instead of rendering the frame again")
+    bpy.types.Scene.lightfield_persistent_data = bpy.props.BoolProperty(default=True,
+            description="Keep the render data in memory between the views of a light field render, "
+                        "so the scene is only synchronized once")
+    bpy.types.Scene.lightfield_async_encoding = bpy.props.BoolProperty(default=False,
+            description="Compress and write images in background threads while the next view renders")
+    bpy.types.Scene.lightfield_encode_threads = bpy.props.IntProperty(default=2, min=1, max=64,
+            description="Number of threads compressing and writing images")
 
     # Menus
     bpy.types.VIEW3D_MT_add.append(gui.add_lightfield)
@@ -146,18 +218,21 @@ def register():
     # Handlers
     # Handler for active object
     bpy.app.handlers.load_post.append(load_handler)
-    # Handler for scaling.
-    # Don't use for now.
-    # bpy.app.handlers.depsgraph_update_post.append(update_depsgraph)
+    # Handlers for the lookup from empties to lightfields
+    bpy.app.handlers.load_post.append(rebuild_lookup_handler)
+    bpy.app.handlers.undo_post.append(rebuild_lookup_handler)
+    bpy.app.handlers.redo_post.append(rebuild_lookup_handler)
 
 
 # Unregister all classes + the collection property for storing lightfields
 # This is done in reverse to 'pop the register stack'.
 def unregister():
     # Handlers
-    # Don't use scaling for now
-    # bpy.app.handlers.depsgraph_update_post.remove(update_depsgraph)
     bpy.app.handlers.load_post.remove(load_handler)
+    bpy.app.handlers.load_post.remove(rebuild_lookup_handler)
+    bpy.app.handlers.undo_post.remove(rebuild_lookup_handler)
+    bpy.app.handlers.redo_post.remove(rebuild_lookup_handler)
+    update.cancel_rebuilds()
 
     # Unsubscribe from all possible subscriptions
     bpy.msgbus.clear_by_owner(bpy.types.Scene.lightfield_index)
@@ -171,6 +246,19 @@ def unregister():
     del bpy.types.Scene.lightfield_autoselect
     del bpy.types.Scene.lightfield_dryrun
     del bpy.types.Scene.lightfield_donotoverwrite
+    del bpy.types.Scene.lightfield_render_mode
+    del bpy.types.Scene.lightfield_farm_workers
+    del bpy.types.Scene.lightfield_farm_threads
+    del bpy.types.Scene.lightfield_farm_chunk_size
+    del bpy.types.Scene.lightfield_farm_whole_frames
+    del bpy.types.Scene.lightfield_lease_views
+    del bpy.types.Scene.lightfield_lease_seconds
+    del bpy.types.Scene.lightfield_batch_size
+    del bpy.types.Scene.lightfield_view_major
+    del bpy.types.Scene.lightfield_skip_static
+    del bpy.types.Scene.lightfield_persistent_data
+    del bpy.types.Scene.lightfield_async_encoding
+    del bpy.types.Scene.lightfield_encode_threads
 
     # Unregister classes
     for cls in reversed(classes):
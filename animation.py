@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import time
+
+import bpy
+from . import frame_paths, render_session
+
+
+class ViewAnimation:
+    """
+    Render a light field sequence view by view: the camera is fixed at one pose and
+    the whole frame range is rendered as one animation job, instead of a still per frame.
+
+    Blender writes every frame to a .part file numbered by frame in a temporary directory
+    next to the frames; the render_write handler moves it to the image directory of its
+    frame under the name of the view and books it, so an interrupted animation never
+    leaves a partial image behind.
+    """
+
+    def __init__(self, lf, extension):
+        self.lf = lf
+        self.extension = extension
+        self.frames = lf.get_frame_numbers()
+        self.sessions = {}
+        self.index = None
+        self.name = None
+        self.write_time = None
+        self.temporary_directory = None
+
+    def start(self):
+        # On the file system of the frames, so the images are moved without copying.
+        self.temporary_directory = tempfile.mkdtemp(prefix=".view_animation_",
+                                                    dir=self.sessions[self.frames[0]].output_directory)
+        bpy.app.handlers.render_write.append(self.on_render_write)
+
+    def stop(self):
+        bpy.app.handlers.render_write.remove(self.on_render_write)
+        shutil.rmtree(self.temporary_directory, ignore_errors=True)
+
+    def on_render_write(self, scene, *args):
+        frame = scene.frame_current
+        partial_filepath = scene.render.frame_path(frame=frame)
+        filepath = frame_paths.image_filepath(self.sessions[frame].image_directory, self.name, self.extension)
+        os.replace(partial_filepath, filepath)
+        now = time.perf_counter()
+        self.lf.store_image(self.name, filepath, now - self.write_time, self.sessions[frame].record(self.index), frame)
+        self.write_time = now
+
+    def prepare(self):
+        """
+        Compute the world poses of all views at every frame, evaluating the scene once per frame.
+
+        :return: Nothing.
+        """
+        scene = bpy.context.scene
+        for frame in self.frames:
+            scene.frame_set(frame)
+            session = render_session.RenderSession(self.lf, frame)
+            session.update_poses()
+            os.makedirs(session.image_directory, exist_ok=True)
+            self.sessions[frame] = session
+
+    def render(self, i):
+        """
+        Render the i-th view at all frames that are not done yet, in one animation job.
+
+        :return: Nothing.
+        """
+        lf = self.lf
+        scene = bpy.context.scene
+        poses = self.sessions[self.frames[0]].poses
+        self.index = i
+        self.name = poses.name(i)
+        frames = [frame for frame in self.frames
+                  if not (scene.lightfield_donotoverwrite and lf.is_image_done(self.name, frame))]
+        if not frames:
+            print("View %s already rendered at all frames. Skipping." % self.name)
+            return
+
+        # The camera follows the lightfield through the animation.
+        lf.set_camera(poses.camera_position(i))
+        # Frames of the range that were already rendered are rendered again.
+        scene.frame_start = frames[0]
+        scene.frame_end = frames[-1]
+        scene.render.filepath = frame_paths.partial_filepath(self.temporary_directory, self.name, self.extension)
+        print("Rendering %s at frames %d to %d..." % (self.name, frames[0], frames[-1]))
+        self.write_time = time.perf_counter()
+        bpy.ops.render.render(animation=True)
+
+    def finish(self, num_views):
+        """
+        Write the config of every frame with the first views.
+
+        :param num_views: Number of views that were rendered.
+        :return: Nothing.
+        """
+        for session in self.sessions.values():
+            session.begin()
+            session.world = tuple(array[:num_views] for array in session.world)
+            session.finish(all_poses=True)
+
+
+def render_view_major(lf, extension):
+    """
+    Render a light field sequence with one animation job per view, see ViewAnimation.
+
+    :param lf: Lightfield to render.
+    :param extension: File extension of the images.
+    :return: Nothing.
+    """
+    scene = bpy.context.scene
+    old_frame_range = scene.frame_start, scene.frame_end, scene.frame_step
+    old_frame = scene.frame_current
+
+    animation = ViewAnimation(lf, extension)
+    animation.prepare()
+    scene.frame_step = lf.sequence_steps
+    num_views = len(lf.pose_table())
+    done = 0
+    animation.start()
+    try:
+        for i in range(num_views):
+            animation.render(i)
+            done = i + 1
+    finally:
+        animation.stop()
+        # Configs hold the views rendered so far, also when the render was interrupted.
+        animation.finish(done)
+        scene.frame_start, scene.frame_end, scene.frame_step = old_frame_range
+        scene.frame_set(old_frame)
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import time
+
+import bpy
+from . import encoder, farm_protocol, job_manifest, leases, pack_file, render_journal, render_session
+
+# Exit codes of a render job.
+EXIT_OK = 0        # all views of the job are on disk
+EXIT_FAILED = 1    # some views could not be rendered
+EXIT_INVALID = 2   # the job manifest is invalid or refers to a lightfield that does not exist
+
+def apply_overrides(lf, job):
+    """
+    Change the scene and the lightfield as asked by the job. The scene file is not saved.
+
+    :return: Nothing.
+    """
+    scene = bpy.context.scene
+    if job.get('output'):
+        lf.output_directory = os.path.abspath(job['output'])
+    else:
+        # Relative output paths resolve against the scene file.
+        lf.output_directory = os.path.abspath(bpy.path.abspath(lf.output_directory))
+    if job.get('resolution'):
+        lf.res_x, lf.res_y = job['resolution']
+    if job.get('samples'):
+        if scene.render.engine == 'CYCLES':
+            scene.cycles.samples = job['samples']
+        elif hasattr(scene, 'eevee'):
+            scene.eevee.taa_render_samples = job['samples']
+    if 'skip_existing' in job:
+        scene.lightfield_donotoverwrite = bool(job['skip_existing'])
+    # Jobs of the same frame run side by side, only a single process may write a pack.
+    lf.pack_output = False
+
+
+def render_job_frame(lf, frame, indices, write_config, extension):
+    """
+    Render the selected views of a frame.
+
+    :param lf: Lightfield of the job.
+    :param frame: Frame number.
+    :param indices: Indices of the views to render.
+    :param write_config: Write the config of the frame with the poses of all views.
+    :param extension: File extension of the images.
+    :return: Result of the frame.
+    """
+    scene = bpy.context.scene
+    scene.frame_set(frame)
+    session = render_session.RenderSession(lf, frame)
+    if write_config:
+        session.begin()
+    session.update_poses()
+    poses = session.poses
+    os.makedirs(session.image_directory, exist_ok=True)
+
+    views = []
+    for i in indices:
+        name = poses.name(i)
+        view = {
+            'index': i,
+            'name': name,
+            'path': os.path.join(session.image_directory, name + extension),
+        }
+        views.append(view)
+        if scene.lightfield_donotoverwrite and lf.is_image_done(name, frame):
+            view['status'] = 'skipped'
+            continue
+        lf.set_camera(poses.camera_position(i))
+        try:
+            lf.render_image(name, session.image_directory, extension, session.record(i))
+            view['status'] = 'rendered'
+        except Exception as e:
+            print("Could not render view {}: {}".format(name, e))
+            view['status'] = 'failed'
+            view['error'] = str(e)
+
+    # Views are only reported once their images are written.
+    pool = encoder.get_pool()
+    if pool is not None:
+        pool.wait()
+    for view in views:
+        if view['status'] == 'rendered' and not os.path.exists(view['path']):
+            view['status'] = 'failed'
+            view['error'] = "The image was not written"
+    if write_config:
+        session.finish(all_poses=True)
+
+    return {
+        'frame': frame,
+        'num_views': len(poses),
+        'directory': session.output_directory,
+        'config': session.path_json if write_config else None,
+        'views': views,
+    }
+
+
+def run_job(job):
+    """
+    Render the views of a lightfield listed in a job manifest.
+
+    :param job: Dictionary of the job, see job_manifest.load_job().
+    :return: Result summary of the job.
+    """
+    from . import utils
+
+    context = bpy.context
+    scene = context.scene
+    name = job['lightfield']
+    if isinstance(name, int):
+        if not 0 <= name < len(scene.lightfield):
+            raise job_manifest.JobError("There is no lightfield {}".format(name))
+        lf = scene.lightfield[name]
+        lf = (utils.get_lightfield_class(lf.lf_type))(lf)
+    else:
+        lf = utils.get_lightfield_by_name(context, name)
+        if lf is None:
+            raise job_manifest.JobError("There is no lightfield '{}'".format(name))
+
+    frames = job_manifest.select_range(job.get('frames'), lf.get_frame_numbers(), 'frames')
+    indices = job_manifest.select_views(job.get('views'), lf.pose_table())
+    apply_overrides(lf, job)
+
+    render_journal.forget_journals()
+    lf.set_render_properties()
+    scene.render.use_file_extension = False
+    if scene.lightfield_persistent_data:
+        scene.render.use_persistent_data = True
+    extension = lf.get_extension()
+    if scene.lightfield_async_encoding:
+        encoder.open_pool(scene.lightfield_encode_threads, 2 * scene.lightfield_encode_threads)
+
+    start = time.perf_counter()
+    try:
+        if job.get('distributed'):
+            results = leases.render_distributed(lf, frames, scene.lightfield_lease_views,
+                                                scene.lightfield_lease_seconds, extension)
+        else:
+            results = [render_job_frame(lf, frame, indices, bool(job.get('config')), extension) for frame in frames]
+    finally:
+        try:
+            encoder.close_pool()
+        finally:
+            pack_file.close_writers()
+
+    counts = {status: sum(view['status'] == status for result in results for view in result['views'])
+              for status in ('rendered', 'skipped', 'failed')}
+    return dict(lightfield=lf.obj_empty.name,
+                exit_code=EXIT_FAILED if counts['failed'] else EXIT_OK,
+                seconds=time.perf_counter() - start,
+                frames=results,
+                **counts)
+
+
+def write_result(result, path=None):
+    """
+    Report the result of a job: as a message line on stdout, and as a json file if a path is given.
+
+    :return: Nothing.
+    """
+    farm_protocol.send_message('RESULT', json.dumps(result))
+    if path:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = path + ".part"
+        with open(temporary_path, mode='w') as result_file:
+            json.dump(result, result_file, indent=2)
+        os.replace(temporary_path, path)
+
+
+def main(args):
+    """
+    Run a render job from the command line, see lightfield_job.py.
+
+    :param args: Arguments after the '--' of the Blender command line.
+    :return: Exit code.
+    """
+    parser = argparse.ArgumentParser(prog="lightfield_job.py",
+                                     description="Render the views of a lightfield listed in a json job manifest.")
+    parser.add_argument('job', help="Path of the job manifest.")
+    parser.add_argument('--result', help="Path of the json result summary, overrides 'result' of the manifest.")
+    args = parser.parse_args(args)
+
+    result_path = args.result
+    try:
+        job = job_manifest.load_job(args.job)
+        result_path = result_path or job.get('result')
+        result = run_job(job)
+    except job_manifest.JobError as e:
+        print("Lightfield job: {}".format(e))
+        result = {'exit_code': EXIT_INVALID, 'error': str(e)}
+    except Exception as e:
+        # Still report, so the scheduler knows the job ran and failed.
+        print("Lightfield job failed: {}".format(e))
+        result = {'exit_code': EXIT_FAILED, 'error': str(e)}
+    write_result(result, result_path)
+    return result['exit_code']
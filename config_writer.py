@@ -0,0 +1,300 @@
+import csv
+import json
+import os
+
+from . import manifest
+
+# Number of frame records buffered before they are flushed to disk.
+DEFAULT_BATCH_SIZE = 64
+
+# Number of poses converted to records at once when a config is written from arrays.
+ARRAY_BLOCK_SIZE = 4096
+
+# Writers that are currently open, keyed by the path of their json file.
+_open_writers = {}
+
+
+def get_path_frames_file(path_json):
+    """Return the path of the append-only sidecar belonging to a json config file."""
+    return os.path.splitext(path_json)[0] + ".frames.jsonl"
+
+
+def frames_from_arrays(names, positions, rotations, world_matrices):
+    """
+    Generator over frame records of poses given as arrays, converting a block at a time.
+
+    :return: Next frame dictionary.
+    """
+    for start in range(0, len(names), ARRAY_BLOCK_SIZE):
+        stop = start + ARRAY_BLOCK_SIZE
+        for name, position, rotation, world_matrix in zip(names[start:stop],
+                                                          positions[start:stop].tolist(),
+                                                          rotations[start:stop].tolist(),
+                                                          world_matrices[start:stop].tolist()):
+            yield {'name': str(name), 'position': position, 'rotation': rotation, 'world_matrix': world_matrix}
+
+
+def write_atomic(path, write):
+    """
+    Write a file through a temporary file that is renamed over the target,
+    so readers never observe a partially written file.
+
+    :param path: Target path.
+    :param write: Callable receiving the opened temporary file.
+    :return: Nothing.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode='w', newline='') as tmp_file:
+        write(tmp_file)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+    os.replace(tmp_path, path)
+
+
+def remove_file(path):
+    """Remove a file if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def read_frame_records(path_frames):
+    """
+    Read the frame records of a sidecar file.
+    A trailing record that was cut off by a crash is ignored.
+
+    :param path_frames: Path to the sidecar.
+    :return: List of frame dictionaries.
+    """
+    frames = []
+    if not os.path.exists(path_frames):
+        return frames
+    with open(path_frames, mode='r') as frames_file:
+        for line in frames_file:
+            if not line.endswith("\n"):
+                break
+            frames.append(json.loads(line))
+    return frames
+
+
+def read_config(path_json):
+    """
+    Read a json config, including the frames of a render that did not finish.
+
+    :param path_json: Path to lightfield.json.
+    :return: Config dictionary.
+    """
+    with open(path_json, mode='r') as json_file:
+        cfg = json.load(json_file)
+    path_manifest = manifest.get_path_manifest(path_json)
+    if 'manifest' in cfg and os.path.exists(path_manifest):
+        cfg['frames'] = manifest.read_frame_records(path_manifest)
+    cfg['frames'].extend(read_frame_records(get_path_frames_file(path_json)))
+    return cfg
+
+
+class ConfigWriter:
+    """
+    Append-only writer for lightfield.json and lightfield.cfg.
+
+    The header is kept in memory and frame records are appended to a json lines
+    sidecar (and the csv) in batches. On close, lightfield.json and the binary
+    manifest lightfield.npz are written once from the header and the sidecar.
+    Until then, the json file holds the header with an empty frame list and the
+    sidecar holds every flushed pose. The manifest of an earlier config is removed
+    when a new one begins, and is always written after the json, so readers can tell
+    a stale manifest from its modification time.
+    Without frames in the json, the json only holds the header and names the manifest.
+    """
+
+    def __init__(self, path_json, path_csv, batch_size=DEFAULT_BATCH_SIZE, write_frames_json=True):
+        self.path_json = path_json
+        self.path_csv = path_csv
+        self.path_frames = get_path_frames_file(path_json)
+        self.path_manifest = manifest.get_path_manifest(path_json)
+        self.batch_size = batch_size
+        self.write_frames_json = write_frames_json
+
+        self.header = None
+        self.csv_header = None
+        self.previous_frames = []
+        self.pending = []
+        self.frames_file = None
+        self.csv_file = None
+        self.csv_writer = None
+
+    def begin(self, header, csv_rows):
+        """
+        Start a new config, truncating existing files.
+
+        :param header: Json config without frames.
+        :param csv_rows: Header rows of the csv config.
+        :return: Nothing.
+        """
+        self.header = {k: v for k, v in header.items() if k != 'frames'}
+        # The manifest of the previous config would be read instead of the new one.
+        remove_file(self.path_manifest)
+        if not self.write_frames_json:
+            self.header['manifest'] = os.path.basename(self.path_manifest)
+        write_atomic(self.path_json, lambda f: json.dump(dict(self.header, frames=[]), f, indent=2))
+
+        self.csv_header = csv_rows
+        self.frames_file = open(self.path_frames, mode='w')
+        self.csv_file = open(self.path_csv, mode='w', newline='')
+        self.csv_writer = csv.writer(self.csv_file, delimiter=',')
+        self.csv_writer.writerows(csv_rows)
+        self.csv_file.flush()
+
+    def reopen(self):
+        """
+        Continue an existing config, e.g. one that was already finalised.
+
+        :return: Nothing.
+        """
+        with open(self.path_json, mode='r') as json_file:
+            cfg = json.load(json_file)
+        self.previous_frames = cfg.pop('frames')
+        self.header = cfg
+        # Frames of a config without frames in the json are in the manifest.
+        if 'manifest' in cfg:
+            self.write_frames_json = False
+            if os.path.exists(self.path_manifest):
+                self.previous_frames = manifest.read_frame_records(self.path_manifest)
+        else:
+            # The frames are in the json, the manifest is rewritten on close.
+            remove_file(self.path_manifest)
+
+        # The csv header ends with the row naming the frame columns.
+        self.csv_header = []
+        with open(self.path_csv, mode='r', newline='') as csv_file:
+            for row in csv.reader(csv_file, delimiter=','):
+                self.csv_header.append(row)
+                if row[:1] == ["name"]:
+                    break
+
+        self.frames_file = open(self.path_frames, mode='a')
+        self.csv_file = open(self.path_csv, mode='a', newline='')
+        self.csv_writer = csv.writer(self.csv_file, delimiter=',')
+
+    def append(self, name, position, rotation, world_matrix):
+        """
+        Append the pose of a single view.
+
+        :param name: Name of the view.
+        :param position: Location in world space.
+        :param rotation: Euler rotation in world space.
+        :param world_matrix: 4x4 world matrix as nested lists.
+        :return: Nothing.
+        """
+        self.pending.append({
+            'name': name,
+            'position': list(position),
+            'rotation': list(rotation),
+            'world_matrix': world_matrix,
+        })
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all pending records to disk.
+
+        :return: Nothing.
+        """
+        if not self.pending:
+            return
+        self.frames_file.writelines(json.dumps(frame) + "\n" for frame in self.pending)
+        self.csv_writer.writerows([frame['name']] + frame['position'] + frame['rotation']
+                                  for frame in self.pending)
+        self.pending = []
+
+        for f in (self.frames_file, self.csv_file):
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self, poses=None):
+        """
+        Flush and produce the final lightfield.json.
+
+        :param poses: Optional (names, positions, rotations, world matrices) arrays of all views.
+            These are written instead of the recorded frames, without going through the sidecar.
+        :return: Nothing.
+        """
+        self.flush()
+        self.frames_file.close()
+        self.csv_file.close()
+
+        if poses is not None:
+            write_atomic(self.path_json, lambda f: self.write_json(
+                f, frames_from_arrays(*poses) if self.write_frames_json else []))
+            write_atomic(self.path_csv, lambda f: self.write_csv(f, frames_from_arrays(*poses)))
+            manifest.write_manifest_arrays(self.path_manifest, self.header, *poses)
+            os.remove(self.path_frames)
+            return
+
+        # A view that was recorded more than once keeps its last pose, at its first position.
+        frames = {}
+        for frame in self.previous_frames + read_frame_records(self.path_frames):
+            frames[frame['name']] = frame
+        frames = list(frames.values())
+
+        write_atomic(self.path_json, lambda f: self.write_json(f, frames if self.write_frames_json else []))
+        write_atomic(self.path_csv, lambda f: self.write_csv(f, frames))
+        manifest.write_manifest(self.path_manifest, self.header, frames)
+        os.remove(self.path_frames)
+
+    def write_csv(self, csv_file, frames):
+        """Write the csv header and all frames."""
+        writer = csv.writer(csv_file, delimiter=',')
+        writer.writerows(self.csv_header)
+        writer.writerows([frame['name']] + frame['position'] + frame['rotation'] for frame in frames)
+
+    def write_json(self, json_file, frames):
+        """Stream the header and all frames as a single json document."""
+        header = json.dumps(self.header, indent=2)
+        json_file.write(header[:header.rindex('}')].rstrip())
+        json_file.write(',\n  "frames": [' if self.header else '\n  "frames": [')
+        for i, frame in enumerate(frames):
+            json_file.write(("\n    " if i == 0 else ",\n    ") + json.dumps(frame))
+        json_file.write("\n  ]\n}\n")
+
+
+def open_writer(path_json, path_csv, header, csv_rows, write_frames_json=True):
+    """
+    Start a new config for the given file, closing a previous writer for it.
+
+    :param write_frames_json: Whether lightfield.json lists the frames, next to the manifest.
+    :return: The writer.
+    """
+    close_writer(path_json)
+    writer = ConfigWriter(path_json, path_csv, write_frames_json=write_frames_json)
+    writer.begin(header, csv_rows)
+    _open_writers[path_json] = writer
+    return writer
+
+
+def get_writer(path_json, path_csv):
+    """
+    Return the open writer for the given file, or continue the existing config.
+
+    :return: The writer.
+    """
+    writer = _open_writers.get(path_json)
+    if writer is None:
+        writer = ConfigWriter(path_json, path_csv)
+        writer.reopen()
+        _open_writers[path_json] = writer
+    return writer
+
+
+def close_writer(path_json, poses=None):
+    """
+    Finalise the config of the given file, if a writer is open for it.
+
+    :param poses: Optional pose arrays of all views, see ConfigWriter.close().
+    :return: Nothing.
+    """
+    writer = _open_writers.pop(path_json, None)
+    if writer is not None:
+        writer.close(poses)
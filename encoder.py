@@ -0,0 +1,148 @@
+import concurrent.futures
+import os
+import threading
+
+from . import image_io
+
+# Encoder pool of the render that is running, if any.
+_pool = None
+
+# OpenEXR codecs of Blender that the pool can write. Images with other codecs are written by Blender.
+EXR_CODECS = {
+    'NONE': image_io.EXR_NO_COMPRESSION,
+    'ZIPS': image_io.EXR_ZIPS_COMPRESSION,
+    'ZIP': image_io.EXR_ZIP_COMPRESSION,
+}
+
+
+def can_encode(settings):
+    """
+    Whether the pool can write images with the given output settings: 8-bit PNG, and OpenEXR
+    with a codec of EXR_CODECS. Other formats, bit depths and codecs are written by Blender.
+
+    :param settings: Image settings of the render.
+    :return: True if images can be encoded by the pool.
+    """
+    if settings.file_format == 'PNG':
+        return settings.color_depth == '8'
+    return settings.file_format == 'OPEN_EXR' and settings.exr_codec in EXR_CODECS
+
+
+def encode_image(source, target, compress_level, exr_compression):
+    """
+    Encode an uncompressed render into the final image and move it into place.
+
+    :param source: Uncompressed TGA or EXR file, removed when done.
+    :param target: Path of the PNG or EXR image.
+    :param compress_level: zlib level of PNG images.
+    :param exr_compression: Compression of EXR images.
+    :return: Nothing.
+    """
+    partial_target = target + ".part"
+    if source.endswith(".tga"):
+        reader = image_io.TgaReader(source)
+        writer = image_io.PngWriter(partial_target, reader.width, reader.height, reader.channels, compress_level)
+    else:
+        reader = image_io.ExrReader(source)
+        writer = image_io.ExrWriter(partial_target, reader.width, reader.height, reader.channels, exr_compression)
+    try:
+        for y in range(reader.height):
+            writer.write_row(reader.read_row(y))
+        writer.close()
+    finally:
+        reader.close()
+        if not writer.file.closed:
+            writer.file.close()
+    os.replace(partial_target, target)
+    os.remove(source)
+
+
+class EncodePool:
+    """
+    Background threads that compress and write rendered images while the next view renders.
+
+    At most max_pending images are waiting or being encoded; submitting another one blocks
+    until one of them is done. Completion callbacks run on the thread that calls collect(),
+    in the order the images were submitted.
+    """
+
+    def __init__(self, num_threads, max_pending):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_threads,
+                                                              thread_name_prefix="lightfield_encode")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.submitted = []
+
+    def submit(self, source, target, compress_level, exr_compression, on_done):
+        """
+        Encode an image in the background.
+
+        :param on_done: Called without arguments once the image is in place.
+        :return: Nothing.
+        """
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(encode_image, source, target, compress_level, exr_compression)
+        except RuntimeError:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        self.submitted.append((future, on_done))
+        self.collect()
+
+    def collect(self):
+        """
+        Run the callbacks of the images that are done, raising the error of a failed encode.
+
+        :return: Nothing.
+        """
+        while self.submitted and self.submitted[0][0].done():
+            future, on_done = self.submitted.pop(0)
+            future.result()
+            on_done()
+
+    def wait(self):
+        """
+        Wait until all submitted images are written.
+
+        :return: Nothing.
+        """
+        while self.submitted:
+            self.submitted[0][0].exception()
+            self.collect()
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+def open_pool(num_threads, max_pending):
+    """
+    Start encoding the images of a render in the background.
+
+    :return: The pool.
+    """
+    global _pool
+    close_pool()
+    _pool = EncodePool(num_threads, max_pending)
+    return _pool
+
+
+def get_pool():
+    """
+    :return: The pool of the running render, or None when images are written by the renderer.
+    """
+    return _pool
+
+
+def close_pool():
+    """
+    Wait for all images of the running render to be written.
+
+    :return: Nothing.
+    """
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
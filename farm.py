@@ -0,0 +1,202 @@
+import functools
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import bpy
+from . import encoder, farm_protocol, pack_file, render_session
+
+
+class FarmWorker(farm_protocol.WorkerProcess):
+    """
+    A background Blender process that renders the views it is handed, see farm_protocol.WorkerProcess.
+    """
+
+    def __init__(self, blend_path, lf, num_threads):
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "farm_worker.py")
+        output_directory = os.path.abspath(bpy.path.abspath(lf.output_directory))
+        super().__init__([bpy.app.binary_path,
+                          '--background', blend_path,
+                          '--threads', str(num_threads),
+                          '--python', script,
+                          '--', str(lf.index), output_directory])
+
+
+def render_frames(workers, frame_numbers):
+    """
+    Render whole frames in parallel, one frame per worker at a time.
+    Every worker writes the config of the frames it renders.
+
+    :param frame_numbers: Frames to render.
+    :return: Nothing.
+    """
+    done = set()
+
+    def on_frame(result):
+        done.add(result['frame'])
+        print("Rendered frame {} with {} views ({}/{})".format(
+            result['frame'], result['views'], len(done), len(frame_numbers)))
+
+    farm_protocol.run_queue(workers, frame_numbers, farm_protocol.serve_frames, on_frame,
+                            "All render workers exited before all frames were finished")
+
+
+def render_frame(workers, lf, session, chunk_size):
+    """
+    Render all views of a frame on the workers and collect their poses in the config.
+    With packed output, the images reported by the workers are moved into the pack.
+
+    :param session: RenderSession of the frame.
+    :return: Nothing.
+    """
+    scene = bpy.context.scene
+    frame = session.frame_number
+    poses = session.poses
+    num_views = len(poses)
+    writer = session.writer
+    pack = lf.pack_output
+    extension = lf.get_extension()
+
+    # Workers can not see the pack, so packed views are skipped here. They are still part of the config.
+    indices = []
+    for i in range(num_views):
+        if pack and scene.lightfield_donotoverwrite and lf.is_image_done(poses.name(i), frame):
+            session.append(i)
+        else:
+            indices.append(i)
+
+    # Views of a chunk that was handed out twice are only recorded once.
+    done = set()
+
+    def on_record(record):
+        if record['name'] in done:
+            return
+        done.add(record['name'])
+        writer.append(**record)
+        if pack:
+            filepath = os.path.join(session.image_directory, record['name'] + extension)
+            lf.store_image(record['name'], filepath, 0.0, record, frame)
+        print("Rendered {} ({}/{})".format(record['name'], len(done), len(indices)))
+
+    farm_protocol.run_queue(workers, farm_protocol.make_chunks(indices, chunk_size),
+                            functools.partial(farm_protocol.serve, frame=frame), on_record,
+                            "All render workers exited before frame {} was finished".format(frame))
+
+
+def render_farm(lf, num_workers, num_threads, chunk_size, whole_frames=False):
+    """
+    Render the lightfield on a pool of background Blender processes on this machine.
+    The scene is saved to a temporary copy that all workers open.
+
+    :param lf: Lightfield to render.
+    :param num_workers: Number of Blender processes.
+    :param num_threads: Render threads per process, 0 for automatic.
+    :param chunk_size: Number of views handed to a worker at once.
+    :param whole_frames: Hand whole frames to the workers instead of chunks of views.
+    :return: Nothing.
+    """
+    directory = tempfile.mkdtemp(prefix="lightfield_farm_")
+    blend_path = os.path.join(directory, "farm.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+
+    workers = [FarmWorker(blend_path, lf, num_threads) for _ in range(num_workers)]
+    try:
+        if whole_frames:
+            render_frames(workers, lf.get_frame_numbers())
+            return
+        for frame in lf.get_frame_numbers():
+            bpy.context.scene.frame_set(frame)
+            session = render_session.RenderSession(lf, frame).begin()
+            session.update_poses()
+            try:
+                render_frame(workers, lf, session, chunk_size)
+            finally:
+                session.finish()
+    finally:
+        for worker in workers:
+            worker.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def worker_main(args):
+    """
+    Main loop of a worker process, see FarmWorker.
+
+    :param args: Lightfield index and absolute output directory.
+    :return: Nothing.
+    """
+    from . import utils
+
+    index, output_directory = int(args[0]), args[1]
+    scene = bpy.context.scene
+    lf = scene.lightfield[index]
+    lf = (utils.get_lightfield_class(lf.lf_type))(lf)
+    # Relative output paths would resolve against the temporary copy of the scene.
+    lf.output_directory = output_directory
+    # Only the coordinator writes to the pack, workers write one image per view.
+    # A worker that owns a whole frame writes its pack itself.
+    pack_output = lf.pack_output
+    lf.pack_output = False
+
+    lf.set_render_properties()
+    scene.render.use_file_extension = False
+    extension = lf.get_extension()
+    poses = lf.pose_table()
+    pool = None
+    if scene.lightfield_async_encoding:
+        pool = encoder.open_pool(scene.lightfield_encode_threads, 2 * scene.lightfield_encode_threads)
+
+    for line in sys.stdin:
+        command = line.split()
+        if not command or command[0] == 'QUIT':
+            break
+        if command[0] == 'FRAME':
+            frame = int(command[1])
+            lf.pack_output = pack_output
+            try:
+                worker_render_frame(lf, frame, extension)
+            finally:
+                lf.pack_output = False
+            farm_protocol.send_message('FRAME', json.dumps({'frame': frame, 'views': len(poses)}))
+            farm_protocol.send_message('READY')
+            continue
+        frame, start, stop = (int(c) for c in command[1:])
+
+        scene.frame_set(frame)
+        output_directory = lf.get_output_image_directory(frame_number=frame)
+        os.makedirs(output_directory, exist_ok=True)
+        records = []
+        for i in range(start, stop):
+            pos = poses.camera_position(i)
+            lf.set_camera(pos)
+            bpy.context.view_layer.update()
+            records.append(lf.get_camera_record(pos.name))
+            lf.render_image(pos.name, output_directory, extension)
+        # Views are only reported once their images are written.
+        if pool is not None:
+            pool.wait()
+        for record in records:
+            farm_protocol.send_message('VIEW', json.dumps(record))
+        farm_protocol.send_message('READY')
+    encoder.close_pool()
+
+
+def worker_render_frame(lf, frame, extension):
+    """
+    Render all views of a frame and write its config, in a worker (worker side).
+
+    :return: Nothing.
+    """
+    bpy.context.scene.frame_set(frame)
+    session = render_session.RenderSession(lf, frame).begin()
+    session.update_poses()
+    try:
+        lf.render_time_frame(session, extension)
+    finally:
+        # The frame is only reported once its images are written.
+        pool = encoder.get_pool()
+        if pool is not None:
+            pool.wait()
+        pack_file.close_writers()
@@ -0,0 +1,161 @@
+import json
+import queue
+import subprocess
+import threading
+
+# Prefix of the lines a worker writes to talk to the coordinator.
+# Anything else on the worker's stdout is regular Blender output and is ignored.
+MESSAGE_PREFIX = "LIGHTFIELD "
+
+
+class WorkerProcess:
+    """
+    A worker process of the render farm, driven through its stdin and stdout.
+
+    Commands are sent as lines on stdin:
+        RENDER <frame> <start> <stop>   render views [start, stop) of a frame
+        FRAME <frame>                   render all views of a frame and write its config
+        QUIT                            exit
+    The worker answers with a VIEW message holding the config record of every
+    view it finished, or a FRAME message once it finished a whole frame,
+    and a READY message once the command is done.
+    """
+
+    def __init__(self, args):
+        """
+        :param args: Command line of the worker.
+        """
+        self.process = subprocess.Popen(args,
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        universal_newlines=True,
+                                        bufsize=1)
+        self.alive = True
+
+    def send(self, *command):
+        self.process.stdin.write(" ".join(str(c) for c in command) + "\n")
+        self.process.stdin.flush()
+
+    def messages(self):
+        """
+        Generator over the (kind, payload) messages of the worker until it is READY.
+
+        :return: Next message.
+        """
+        for line in self.process.stdout:
+            start = line.find(MESSAGE_PREFIX)
+            if start == -1:
+                continue
+            kind, _, payload = line[start + len(MESSAGE_PREFIX):].rstrip("\n").partition(" ")
+            if kind == 'READY':
+                return
+            yield kind, payload
+        self.alive = False
+        raise EOFError("Render worker exited with code {}".format(self.process.wait()))
+
+    def close(self):
+        if self.process.poll() is None:
+            try:
+                self.send('QUIT')
+                self.process.wait(timeout=30)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+
+def send_message(kind, payload=""):
+    """Write a message for the coordinator to stdout (worker side)."""
+    print(MESSAGE_PREFIX + kind + (" " + payload if payload else ""), flush=True)
+
+
+def serve(worker, chunks, records, frame):
+    """
+    Hand chunks of views to a worker until the work queue is empty.
+    A chunk that was interrupted by the worker exiting is put back in the queue.
+
+    :return: Nothing.
+    """
+    while worker.alive:
+        try:
+            start, stop = chunks.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            worker.send('RENDER', frame, start, stop)
+            for kind, payload in worker.messages():
+                if kind == 'VIEW':
+                    records.put(json.loads(payload))
+        except (EOFError, OSError) as e:
+            print("Lightfield farm: {}".format(e))
+            worker.alive = False
+            chunks.put((start, stop))
+
+
+def serve_frames(worker, frames, finished):
+    """
+    Hand whole frames to a worker until the work queue is empty.
+    A frame that was interrupted by the worker exiting is put back in the queue.
+
+    :return: Nothing.
+    """
+    while worker.alive:
+        try:
+            frame = frames.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            worker.send('FRAME', frame)
+            for kind, payload in worker.messages():
+                if kind == 'FRAME':
+                    finished.put(json.loads(payload))
+        except (EOFError, OSError) as e:
+            print("Lightfield farm: {}".format(e))
+            worker.alive = False
+            frames.put(frame)
+
+
+def run_queue(workers, items, serve_worker, on_result, failure):
+    """
+    Hand out work items with one thread per worker until all of them are done.
+    Items given back by a worker that exited are picked up by the remaining workers.
+
+    :param items: Work items, chunks of views or frames.
+    :param serve_worker: Called on the thread of a worker with the worker, the work queue and
+                         the result queue, see serve() and serve_frames().
+    :param on_result: Called on this thread with every result.
+    :param failure: Message of the error raised when all workers exited before the work was done.
+    :return: Nothing.
+    """
+    work = queue.Queue()
+    for item in items:
+        work.put(item)
+    results = queue.Queue()
+
+    while not work.empty():
+        threads = [threading.Thread(target=serve_worker, args=(worker, work, results))
+                   for worker in workers if worker.alive]
+        if not threads:
+            raise RuntimeError(failure)
+        for thread in threads:
+            thread.start()
+
+        while any(thread.is_alive() for thread in threads) or not results.empty():
+            try:
+                result = results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            on_result(result)
+
+
+def make_chunks(indices, chunk_size):
+    """
+    Split increasing view indices into ranges of consecutive views.
+
+    :return: List of (start, stop), each holding at most chunk_size views.
+    """
+    chunks = []
+    for index in indices:
+        if chunks and chunks[-1][1] == index and index - chunks[-1][0] < chunk_size:
+            chunks[-1][1] = index + 1
+        else:
+            chunks.append([index, index + 1])
+    return [tuple(chunk) for chunk in chunks]
@@ -0,0 +1,13 @@
+# Entry point of the background Blender processes started by the lightfield farm:
+#   blender --background farm.blend --python farm_worker.py -- <lightfield index> <output directory>
+# This file is run as a script, not imported as part of the add-on.
+import os
+import sys
+
+import addon_utils
+
+package = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+if not addon_utils.check(package)[1]:
+    addon_utils.enable(package, default_set=False)
+
+sys.modules[package].farm.worker_main(sys.argv[sys.argv.index("--") + 1:])
@@ -0,0 +1,24 @@
+import os
+
+# Frame number placeholder of Blender output paths.
+FRAME_PLACEHOLDER = "#####"
+# Suffix of images that are still being written.
+PARTIAL_SUFFIX = ".part"
+
+
+def partial_filepath(directory, name, extension):
+    """
+    Output path of a view rendered as an animation job. The frame number placeholder is in
+    the file name, as Blender does not replace it in the directories.
+
+    :param directory: Temporary directory of the job.
+    :param name: Name of the view.
+    :param extension: File extension of the images.
+    :return: Path with the frame number placeholder.
+    """
+    return os.path.join(directory, "{}_{}{}{}".format(name, FRAME_PLACEHOLDER, PARTIAL_SUFFIX, extension))
+
+
+def image_filepath(image_directory, name, extension):
+    """Final path of the image of a view in the image directory of its frame."""
+    return os.path.join(image_directory, name + extension)
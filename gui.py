@@ -12,15 +12,7 @@ class LightfieldButtonsPanel:
 
     @classmethod
     def poll(cls, context):
-        ob = context.object
-        if (not ob) or (not ob.type == 'EMPTY'):
-            return False
-        scn = context.scene
-        lf = scn.lightfield
-        for lightfield in lf:
-            if lightfield.obj_empty == ob:
-                return True
-        return False
+        return utils.find_lightfield(context.scene, context.object) is not None
 
 
 # -------------------------------------------------------------------
@@ -58,11 +50,12 @@ class DATA_PT_lightfield_setup(LightfieldButtonsPanel, Panel):
 
         layout.separator_spacer()
 
-        # if lf.lf_type not in ['CUBOID', 'PLANE']:
-        #     col = layout.column(align=True)
-        #     col.prop(lf, "size_x", text='Size X')
-        #     col.prop(lf, "size_y", text='Y')
-        #     col.prop(lf, "size_z", text='Z')
+        col = layout.column(align=True)
+        col.prop(lf, "size_x", text='Size X')
+        # The plane has no depth.
+        if lf.lf_type != 'PLANE':
+            col.prop(lf, "size_y", text='Y')
+        col.prop(lf, "size_z", text='Z')
 
 
 class DATA_PT_lightfield_camera(LightfieldButtonsPanel, Panel):
@@ -282,6 +275,35 @@ class LIGHTFIELD_PT_rendering(Panel):
 
         col = layout.column(align=True)
         col.prop(lf, "output_depth", text="Depth (OpenEXR)")
+        col.prop(lf, "pack_output", text="Packed Output")
+        col.prop(lf, "export_json", text="Poses in JSON")
+
+        col = layout.column(align=True)
+        col.prop(lf, "tiles_x", text="Tiles X")
+        col.prop(lf, "tiles_y", text="Y")
+
+        scn = context.scene
+        col = layout.column(align=True)
+        col.prop(scn, "lightfield_render_mode", text="Mode")
+        if scn.lightfield_render_mode == 'FARM':
+            col.prop(scn, "lightfield_farm_workers", text="Processes")
+            col.prop(scn, "lightfield_farm_threads", text="Threads")
+            col.prop(scn, "lightfield_farm_whole_frames", text="Whole Frames")
+            if not scn.lightfield_farm_whole_frames:
+                col.prop(scn, "lightfield_farm_chunk_size", text="Views per Chunk")
+        elif scn.lightfield_render_mode == 'MULTIVIEW':
+            col.prop(scn, "lightfield_batch_size", text="Views per Job")
+        elif scn.lightfield_render_mode == 'DISTRIBUTED':
+            col.prop(scn, "lightfield_lease_views", text="Views per Lease")
+            col.prop(scn, "lightfield_lease_seconds", text="Lease Timeout")
+        if scn.lightfield_render_mode == 'LOCAL':
+            col.prop(scn, "lightfield_view_major", text="View by View")
+        if scn.lightfield_render_mode in ['LOCAL', 'MULTIVIEW']:
+            col.prop(scn, "lightfield_skip_static", text="Skip Static Frames")
+        col.prop(scn, "lightfield_persistent_data", text="Persistent Data")
+        col.prop(scn, "lightfield_async_encoding", text="Background Encoding")
+        if scn.lightfield_async_encoding:
+            col.prop(scn, "lightfield_encode_threads", text="Encoding Threads")
 
 
 # Preview settings per lightfield
@@ -378,7 +400,7 @@ class LIGHTFIELD_PT_output(Panel):
         col.label(text=lf.get_output_image_directory(), icon='RENDERLAYERS')
         col.separator(factor=1.6)
         col.label(text="Absolute path to first image:")
-        first_image_name = next(lf.position_generator()).name + lf.get_extension()
+        first_image_name = lf.pose_at(0).name + lf.get_extension()
         col.label(text=os.path.join(lf.get_output_image_directory(), first_image_name), icon='FILE_IMAGE')
         #_label_multiline(context=context, text=lf.get_output_directory(), parent=col)
 
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+
+# Unit vertex tables per subdivision level, computed once.
+_vertex_cache = {}
+
+
+def vertex_count(subdivisions):
+    """
+    Number of vertices of an icosphere, without building it.
+
+    :param subdivisions: Subdivision level, 1 being the icosahedron (as in Blender).
+    :return: Number of vertices.
+    """
+    return 10 * 4 ** (subdivisions - 1) + 2
+
+
+def icosahedron():
+    """
+    Construct the unit icosahedron with a vertex at each pole: the south pole,
+    the lower ring, the upper ring and the north pole.
+
+    :return: Vertices (12 x 3) and triangles (20 x 3).
+    """
+    z = 1 / math.sqrt(5)
+    r = 2 / math.sqrt(5)
+    vertices = [[0.0, 0.0, -1.0]]
+    for k in range(5):
+        angle = math.radians(-36 - 72 * k)
+        vertices.append([r * math.cos(angle), r * math.sin(angle), -z])
+    for k in range(5):
+        angle = math.radians(-72 - 72 * k)
+        vertices.append([r * math.cos(angle), r * math.sin(angle), z])
+    vertices.append([0.0, 0.0, 1.0])
+    vertices = np.array(vertices)
+
+    # Every face connects three vertices that are mutual nearest neighbours.
+    distances = np.linalg.norm(vertices[:, None] - vertices[None, :], axis=2)
+    adjacent = (distances > 0) & (distances < 1.1)
+    faces = [[i, j, k]
+             for i in range(12) for j in range(i + 1, 12) for k in range(j + 1, 12)
+             if adjacent[i, j] and adjacent[j, k] and adjacent[i, k]]
+    return vertices, np.array(faces)
+
+
+def subdivide(vertices, faces):
+    """
+    Split every triangle in four, projecting the new edge midpoints onto the unit sphere.
+
+    :param vertices: V x 3 unit vertices.
+    :param faces: F x 3 triangles.
+    :return: New vertices (old ones first, in the same order) and triangles.
+    """
+    num_vertices = len(vertices)
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    keys, inverse = np.unique(edges[:, 0] * num_vertices + edges[:, 1], return_inverse=True)
+
+    midpoints = vertices[keys // num_vertices] + vertices[keys % num_vertices]
+    midpoints /= np.linalg.norm(midpoints, axis=1, keepdims=True)
+
+    a, b, c = faces.T
+    ab, bc, ca = (inverse.reshape(-1, 3) + num_vertices).T
+    new_faces = np.concatenate([np.stack([a, ab, ca], axis=1),
+                                np.stack([ab, b, bc], axis=1),
+                                np.stack([ca, bc, c], axis=1),
+                                np.stack([ab, bc, ca], axis=1)])
+    return np.concatenate([vertices, midpoints]), new_faces
+
+
+def icosphere_vertices(subdivisions):
+    """
+    Unit vertices of an icosphere. The result is cached and read-only.
+
+    :param subdivisions: Subdivision level, 1 being the icosahedron (as in Blender).
+    :return: N x 3 vertices.
+    """
+    if subdivisions not in _vertex_cache:
+        vertices, faces = icosahedron()
+        for _ in range(subdivisions - 1):
+            vertices, faces = subdivide(vertices, faces)
+        vertices.flags.writeable = False
+        _vertex_cache[subdivisions] = vertices
+    return _vertex_cache[subdivisions]
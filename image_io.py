@@ -0,0 +1,396 @@
+import struct
+import zlib
+
+import numpy as np
+
+# -------------------------------------------------------------------
+#   Uncompressed TGA
+# -------------------------------------------------------------------
+
+
+class TgaReader:
+    """
+    Row by row reader for uncompressed true-color and grayscale TGA files,
+    as written by Blender's 'TARGA_RAW' format.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, mode='rb')
+        (id_length, colormap_type, image_type, _, colormap_length, colormap_depth, _, _,
+         self.width, self.height, bits_per_pixel, descriptor) = struct.unpack('<BBBHHBHHHHBB', self.file.read(18))
+        if image_type not in (2, 3) or colormap_type != 0:
+            self.close()
+            raise ValueError("{} is not an uncompressed true-color or grayscale TGA".format(path))
+        self.channels = bits_per_pixel // 8
+        self.top_down = bool(descriptor & 0x20)
+        self.data_offset = 18 + id_length + colormap_length * ((colormap_depth + 7) // 8)
+
+    def read_row(self, y):
+        """
+        Read a row of pixels.
+
+        :param y: Row, counted from the top.
+        :return: Bytes in RGB(A) or gray order.
+        """
+        row_size = self.width * self.channels
+        self.file.seek(self.data_offset + row_size * (y if self.top_down else self.height - 1 - y))
+        row = bytearray(self.file.read(row_size))
+        # TGA stores blue before red.
+        if self.channels >= 3:
+            row[0::self.channels], row[2::self.channels] = row[2::self.channels], row[0::self.channels]
+        return bytes(row)
+
+    def close(self):
+        self.file.close()
+
+
+# -------------------------------------------------------------------
+#   PNG
+# -------------------------------------------------------------------
+
+# PNG color type per number of 8-bit channels.
+PNG_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+
+# Amount of compressed data collected before an IDAT chunk is written.
+PNG_CHUNK_SIZE = 1 << 20
+
+
+def png_compress_level(compression):
+    """zlib level for Blender's PNG compression percentage, as Blender maps it."""
+    return int(compression / 11.1111)
+
+
+class PngWriter:
+    """
+    Streaming writer for 8-bit PNG images.
+    Rows are filtered and compressed as they come in, so only a single row is kept in memory.
+    """
+
+    def __init__(self, path, width, height, channels, compress_level=6):
+        self.file = open(path, mode='wb')
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.rows = 0
+        self.compressor = zlib.compressobj(compress_level)
+        self.pending = []
+        self.pending_size = 0
+
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self.write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, PNG_COLOR_TYPES[channels], 0, 0, 0))
+
+    def write_chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind)) & 0xffffffff))
+
+    def write_row(self, row):
+        """
+        Append a row of pixels.
+
+        :param row: Bytes in RGB(A) or gray order.
+        :return: Nothing.
+        """
+        # 'Sub' filter: every byte minus the same channel of the pixel to its left.
+        pixels = np.frombuffer(row, dtype=np.uint8)
+        filtered = pixels.copy()
+        filtered[self.channels:] -= pixels[:-self.channels]
+        self.write_compressed(self.compressor.compress(b'\x01' + filtered.tobytes()))
+        self.rows += 1
+
+    def write_compressed(self, data):
+        self.pending.append(data)
+        self.pending_size += len(data)
+        if self.pending_size >= PNG_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.pending_size:
+            self.write_chunk(b'IDAT', b''.join(self.pending))
+        self.pending = []
+        self.pending_size = 0
+
+    def close(self):
+        """
+        Finish the image.
+
+        :return: Nothing.
+        """
+        if self.rows != self.height:
+            self.file.close()
+            raise ValueError("PNG has {} rows, expected {}".format(self.rows, self.height))
+        self.write_compressed(self.compressor.flush())
+        self.flush()
+        self.write_chunk(b'IEND', b'')
+        self.file.close()
+
+
+# -------------------------------------------------------------------
+#   OpenEXR, scanline images
+# -------------------------------------------------------------------
+
+EXR_MAGIC = 20000630
+EXR_TILED_FLAG = 0x200
+
+# Pixel types and their size in bytes.
+EXR_UINT = 0
+EXR_HALF = 1
+EXR_FLOAT = 2
+EXR_TYPE_SIZES = {EXR_UINT: 4, EXR_HALF: 2, EXR_FLOAT: 4}
+EXR_TYPE_DTYPES = {EXR_UINT: '<u4', EXR_HALF: '<f2', EXR_FLOAT: '<f4'}
+
+# Compression methods and the number of scanlines per chunk.
+EXR_NO_COMPRESSION = 0
+EXR_ZIPS_COMPRESSION = 2
+EXR_ZIP_COMPRESSION = 3
+EXR_LINES_PER_CHUNK = {EXR_NO_COMPRESSION: 1, EXR_ZIPS_COMPRESSION: 1, EXR_ZIP_COMPRESSION: 16}
+
+
+def read_exr_header(f):
+    """
+    Read the attributes of a single-part EXR header.
+
+    :param f: File positioned at the start of the image.
+    :return: Dictionary from attribute name to (type, raw value).
+    """
+    magic, version = struct.unpack('<ii', f.read(8))
+    if magic != EXR_MAGIC:
+        raise ValueError("Not an OpenEXR image")
+    if version & EXR_TILED_FLAG:
+        raise ValueError("Tiled OpenEXR images are not supported")
+
+    def read_string():
+        chars = bytearray()
+        while True:
+            c = f.read(1)
+            if c in (b'\x00', b''):
+                return chars.decode()
+            chars += c
+
+    attributes = {}
+    while True:
+        name = read_string()
+        if not name:
+            return attributes
+        kind = read_string()
+        size, = struct.unpack('<i', f.read(4))
+        attributes[name] = (kind, f.read(size))
+
+
+def parse_exr_channels(value):
+    """
+    Parse a 'chlist' attribute.
+
+    :return: List of (name, pixel type).
+    """
+    channels = []
+    pos = 0
+    while value[pos:pos + 1] != b'\x00':
+        end = value.index(b'\x00', pos)
+        name = value[pos:end].decode()
+        pixel_type, = struct.unpack_from('<i', value, end + 1)
+        channels.append((name, pixel_type))
+        pos = end + 1 + 16
+    return channels
+
+
+def pack_exr_channels(channels):
+    """Inverse of parse_exr_channels."""
+    return b''.join(name.encode() + b'\x00' + struct.pack('<iB3xii', pixel_type, 0, 1, 1)
+                    for name, pixel_type in channels) + b'\x00'
+
+
+def exr_zip_compress(data):
+    """Compress the data of a chunk the way OpenEXR's ZIP compression does."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    # Split even and odd bytes, then store the difference to the previous byte.
+    reordered = np.concatenate((raw[0::2], raw[1::2]))
+    predicted = reordered.copy()
+    predicted[1:] = reordered[1:] - reordered[:-1] + np.uint8(128)
+    return zlib.compress(predicted.tobytes())
+
+
+def exr_zip_decompress(data, size):
+    """Inverse of exr_zip_compress."""
+    predicted = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+    reordered = np.cumsum(np.concatenate((predicted[:1], predicted[1:] - np.uint8(128))), dtype=np.uint8)
+    raw = np.empty(size, dtype=np.uint8)
+    raw[0::2] = reordered[:(size + 1) // 2]
+    raw[1::2] = reordered[(size + 1) // 2:]
+    return raw.tobytes()
+
+
+class ExrReader:
+    """
+    Row by row reader for scanline OpenEXR images, without compression or with ZIP(S) compression.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the image, or a binary file object.
+        """
+        self.file = open(path, mode='rb') if isinstance(path, str) else path
+        try:
+            attributes = read_exr_header(self.file)
+            self.channels = parse_exr_channels(attributes['channels'][1])
+            self.compression = attributes['compression'][1][0]
+            if self.compression not in EXR_LINES_PER_CHUNK:
+                raise ValueError("Unsupported OpenEXR compression {} in {}".format(self.compression, path))
+            x_min, y_min, x_max, y_max = struct.unpack('<iiii', attributes['dataWindow'][1])
+        except (ValueError, KeyError):
+            self.close()
+            raise
+        self.y_min = y_min
+        self.width = x_max - x_min + 1
+        self.height = y_max - y_min + 1
+        self.lines_per_chunk = EXR_LINES_PER_CHUNK[self.compression]
+        num_chunks = (self.height + self.lines_per_chunk - 1) // self.lines_per_chunk
+        self.offsets = struct.unpack('<%dQ' % num_chunks, self.file.read(8 * num_chunks))
+        self.line_size = self.width * sum(EXR_TYPE_SIZES[t] for _, t in self.channels)
+        self.cached_chunk = None
+        self.cached_data = None
+
+    def read_row(self, y):
+        """
+        Read a row of pixels.
+
+        :param y: Row, counted from the top of the data window.
+        :return: Bytes holding the row of every channel, one channel after the other.
+        """
+        chunk = y // self.lines_per_chunk
+        if chunk != self.cached_chunk:
+            self.file.seek(self.offsets[chunk])
+            _, size = struct.unpack('<ii', self.file.read(8))
+            data = self.file.read(size)
+            lines = min(self.lines_per_chunk, self.height - chunk * self.lines_per_chunk)
+            if size < lines * self.line_size:
+                data = exr_zip_decompress(data, lines * self.line_size)
+            self.cached_chunk = chunk
+            self.cached_data = data
+        start = (y - chunk * self.lines_per_chunk) * self.line_size
+        return self.cached_data[start:start + self.line_size]
+
+    def close(self):
+        self.file.close()
+
+
+def read_exr(path):
+    """
+    Read a whole scanline OpenEXR image.
+
+    :param path: Path of the image, or a binary file object.
+    :return: Channel names and a height x width x channels float32 array.
+    """
+    reader = ExrReader(path)
+    try:
+        image = np.empty((reader.height, reader.width, len(reader.channels)), dtype=np.float32)
+        for y in range(reader.height):
+            row = reader.read_row(y)
+            pos = 0
+            for c, (_, pixel_type) in enumerate(reader.channels):
+                image[y, :, c] = np.frombuffer(row, dtype=EXR_TYPE_DTYPES[pixel_type], count=reader.width, offset=pos)
+                pos += reader.width * EXR_TYPE_SIZES[pixel_type]
+    finally:
+        reader.close()
+    return [name for name, _ in reader.channels], image
+
+
+class ExrWriter:
+    """
+    Streaming writer for scanline OpenEXR images.
+    Chunks are compressed and written as rows come in; the offset table is filled in on close.
+    """
+
+    def __init__(self, path, width, height, channels, compression=EXR_ZIP_COMPRESSION):
+        """
+        :param channels: List of (name, pixel type), sorted by name.
+        """
+        self.file = open(path, mode='wb')
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.compression = compression
+        self.lines_per_chunk = EXR_LINES_PER_CHUNK[compression]
+        self.line_size = width * sum(EXR_TYPE_SIZES[t] for _, t in channels)
+        self.rows = 0
+        self.pending = []
+        self.offsets = []
+
+        def attribute(name, kind, value):
+            return name.encode() + b'\x00' + kind.encode() + b'\x00' + struct.pack('<i', len(value)) + value
+
+        window = struct.pack('<iiii', 0, 0, width - 1, height - 1)
+        self.file.write(struct.pack('<ii', EXR_MAGIC, 2))
+        self.file.write(attribute('channels', 'chlist', pack_exr_channels(channels)))
+        self.file.write(attribute('compression', 'compression', bytes([compression])))
+        self.file.write(attribute('dataWindow', 'box2i', window))
+        self.file.write(attribute('displayWindow', 'box2i', window))
+        self.file.write(attribute('lineOrder', 'lineOrder', b'\x00'))
+        self.file.write(attribute('pixelAspectRatio', 'float', struct.pack('<f', 1.0)))
+        self.file.write(attribute('screenWindowCenter', 'v2f', struct.pack('<ff', 0.0, 0.0)))
+        self.file.write(attribute('screenWindowWidth', 'float', struct.pack('<f', 1.0)))
+        self.file.write(b'\x00')
+
+        # Room for the offset table.
+        self.table_offset = self.file.tell()
+        num_chunks = (height + self.lines_per_chunk - 1) // self.lines_per_chunk
+        self.file.write(b'\x00' * 8 * num_chunks)
+
+    def write_row(self, row):
+        """
+        Append a row of pixels.
+
+        :param row: Bytes holding the row of every channel, one channel after the other.
+        :return: Nothing.
+        """
+        self.pending.append(row)
+        self.rows += 1
+        if len(self.pending) == self.lines_per_chunk or self.rows == self.height:
+            self.write_chunk(self.rows - len(self.pending), b''.join(self.pending))
+            self.pending = []
+
+    def write_chunk(self, y, data):
+        if self.compression != EXR_NO_COMPRESSION:
+            compressed = exr_zip_compress(data)
+            # Data that does not get smaller is stored as is.
+            if len(compressed) < len(data):
+                data = compressed
+        self.offsets.append(self.file.tell())
+        self.file.write(struct.pack('<ii', y, len(data)))
+        self.file.write(data)
+
+    def close(self):
+        """
+        Finish the image.
+
+        :return: Nothing.
+        """
+        if self.rows != self.height:
+            self.file.close()
+            raise ValueError("OpenEXR image has {} rows, expected {}".format(self.rows, self.height))
+        self.file.seek(self.table_offset)
+        self.file.write(struct.pack('<%dQ' % len(self.offsets), *self.offsets))
+        self.file.close()
+
+
+def convert_exr_row(row, width, channels, output_channels):
+    """
+    Convert the pixel types of a row read by ExrReader.
+
+    :param row: Row of the input channels.
+    :param width: Number of pixels in the row.
+    :param channels: Input list of (name, pixel type).
+    :param output_channels: Output list of (name, pixel type), with the same names.
+    :return: Converted row.
+    """
+    if channels == output_channels:
+        return row
+    parts = []
+    pos = 0
+    for (_, pixel_type), (_, output_type) in zip(channels, output_channels):
+        size = width * EXR_TYPE_SIZES[pixel_type]
+        values = np.frombuffer(row, dtype=EXR_TYPE_DTYPES[pixel_type], count=width, offset=pos)
+        parts.append(values.astype(EXR_TYPE_DTYPES[output_type]).tobytes())
+        pos += size
+    return b''.join(parts)
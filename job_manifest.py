@@ -0,0 +1,113 @@
+import json
+
+# Keys a job manifest may hold.
+JOB_KEYS = {'lightfield', 'frames', 'views', 'resolution', 'samples', 'output', 'config', 'skip_existing', 'result',
+            'distributed'}
+
+
+class JobError(Exception):
+    """The job manifest can not be run."""
+
+
+def to_int(value, what):
+    """
+    Convert a number of a job manifest.
+
+    :param what: Name of the number, for errors.
+    :return: The integer.
+    """
+    try:
+        if isinstance(value, bool):
+            raise TypeError()
+        return int(value)
+    except (TypeError, ValueError):
+        raise JobError("The {} is a number, not {}".format(what, json.dumps(value)))
+
+
+def positive_int(value, what):
+    """
+    Convert a positive number of a job manifest.
+
+    :param what: Name of the number, for errors.
+    :return: The integer.
+    """
+    number = to_int(value, what)
+    if number < 1:
+        raise JobError("The {} is at least 1".format(what))
+    return number
+
+
+def load_job(path):
+    """
+    Read and check a job manifest.
+
+    :param path: Path of the json manifest.
+    :return: Dictionary of the job.
+    """
+    try:
+        with open(path, mode='r') as job_file:
+            job = json.load(job_file)
+    except (OSError, ValueError) as e:
+        raise JobError("Can not read job manifest {}: {}".format(path, e))
+    if not isinstance(job, dict):
+        raise JobError("A job manifest is a json object")
+    unknown = set(job) - JOB_KEYS
+    if unknown:
+        raise JobError("Unknown keys in job manifest: {}".format(", ".join(sorted(unknown))))
+    if 'lightfield' not in job:
+        raise JobError("A job manifest needs the name of the lightfield")
+    if job.get('distributed') and ('views' in job or 'config' in job):
+        raise JobError("Distributed jobs render all views and write the configs, without 'views' or 'config'")
+    resolution = job.get('resolution')
+    if resolution is not None:
+        if not isinstance(resolution, list) or len(resolution) != 2:
+            raise JobError("The resolution is a list of two positive sizes")
+        job['resolution'] = [positive_int(r, "size of the resolution") for r in resolution]
+    if job.get('samples') is not None:
+        job['samples'] = positive_int(job['samples'], "number of samples")
+    return job
+
+
+def select_range(spec, default, what):
+    """
+    Numbers selected by a range in a job manifest.
+
+    :param spec: None for the default, a list of numbers, or an object with start, step and
+                 either an exclusive stop or an inclusive end.
+    :param default: Numbers to select from.
+    :param what: Name of the range, for errors.
+    :return: List of numbers, in the order of default.
+    """
+    if spec is None:
+        return list(default)
+    if isinstance(spec, list):
+        missing = [n for n in spec if n not in default]
+        if missing:
+            raise JobError("The {} {} do not exist".format(what, missing))
+        return spec
+    if not isinstance(spec, dict):
+        raise JobError("The {} are a list or an object with start, stop and step".format(what))
+    step = positive_int(spec.get('step', 1), "step of the {}".format(what))
+    start = to_int(spec.get('start', default[0] if default else 0), "start of the {}".format(what))
+    if 'end' in spec:
+        stop = to_int(spec['end'], "end of the {}".format(what)) + 1
+    else:
+        stop = to_int(spec.get('stop', default[-1] + 1 if default else 0), "stop of the {}".format(what))
+    selected = set(range(start, stop, step))
+    return [n for n in default if n in selected]
+
+
+def select_views(spec, poses):
+    """
+    Indices of the views selected by a job, by index range or list of indices or names.
+
+    :param spec: Views of the job manifest.
+    :param poses: PoseArray of the lightfield.
+    :return: List of view indices.
+    """
+    if isinstance(spec, list):
+        try:
+            spec = [poses.index_of(n) if isinstance(n, str) else n for n in spec]
+        except (KeyError, ValueError):
+            raise JobError("The views {} do not all exist".format(spec))
+    return select_range(spec, range(len(poses)), 'views')
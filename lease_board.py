@@ -0,0 +1,277 @@
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+
+# Name of the lease for writing the config of a frame once all views are done.
+CONFIG_LEASE = "config"
+
+
+def node_name():
+    """Name of this render node, unique among the processes sharing the output directory."""
+    return "{}-{}".format(socket.gethostname(), os.getpid())
+
+
+def write_atomic(path, data):
+    """Write a json file under a temporary name and rename it into place."""
+    temporary_path = "{}.{}.part".format(path, uuid.uuid4().hex)
+    with open(temporary_path, mode='w') as f:
+        json.dump(data, f)
+    os.replace(temporary_path, path)
+
+
+class Lease:
+    """A claim of this node on a batch of views, held as long as its file is renewed."""
+
+    def __init__(self, board, name, token):
+        self.board = board
+        self.name = name
+        self.token = token
+        self.path = board.path(name, ".lease")
+
+    def owned(self):
+        """Whether the lease file still belongs to this node."""
+        try:
+            with open(self.path, mode='r') as f:
+                return json.load(f).get('token') == self.token
+        except (OSError, ValueError):
+            return False
+
+    def renew(self):
+        """
+        Extend the lease by touching its file.
+
+        :return: False if another node reclaimed the lease in the meantime.
+        """
+        if not self.owned():
+            return False
+        try:
+            os.utime(self.path)
+        except OSError:
+            return False
+        return True
+
+    def release(self):
+        """Remove the lease file, if it is still ours."""
+        if self.owned():
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class LeaseRenewer(threading.Thread):
+    """Renews a lease in the background while its views render."""
+
+    def __init__(self, lease, interval):
+        super().__init__(daemon=True)
+        self.lease = lease
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if not self.lease.renew():
+                print("Lease {} was taken over by another node".format(self.lease.name))
+                return
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class LeaseBoard:
+    """
+    Leases of the batches of views of one frame, as files in a directory shared by all render nodes.
+
+    A node claims a batch by creating its .lease file exclusively, renews it by touching the file,
+    and marks the batch as done with a .done file holding the config records of its views.
+    A lease whose file was not touched for longer than the lease duration belongs to a crashed node
+    and is reclaimed. Times are compared to the modification time of a file this node just touched,
+    so the clock of the file server is used and the clocks of the nodes do not have to agree.
+    At worst, a batch whose lease was reclaimed from a node that was only slow is rendered twice;
+    images are renamed into place, so this never leaves a partial image.
+
+    The node that creates the board writes a run id into its layout. Once the config of the frame
+    is written, the board is removed, so the next render of the frame starts a new run; a node
+    still holding the board of a run that is over sees that its layout is gone or was replaced.
+    """
+
+    def __init__(self, directory, num_views, batch_size, duration, node=None):
+        """
+        :param directory: Lease directory of the frame.
+        :param num_views: Number of views of the frame.
+        :param batch_size: Number of views per batch, the batch size of the first node is used by all.
+        :param duration: Seconds a lease stays valid without being renewed.
+        :param node: Name of this node.
+        """
+        self.directory = directory
+        self.duration = duration
+        self.node = node or node_name()
+        os.makedirs(os.path.join(directory, "nodes"), exist_ok=True)
+
+        # All nodes have to split the views into the same batches.
+        self.layout_path = os.path.join(directory, "layout.json")
+        run = uuid.uuid4().hex
+        try:
+            fd = os.open(self.layout_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            with os.fdopen(fd, mode='w') as f:
+                json.dump({'run': run, 'num_views': num_views, 'batch_size': batch_size}, f)
+        except FileExistsError:
+            layout = self.read_layout(self.layout_path)
+            if layout['num_views'] != num_views:
+                raise RuntimeError("The leases in {} are for {} views instead of {}".format(
+                    directory, layout['num_views'], num_views))
+            run = layout.get('run')
+            batch_size = layout['batch_size']
+        self.run = run
+        self.batch_size = batch_size
+        self.batches = [(start, min(start + batch_size, num_views)) for start in range(0, num_views, batch_size)]
+
+    @staticmethod
+    def read_layout(path):
+        # The first node may still be writing it.
+        for _ in range(50):
+            try:
+                with open(path, mode='r') as f:
+                    return json.load(f)
+            except ValueError:
+                time.sleep(0.1)
+        raise RuntimeError("Can not read {}".format(path))
+
+    def is_current(self):
+        """Whether the board still belongs to the run of this node."""
+        try:
+            with open(self.layout_path, mode='r') as f:
+                return json.load(f).get('run') == self.run
+        except (OSError, ValueError):
+            return False
+
+    def is_finished(self):
+        """Whether the config of the frame was written in the run of this node."""
+        return self.is_done(CONFIG_LEASE) or not self.is_current()
+
+    def remove(self):
+        """
+        Remove the board once the config is written. The directory is first renamed,
+        so other nodes never see a board with some of its files missing.
+
+        :return: Nothing.
+        """
+        removed_directory = "{}.{}.removed".format(os.path.normpath(self.directory), uuid.uuid4().hex)
+        try:
+            os.rename(self.directory, removed_directory)
+        except OSError:
+            return
+        shutil.rmtree(removed_directory, ignore_errors=True)
+
+    @staticmethod
+    def batch_name(batch):
+        return "views_{:07}_{:07}".format(*batch)
+
+    def path(self, name, suffix):
+        return os.path.join(self.directory, name + suffix)
+
+    def now(self):
+        """Current time of the file server."""
+        heartbeat = os.path.join(self.directory, "nodes", self.node)
+        with open(heartbeat, mode='a'):
+            pass
+        os.utime(heartbeat)
+        return os.stat(heartbeat).st_mtime
+
+    def is_done(self, name):
+        return os.path.exists(self.path(name, ".done"))
+
+    def mark_done(self, name, payload):
+        try:
+            write_atomic(self.path(name, ".done"), payload)
+        except FileNotFoundError:
+            # A slow node whose batch was taken over finds the board of a finished run removed.
+            if self.is_current():
+                raise
+
+    def read_done(self, name):
+        with open(self.path(name, ".done"), mode='r') as f:
+            return json.load(f)
+
+    def all_done(self):
+        """Whether all batches of views are done."""
+        return all(self.is_done(self.batch_name(batch)) for batch in self.batches)
+
+    def claim(self, name):
+        """
+        Claim a lease, reclaiming it first if it expired.
+
+        :return: Lease, or None if another node holds it.
+        """
+        path = self.path(name, ".lease")
+        token = uuid.uuid4().hex
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self.reclaim(path):
+                    return None
+                continue
+            except FileNotFoundError:
+                # The board was removed, the run is over.
+                return None
+            with os.fdopen(fd, mode='w') as f:
+                json.dump({'node': self.node, 'token': token}, f)
+            lease = Lease(self, name, token)
+            # The batch may have been finished between looking and claiming,
+            # or the run may be over and a new one started in the same directory.
+            if self.is_done(name) or not self.is_current():
+                lease.release()
+                return None
+            return lease
+        return None
+
+    def reclaim(self, path):
+        """
+        Remove a lease that expired. The lease is first renamed to a name of this node,
+        so only one node can take it, even if several see it expire at the same time.
+
+        :return: Whether the lease was removed.
+        """
+        try:
+            if self.now() - os.stat(path).st_mtime <= self.duration:
+                return False
+        except FileNotFoundError:
+            return self.is_current()
+        stale_path = "{}.{}.stale".format(path, uuid.uuid4().hex)
+        try:
+            os.rename(path, stale_path)
+        except FileNotFoundError:
+            return False
+        try:
+            if self.now() - os.stat(stale_path).st_mtime <= self.duration:
+                # Another node claimed it again just before the rename; give it back.
+                try:
+                    os.link(stale_path, path)
+                except FileExistsError:
+                    pass
+                return False
+            print("Reclaiming expired lease {}".format(os.path.basename(path)))
+            return True
+        finally:
+            os.remove(stale_path)
+
+    def claim_next(self):
+        """
+        Claim the first batch of views that is neither done nor leased by a live node.
+
+        :return: (Lease, (start, stop)), or None if there is none.
+        """
+        for batch in self.batches:
+            name = self.batch_name(batch)
+            if self.is_done(name):
+                continue
+            lease = self.claim(name)
+            if lease is not None:
+                return lease, batch
+        return None
@@ -0,0 +1,133 @@
+import os
+import time
+
+import bpy
+from . import encoder, lease_board, render_session
+
+# Directory of the leases of a frame, inside its output directory.
+LEASE_DIRECTORY = "leases"
+# Seconds between two looks at the leases of other nodes, while waiting for them.
+POLL_INTERVAL = 2.0
+
+
+def render_batch(lf, session, board, lease, batch, extension):
+    """
+    Render a claimed batch of views and mark it as done.
+
+    :return: Views of the batch, with their index, name, path and status.
+    """
+    scene = bpy.context.scene
+    renewer = lease_board.LeaseRenewer(lease, board.duration / 3)
+    renewer.start()
+    views = []
+    records = []
+    try:
+        for i in range(*batch):
+            name = session.poses.name(i)
+            record = session.record(i)
+            records.append(record)
+            view = {
+                'index': i,
+                'name': name,
+                'path': os.path.join(session.image_directory, name + extension),
+                'status': 'rendered',
+            }
+            if scene.lightfield_donotoverwrite and lf.is_image_done(name, session.frame_number):
+                view['status'] = 'skipped'
+            views.append(view)
+            lf.set_camera(session.poses.camera_position(i))
+            lf.render_image(name, session.image_directory, extension, record)
+        # The batch is only done once its images are written.
+        pool = encoder.get_pool()
+        if pool is not None:
+            pool.wait()
+        board.mark_done(board.batch_name(batch), records)
+    finally:
+        renewer.stop()
+        lease.release()
+    return views
+
+
+def merge_config(session, board):
+    """
+    Write the config of a frame from the records of all its batches.
+
+    :return: Nothing.
+    """
+    session.begin()
+    try:
+        for batch in board.batches:
+            for record in board.read_done(board.batch_name(batch)):
+                session.writer.append(**record)
+    finally:
+        session.finish()
+
+
+def render_distributed(lf, frames, batch_size, duration, extension):
+    """
+    Render frames together with the other nodes rendering the same lightfield into the same
+    output directory. Batches of views are claimed through lease files, see lease_board.LeaseBoard.
+    The config of a frame is written by the node that claims it once all its views are done,
+    which then removes the leases of the frame. Returns once all frames are done, also by the other nodes.
+
+    :param lf: Lightfield to render.
+    :param frames: Frame numbers.
+    :param batch_size: Number of views per lease.
+    :param duration: Seconds a lease stays valid without being renewed.
+    :param extension: File extension of the images.
+    :return: List with the frame number, config path and views rendered by this node, per frame.
+    """
+    scene = bpy.context.scene
+    node = lease_board.node_name()
+    # Other nodes can not see the pack of this node, so every view is written to its own file.
+    old_pack_output = lf.pack_output
+    lf.pack_output = False
+    results = {frame: {'frame': frame, 'config': None, 'views': []} for frame in frames}
+    sessions = {}
+    try:
+        pending = list(frames)
+        while pending:
+            progress = False
+            for frame in list(pending):
+                if frame not in sessions:
+                    session = render_session.RenderSession(lf, frame)
+                    board = lease_board.LeaseBoard(os.path.join(session.output_directory, LEASE_DIRECTORY),
+                                       len(lf.pose_table()), batch_size, duration, node)
+                    sessions[frame] = session, board
+                session, board = sessions[frame]
+                if board.is_finished():
+                    pending.remove(frame)
+                    continue
+
+                claimed = board.claim_next()
+                if claimed is not None:
+                    # The scene is only evaluated at frames with views left to render.
+                    scene.frame_set(frame)
+                    session.update_poses()
+                    os.makedirs(session.image_directory, exist_ok=True)
+                while claimed is not None:
+                    progress = True
+                    lease, batch = claimed
+                    print("Frame {}: rendering views {} to {} on {}".format(frame, batch[0], batch[1] - 1, node))
+                    results[frame]['views'].extend(render_batch(lf, session, board, lease, batch, extension))
+                    claimed = board.claim_next()
+
+                if board.all_done() and not board.is_finished():
+                    lease = board.claim(lease_board.CONFIG_LEASE)
+                    if lease is not None:
+                        progress = True
+                        try:
+                            merge_config(session, board)
+                            board.mark_done(lease_board.CONFIG_LEASE, {'node': node})
+                            results[frame]['config'] = session.path_json
+                        finally:
+                            lease.release()
+                        board.remove()
+                if board.is_finished():
+                    pending.remove(frame)
+            if pending and not progress:
+                # Waiting for other nodes to finish their batches, or for their leases to expire.
+                time.sleep(POLL_INTERVAL)
+    finally:
+        lf.pack_output = old_pack_output
+    return [results[frame] for frame in frames]
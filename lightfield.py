@@ -1,11 +1,19 @@
+import collections
 import math
 import os
+import time
 
 import bpy
 from bpy.props import BoolProperty, FloatProperty, IntProperty, StringProperty, PointerProperty, EnumProperty, \
     CollectionProperty
-import bmesh
-from . import update, file_utils
+import numpy as np
+from mathutils import Matrix
+from . import update, file_utils, farm, render_journal, multiview, render_timer, tiles, image_io, encoder, \
+    pack_file, planner, pose_array, render_session, leases, animation, static_frames
+
+# Pose tables of recently used rig settings, keyed by lightfield type and pose_key().
+POSE_TABLE_CACHE_SIZE = 8
+_pose_tables = collections.OrderedDict()
 
 
 class LightfieldVisual(bpy.types.PropertyGroup):
@@ -18,6 +26,7 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
     """
     # Constants
     LIGHTFIELD_COLLECTION = 'Lightfields'
+    GRID_ROTATION_ATTRIBUTE = 'camera_rotation'
 
     # -------------------------------------------------------------------
     #   Lightfield components
@@ -46,7 +55,7 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
                              min=2,
                              max=2000,
                              description='Number of cameras in X direction',
-                             update=update.update_num_cameras
+                             update=update.on_change('num_cams_x')
                              )
     # Number of cameras in Y direction
     # Also used for cylinder and sphere
@@ -54,7 +63,7 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
                              min=2,
                              max=2000,
                              description='Number of cameras in Y direction',
-                             update=update.update_num_cameras
+                             update=update.on_change('num_cams_y')
                              )
     # Number of cameras in Z direction
     # Only for cuboid
@@ -62,45 +71,45 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
                              min=2,
                              max=2000,
                              description='Number of cameras in Z direction',
-                             update=update.update_num_cameras
+                             update=update.on_change('num_cams_z')
                              )
     # Only for cylinder
     num_cams_radius = IntProperty(default=3,
                                   min=3,
                                   max=2000,
                                   description='Number of cameras on the circumference',
-                                  update=update.update_num_cameras
+                                  update=update.on_change('num_cams_radius')
                                   )
     # Only for sphere
     num_cams_subdiv = IntProperty(default=3,
                                   min=1,
-                                  max=6,
+                                  max=10,
                                   description='Number of cameras on the icosphere',
-                                  update=update.update_num_cameras
+                                  update=update.on_change('num_cams_subdiv')
                                   )
     # Size of setup in X direction
     size_x = FloatProperty(
         default=1.0,
-        min=0.0,
+        min=0.001,
         unit='LENGTH',
         description='Size in X direction',
-        # update=update.update_size
+        update=update.on_change('size_x')
     )
     # Size of setup in Y direction
     size_y = FloatProperty(
         default=1.0,
-        min=0.0,
+        min=0.001,
         unit='LENGTH',
         description='Size in Y direction',
-        # update=update.update_size
+        update=update.on_change('size_y')
     )
     # Size of setup in Z direction
     size_z = FloatProperty(
         default=1.0,
-        min=0.0,
+        min=0.001,
         unit='LENGTH',
         description='Size in Z direction',
-        # update=update.update_size
+        update=update.on_change('size_z')
     )
 
     # -------------------------------------------------------------------
@@ -111,14 +120,14 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
     cube_camera = BoolProperty(
         default=False,
         description="Sets field of view to 90° and render images in multiple directions",
-        update=update.update_cube_camera
+        update=update.on_change('cube_camera')
     )
 
     # Let the camera face the inside of the volume
     face_inside = BoolProperty(
         default=False,
         description="Make the cameras face inside.\nObjects are further away but are visible from more angles",
-        update=update.update_preview
+        update=update.on_change('face_inside')
     )
 
     # Resolution
@@ -126,13 +135,37 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
                         min=32,
                         max=1024 * 48,
                         description='X resolution of the output images',
-                        update=update.update_num_cameras)
+                        update=update.on_change('res_x'))
     res_y = IntProperty(default=1024,
                         min=32,
                         max=1024 * 48,
                         description='Y resolution of the output images',
-                        update=update.update_num_cameras)
+                        update=update.on_change('res_y'))
+
+
+    # Tiles per view, for views that do not fit in memory at once
+    tiles_x = IntProperty(default=1,
+                          min=1,
+                          max=64,
+                          description='Number of tiles in X direction each view is rendered in')
+    tiles_y = IntProperty(default=1,
+                          min=1,
+                          max=64,
+                          description='Number of tiles in Y direction each view is rendered in')
+
+    # Write all images of a frame into a single file
+    pack_output = BoolProperty(
+        name="Packed Output",
+        description="Write all images of a frame into a single lightfield.pack file instead of one file per view",
+    )
 
+    # List the poses in lightfield.json, next to the binary manifest lightfield.npz
+    export_json = BoolProperty(
+        name="Poses in JSON",
+        default=True,
+        description="List the pose of every view in lightfield.json.\n"
+                    "The poses are always written to lightfield.npz, which loads much faster for large rigs",
+    )
 
     # Dummies for keeping settings intact
     dummy_focal_length = FloatProperty()
@@ -161,7 +194,7 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
             ('d', "Down", "Put camera on down side"),
         ],
         default='f',
-        update=update.update_preview
+        update=update.on_change('camera_side')
     )
     # Preview facing
     camera_facing = EnumProperty(
@@ -175,7 +208,7 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
             ('d', "Down", "Face preview camera down"),
         ],
         default='f',
-        update=update.update_preview
+        update=update.on_change('camera_facing')
     )
     # Camera preview index
     camera_preview_index = FloatProperty(
@@ -183,7 +216,7 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
         min=0,
         max=100,
         subtype='PERCENTAGE',
-        update=update.update_preview
+        update=update.on_change('camera_preview_index')
     )
 
     # -------------------------------------------------------------------
@@ -231,25 +264,95 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
         :return: Object containing grid.
         """
         name = self.construct_names()['grid']
+        poses = self.pose_table()
 
-        # Mesh data
+        # Mesh data, filled in bulk with one vertex per camera.
         mesh = bpy.data.meshes.new(name)
+        mesh.vertices.add(len(poses))
+        # Store the camera orientations as well, so the grid fully describes the rig.
+        # Generic mesh attributes are only available from Blender 2.91 onwards.
+        if hasattr(mesh, 'attributes'):
+            mesh.attributes.new(self.GRID_ROTATION_ATTRIBUTE, 'FLOAT_VECTOR', 'POINT')
+        self.write_grid(mesh)
+
         # Object data
         grid = bpy.data.objects.new(name, mesh)
+        grid.hide_render = True
+
+        return grid
 
-        # Create bmesh to construct grid.
-        bm = bmesh.new()
+    def write_grid(self, mesh):
+        """
+        Write the camera poses into the vertices of an existing grid mesh with one vertex per camera.
 
-        # Add vertices
-        for cam_pos in self.position_generator():
-            bm.verts.new((cam_pos.x, cam_pos.y, cam_pos.z))
+        :param mesh: Grid mesh.
+        :return: Nothing.
+        """
+        poses = self.pose_table()
+        mesh.vertices.foreach_set('co', poses.positions.astype(np.float32).ravel())
+        if hasattr(mesh, 'attributes') and self.GRID_ROTATION_ATTRIBUTE in mesh.attributes:
+            attribute = mesh.attributes[self.GRID_ROTATION_ATTRIBUTE]
+            attribute.data.foreach_set('vector', poses.rotations.astype(np.float32).ravel())
+        mesh.update()
+
+    def benchmark_grid(self, sizes=(10000, 100000, 1000000)):
+        """
+        Measure how long it takes to create and to rewrite the grid of a rig with the given numbers of cameras.
+        Run from the Python console of Blender. Random poses stand in for the pose table of the lightfield
+        while it runs; the grids are removed again and the lightfield is not changed.
 
-        bm.to_mesh(mesh)
-        bm.free()
+        :return: Dictionary from number of cameras to seconds for (create_grid, write_grid).
+        """
+        key = (self.lf_type,) + self.pose_key()
+        old_poses = _pose_tables.pop(key, None)
+        results = {}
+        try:
+            for size in sizes:
+                rng = np.random.default_rng(size)
+                _pose_tables[key] = pose_array.PoseArray(rng.uniform(-1, 1, (size, 3)),
+                                                         rng.uniform(-np.pi, np.pi, (size, 3)), np.arange(size))
+                start = time.perf_counter()
+                grid = self.create_grid()
+                create_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                self.write_grid(grid.data)
+                write_time = time.perf_counter() - start
+
+                mesh = grid.data
+                bpy.data.objects.remove(grid)
+                bpy.data.meshes.remove(mesh)
+                results[size] = (create_time, write_time)
+                print("{} cameras: create_grid {:.3f} s, write_grid {:.3f} s".format(size, create_time, write_time))
+        finally:
+            _pose_tables.pop(key, None)
+            if old_poses is not None:
+                _pose_tables[key] = old_poses
+        return results
+
+    def get_size(self):
+        """
+        Size of the rig along its local axes.
 
-        grid.hide_render = True
+        :return: Array of 3 sizes.
+        """
+        return np.array([self.size_x, self.size_y, self.size_z])
 
-        return grid
+    def apply_size(self):
+        """
+        Scale the visuals of the space the rig occupies to the size of the rig.
+        The size is set as the parent inverse of the visuals, so they are scaled along the
+        axes of the lightfield whatever their own rotation, without changing their meshes.
+        The grid and the camera follow the poses instead.
+
+        :return: Nothing.
+        """
+        size = Matrix.Diagonal((self.size_x, self.size_y, self.size_z, 1.0))
+        for visual in self.obj_visuals:
+            obj = visual.obj_visual
+            if obj is None or obj == self.obj_grid or obj.type == 'EMPTY':
+                continue
+            obj.matrix_parent_inverse = size
 
     def default_construct(self):
         names = self.construct_names()
@@ -292,12 +395,16 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
         return visuals
 
     def set_camera_to_first_view(self):
-        gen = self.position_generator()
-        pos = next(gen)
-        del gen
+        pos = self.pose_at(0)
         self.obj_camera.location = pos.location()
         self.obj_camera.rotation_euler = pos.rotation()
 
+    def get_frame_numbers(self):
+        """Frames to render, a single frame if still."""
+        if self.sequence_start == self.sequence_end:
+            return [self.sequence_start]
+        return list(range(self.sequence_start, self.sequence_end + 1, self.sequence_steps))
+
     def get_output_directory(self, frame_number=None):
         if frame_number is None:
             frame_number = self.sequence_start
@@ -313,6 +420,9 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
     def get_path_config_file_json(self, frame_number=None):
         return os.path.join(self.get_output_directory(frame_number), "lightfield.json")
 
+    def get_path_pack_file(self, frame_number=None):
+        return os.path.join(self.get_output_directory(frame_number), "lightfield.pack")
+
     def get_output_image_directory(self, frame_number=None):
         subdir = self.get_image_type()
         return os.path.join(self.get_output_directory(frame_number), subdir) + "/"
@@ -362,28 +472,6 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
 
         return obj, camera
 
-    def recreate_camera(self, collection):
-        """
-        Recreate the camera after a scale is applied.
-
-        :param collection:
-        :return:
-        """
-        # Delete old camera object
-        bpy.data.objects.remove(self.obj_camera)
-
-        # Create new camera object
-        obj = bpy.data.objects.new(name=self.data_camera.name, object_data=self.data_camera)
-
-        # Link to scene
-        collection.objects.link(obj)
-
-        # Re-parent
-        obj.parent = self.obj_empty
-
-        # Update preview
-        bpy.ops.lightfield.update_preview('EXEC_DEFAULT')
-
     def create_camera_grid(self, collection):
         """
         Create a mesh for which the vertex coordinates and normals indicate camera positions.
@@ -402,10 +490,6 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
 
         return front_empty
 
-    def rescale_object(self, obj):
-        obj.scale = [self.size_x, self.size_y, self.size_z]
-        bpy.ops.object.transform_apply({'selected_objects': obj}, location=False, rotation=False, scale=True)
-
     def set_render_properties(self):
         """
         Set render properties to correct values.
@@ -448,70 +532,394 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
         old_file_format = rb.image_settings.file_format
         old_use_zbuffer = rb.image_settings.use_zbuffer
 
+        old_persistent_data = rb.use_persistent_data
+
+        # Check the rendered views on disk again.
+        render_journal.forget_journals()
+
         # Set some properties beforehand:
         self.set_render_properties()
         rb.use_file_extension = False
         extension = self.get_extension()
 
-        # Render frames if sequence, only 1 frame if still.
-        if self.sequence_start == self.sequence_end:
-            bpy.ops.lightfield.export_config(frame_number=self.sequence_start)
-            bpy.context.scene.frame_current = self.sequence_end
-            output_directory = self.get_output_image_directory()
-            self.render_time_frame(output_directory, extension)
-        else:
-            for i in range(self.sequence_start, self.sequence_end+1, self.sequence_steps):
-                bpy.ops.lightfield.export_config(frame_number=i)
-                bpy.context.scene.frame_current = i
-                output_directory = self.get_output_image_directory(frame_number=i)
-                self.render_time_frame(output_directory, extension)
+        # Keep the synced scene in memory between the views, only the camera moves.
+        if scene.lightfield_persistent_data:
+            rb.use_persistent_data = True
+
+        # Encode images in the background while the next view renders.
+        # Farm workers open their own pool.
+        if scene.lightfield_async_encoding and scene.lightfield_render_mode != 'FARM' and not scene.lightfield_dryrun:
+            encoder.open_pool(scene.lightfield_encode_threads, 2 * scene.lightfield_encode_threads)
+
+        timer = render_timer.RenderTimer()
+        timer.start()
+        try:
+            # Render frames if sequence, only 1 frame if still.
+            if scene.lightfield_dryrun:
+                planner.plan_render(self)
+            elif scene.lightfield_render_mode == 'FARM':
+                farm.render_farm(self,
+                                 scene.lightfield_farm_workers,
+                                 scene.lightfield_farm_threads,
+                                 scene.lightfield_farm_chunk_size,
+                                 scene.lightfield_farm_whole_frames)
+            elif scene.lightfield_render_mode == 'DISTRIBUTED':
+                leases.render_distributed(self,
+                                          self.get_frame_numbers(),
+                                          scene.lightfield_lease_views,
+                                          scene.lightfield_lease_seconds,
+                                          extension)
+            elif self.is_view_major():
+                animation.render_view_major(self, extension)
+            else:
+                self.render_sequence(extension)
+        finally:
+            try:
+                encoder.close_pool()
+            finally:
+                pack_file.close_writers()
+                timer.stop()
+                if scene.lightfield_render_mode != 'FARM' and not scene.lightfield_dryrun:
+                    print(timer.summary())
+                # Reset parameters
+                scene.camera = old_camera
+
+                rb.resolution_percentage = old_percentage
+                rb.border_min_x, rb.border_max_x, rb.border_min_y, rb.border_max_y = old_render_borders
+                rb.use_border = old_render_region
+                rb.use_crop_to_border = old_crop_to_region
+
+                rb.filepath = old_output
+                rb.use_file_extension = old_file_extension
+
+                rb.image_settings.file_format = old_file_format
+                rb.image_settings.use_zbuffer = old_use_zbuffer
+
+                rb.use_persistent_data = old_persistent_data
+
+    def render_sequence(self, extension):
+        """
+        Render all frames one after the other.
+        With static frame detection, a frame whose scene is identical to the previous frame
+        gets the images of that frame instead of being rendered.
 
-        # Reset parameters
-        bpy.context.scene.camera = old_camera
+        :param extension: File extension of the images.
+        :return: Nothing.
+        """
+        scene = bpy.context.scene
+        # Packs are finished at the end of the render, so they can not be linked.
+        detect_static = scene.lightfield_skip_static and not self.pack_output and \
+            self.sequence_start != self.sequence_end
+        # Fingerprint, source frame and image directory of the previous frame.
+        previous = None
+        for i in self.get_frame_numbers():
+            scene.frame_set(i)
+            session = render_session.RenderSession(self, i)
+            fingerprint = static_frames.scene_fingerprint(scene, self.obj_camera) if detect_static else None
+            if previous is not None and previous[0] == fingerprint:
+                print("Frame %d is identical to frame %d, linking its images." % (i, previous[1]))
+                session.begin(source_frame=previous[1])
+                session.update_poses()
+                static_frames.link_frame(self, session, previous[2], extension)
+                previous = (fingerprint, previous[1], session.image_directory)
+            else:
+                session.begin()
+                session.update_poses()
+                self.render_time_frame(session, extension)
+                previous = (fingerprint, i, session.image_directory) if detect_static else None
 
-        rb.resolution_percentage = old_percentage
-        rb.border_min_x, rb.border_max_x, rb.border_min_y, rb.border_max_y = old_render_borders
-        rb.use_border = old_render_region
-        rb.use_crop_to_border = old_crop_to_region
+    def render_time_frame(self, session, extension):
+        """
+        Render a single frame and put the result in output directory.
 
-        rb.filepath = old_output
-        rb.use_file_extension = old_file_extension
+        :param session: RenderSession of the frame.
+        :return: Nothing.
+        """
+
+        os.makedirs(session.image_directory, exist_ok=True)
 
-        rb.image_settings.file_format = old_file_format
-        rb.image_settings.use_zbuffer = old_use_zbuffer
+        # Render all views for a time-frame.
+        # The config is finished even when rendering fails, leaving a readable pose list.
+        scene = bpy.context.scene
+        try:
+            # Tiled views are rendered one by one.
+            if scene.lightfield_render_mode == 'MULTIVIEW' and not self.is_tiled():
+                self.render_time_frame_multiview(session, extension, scene.lightfield_batch_size)
+            else:
+                for i in range(len(session.poses)):
+                    self.render_view(session, i, extension)
+        finally:
+            session.finish()
 
-    def render_time_frame(self, output_directory, extension):
+    def render_time_frame_multiview(self, session, extension, batch_size):
         """
-        Render a single frame and put the result in output directory.
+        Render all views of the current frame in batches of multi-view render jobs.
+
+        :param session: RenderSession of the frame.
+        :param extension: File extension of the images.
+        :param batch_size: Number of views per render job.
+        :return: Nothing.
+        """
+        frame_number = session.frame_number
+        poses = session.poses
+
+        # Views that are skipped are still part of the config.
+        indices = []
+        for i in range(len(poses)):
+            if bpy.context.scene.lightfield_donotoverwrite and self.is_image_done(poses.name(i), frame_number):
+                print("View %s already rendered. Skipping." % poses.name(i))
+                session.append(i)
+            else:
+                indices.append(i)
+
+        if not indices:
+            return
+        batch = multiview.MultiViewBatch(self, min(batch_size, len(indices)))
+        try:
+            for start in range(0, len(indices), batch_size):
+                batch.render(session, indices[start:start + batch_size], extension)
+        finally:
+            batch.close()
+
+    def render_view(self, session, i, extension):
+        """
+        Record the i-th view of a frame in the config and render it.
+
+        :param session: RenderSession of the frame.
+        :param i: Index of the view.
+        :param extension: File extension of the image.
+        :return: Nothing.
+        """
+        cam_pos = session.poses.camera_position(i)
+        self.set_camera(cam_pos)
+        record = session.append(i)
+        self.render_image(cam_pos.name, session.image_directory, extension, record)
+
+    def render_image(self, name, output_directory, extension, record=None):
+        """
+        Render the current camera view to an image file.
 
+        :param name: Name of the view, used as file name.
         :param output_directory: Directory for output.
+        :param extension: File extension of the image.
+        :param record: Config record of the view, read from the camera if None.
+        :return: Nothing.
+        """
+        filename = name + extension
+        filepath = os.path.join(output_directory, filename)
+        frame_number = bpy.context.scene.frame_current
+        if bpy.context.scene.lightfield_donotoverwrite and self.is_image_done(name, frame_number):
+            print("View %s already rendered. Skipping." % filepath)
+            return
+
+        settings = bpy.context.scene.render.image_settings
+        pool = encoder.get_pool()
+        if pool is not None and not self.is_tiled() and encoder.can_encode(settings):
+            self.render_image_encoded(pool, name, filepath, frame_number, record)
+            return
+
+        # Render to a temporary file, so an interrupted write never leaves a partial image behind.
+        print("Rendering %s..." % filepath)
+        partial_filepath = filepath + ".part"
+        bpy.context.scene.render.filepath = partial_filepath
+        start = time.perf_counter()
+        if self.is_tiled():
+            tiles.TiledRender(self.tiles_x, self.tiles_y).render(partial_filepath)
+        else:
+            bpy.ops.render.render(write_still=True)
+        render_time = time.perf_counter() - start
+        os.replace(partial_filepath, filepath)
+        self.store_image(name, filepath, render_time, record or self.get_camera_record(name), frame_number)
+
+    def render_image_encoded(self, pool, name, filepath, frame_number, record=None):
+        """
+        Render the current camera view uncompressed and leave the encoding to the encoder pool.
+        The view is stored once its image is in place. Only for formats the pool can write,
+        see encoder.can_encode().
+
+        :param pool: EncodePool of the render.
+        :param name: Name of the view.
+        :param filepath: Path of the image.
+        :param frame_number: Frame being rendered.
+        :param record: Config record of the view, read from the camera if None.
         :return: Nothing.
         """
+        rb = bpy.context.scene.render
+        settings = rb.image_settings
+        old_file_format = settings.file_format
+        old_exr_codec = settings.exr_codec
+
+        if settings.file_format == 'OPEN_EXR':
+            settings.exr_codec = 'NONE'
+            source = filepath + ".raw.exr"
+        else:
+            settings.file_format = 'TARGA_RAW'
+            source = filepath + ".raw.tga"
+
+        print("Rendering %s..." % filepath)
+        rb.filepath = source
+        start = time.perf_counter()
+        try:
+            bpy.ops.render.render(write_still=True)
+        finally:
+            settings.file_format = old_file_format
+            settings.exr_codec = old_exr_codec
+        render_time = time.perf_counter() - start
+        record = record or self.get_camera_record(name)
+
+        pool.submit(source, filepath,
+                    image_io.png_compress_level(settings.compression),
+                    encoder.EXR_CODECS.get(old_exr_codec),
+                    lambda: self.store_image(name, filepath, render_time, record, frame_number))
+
+    def is_view_major(self):
+        """
+        Whether the sequence is rendered view by view, with one animation job per view.
+        Packed and tiled views are rendered frame by frame.
+        """
+        scene = bpy.context.scene
+        return scene.lightfield_view_major and scene.lightfield_render_mode == 'LOCAL' and \
+            self.sequence_start != self.sequence_end and not self.pack_output and not self.is_tiled()
 
-        os.makedirs(output_directory, exist_ok=True)
+    def is_tiled(self):
+        """Whether views are rendered in more than one tile."""
+        return self.tiles_x * self.tiles_y > 1
 
-        # Render all views for a time-frame.
-        for pos in self.position_generator():
-            self.render_view(pos, output_directory, extension)
+    def is_image_done(self, name, frame_number):
+        """
+        Whether the image of a view was completely written by an earlier render,
+        according to the pack or the journal of the frame.
+        """
+        if self.pack_output:
+            return self.get_pack(frame_number).contains(name)
+        return self.get_journal(frame_number).is_done(name)
+
+    def store_image(self, name, filepath, render_time, record, frame_number):
+        """
+        Book a view whose image was written to its final path.
+        With packed output, the image is moved into the pack of the frame.
+
+        :param name: Name of the view.
+        :param filepath: Path of the image.
+        :param render_time: Render time in seconds.
+        :param record: Config record of the view.
+        :param frame_number: Frame of the view.
+        :return: Nothing.
+        """
+        if self.pack_output:
+            self.get_pack(frame_number).add_file(name, filepath, record['position'], record['rotation'])
+            os.remove(filepath)
+        else:
+            self.get_journal(frame_number).record(name, filepath, render_time)
+
+    def get_pack(self, frame_number=None):
+        """
+        Writer of the pack holding all images of a frame.
+
+        :param frame_number: Frame of the pack.
+        :return: PackWriter.
+        """
+        return pack_file.get_writer(self.get_path_pack_file(frame_number), lambda: self.pose_table().name_array().tolist())
 
-    def render_view(self, cam_pos, output_directory, extension):
-        # TODO: setup all parameters
+    def get_journal(self, frame_number=None):
+        """
+        Journal of the views that were completely rendered for a frame.
+
+        :param frame_number: Frame of the journal.
+        :return: RenderJournal.
+        """
+        return render_journal.get_journal(os.path.join(self.get_output_directory(frame_number), "lightfield.journal"),
+                                          os.path.normpath(self.get_output_image_directory(frame_number)))
+
+    def set_camera(self, cam_pos):
+        """Move the camera to the given position."""
         self.obj_camera.location = cam_pos.location()
         self.obj_camera.rotation_euler = cam_pos.rotation()
 
-        frame_number = bpy.context.scene.frame_current
-        bpy.ops.lightfield.export_config_append(filename=cam_pos.name, frame_number=frame_number)
+    def get_camera_record(self, name, camera=None):
+        """
+        Config record of the current camera pose in world space.
 
-        filename = cam_pos.name + extension
-        filepath = os.path.join(output_directory, filename)
-        bpy.context.scene.render.filepath = filepath
-        exists = os.path.exists(filepath)
-        if not bpy.context.scene.lightfield_dryrun:
-            if not bpy.context.scene.lightfield_donotoverwrite or not exists:
-                print("Rendering %s..." % filepath)
-                bpy.ops.render.render(write_still=True)
-            else:
-                print("File %s already exists. Skipping." % filepath)
+        :param name: Name of the view.
+        :param camera: Camera object, the lightfield camera if None.
+        :return: Dictionary with name, position, rotation and world matrix.
+        """
+        matrix = (camera or self.obj_camera).matrix_world
+        return {
+            'name': name,
+            'position': list(matrix.to_translation()),
+            'rotation': list(matrix.to_euler()),
+            'world_matrix': [[matrix[r][c] for c in range(4)] for r in range(4)],
+        }
+
+    def pose_array(self):
+        """
+        Compute all camera poses at once.
+
+        :return: PoseArray with the poses in the local space of the lightfield.
+        """
+        raise NotImplementedError()
+
+    def pose_key(self):
+        """
+        Settings the camera poses depend on.
+
+        :return: Hashable tuple.
+        """
+        raise NotImplementedError()
+
+    def pose_table(self):
+        """
+        All camera poses, computed once for the current settings and shared by the
+        preview, the user interface and the render.
+
+        :return: PoseArray, which must not be modified.
+        """
+        key = (self.lf_type,) + self.pose_key()
+        poses = _pose_tables.get(key)
+        if poses is None:
+            poses = self.pose_array()
+            for array in (poses.positions, poses.rotations, poses.indices):
+                array.flags.writeable = False
+            _pose_tables[key] = poses
+            if len(_pose_tables) > POSE_TABLE_CACHE_SIZE:
+                _pose_tables.popitem(last=False)
+        else:
+            _pose_tables.move_to_end(key)
+        return poses
+
+    def pose_at(self, index):
+        """
+        Pose of a view.
+
+        :param index: Index of the view, in render order.
+        :return: CameraPosition.
+        """
+        return self.pose_table().camera_position(index)
+
+    def index_of(self, name):
+        """
+        Index of the view with the given name, in render order.
+        """
+        return self.pose_table().index_of(name)
+
+    def preview_index(self):
+        """
+        Index of the view selected by the preview slider.
+
+        :return: Index of the view, in render order.
+        """
+        return int(self.camera_preview_index * 0.01 * (len(self.pose_table()) - 1))
+
+    def grid_layout(self):
+        """
+        Layout of the views in row-major grids, for the config.
+        Each grid holds the side prefix of its view names, its shape (columns, rows)
+        and the index of its first view.
+
+        :return: List of grids, empty when the views are not on a grid.
+        """
+        return []
 
     def position_generator(self):
         """
@@ -519,7 +927,7 @@ class LightfieldPropertyGroup(bpy.types.PropertyGroup):
 
         :return: Next camera position.
         """
-        raise NotImplementedError()
+        yield from self.pose_table()
 
     def deconstruct(self):
         """
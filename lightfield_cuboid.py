@@ -2,13 +2,16 @@ import math
 import random
 import bpy
 import bmesh
-from .camera_position import CameraPosition
+import numpy as np
+from .pose_array import PoseArray, grid_indices
 
 from mathutils import Color
 from .lightfield import LightfieldPropertyGroup
 
 
 class LightfieldCuboid(LightfieldPropertyGroup):
+    # Order in which the sides are rendered.
+    SIDES = ['f', 'b', 'l', 'r', 'u', 'd']
 
     def construct(self):
         visuals = self.default_construct()
@@ -81,63 +84,75 @@ class LightfieldCuboid(LightfieldPropertyGroup):
         return side_map
 
 
-    def position_generator(self):
-        # TODO: implement cube-map render
-        sides = ['f', 'b', 'l', 'r', 'u', 'd']
+    def get_side_offset(self, side):
+        """Index of the first view of the given side."""
+        offset = 0
         side_map = self.get_side_map()
-        for s in sides:
-            local_x_dir = side_map[s][0]
-            local_y_dir = side_map[s][1]
-            for local_y in range(local_y_dir):
-                for local_x in range(local_x_dir):
-                    yield self.get_camera_pos(s, local_x, local_y)
-
-    def get_camera_pos(self, side, x, y):
-        base_x = 1 / (self.num_cams_x - 1)
-        base_y = 1 / (self.num_cams_y - 1)
-        base_z = 1 / (self.num_cams_z - 1)
+        for s in self.SIDES:
+            if s == side:
+                return offset
+            offset += side_map[s][0] * side_map[s][1]
+        raise KeyError(side)
 
-        if side == 'f':
-            return CameraPosition("view_{}{:04d}f".format(side, y * self.num_cams_x + x),
-                                  -0.5 + x * base_x,
-                                   0.5,
-                                   0.5 - y * base_z,
-                                   alpha=0.5 * math.pi)
+    def grid_layout(self):
+        side_map = self.get_side_map()
+        return [{'side': s, 'shape': list(side_map[s]), 'offset': self.get_side_offset(s)} for s in self.SIDES]
 
-        elif side == 'b':
-            return CameraPosition("view_{}{:04d}f".format(side, y * self.num_cams_x + x),
-                                   0.5 - x * base_x,
-                                  -0.5,
-                                   0.5 - y * base_z,
-                                  alpha=0.5 * math.pi,
-                                  phi=math.pi)
+    def pose_key(self):
+        return self.num_cams_x, self.num_cams_y, self.num_cams_z, self.size_x, self.size_y, self.size_z
 
-        elif side == 'l':
-            return CameraPosition("view_{}{:04d}f".format(side, y * self.num_cams_y + x),
-                                  -0.5,
-                                  -0.5 + x * base_y,
-                                   0.5 - y * base_z,
-                                  alpha=0.5 * math.pi,
-                                  phi=math.pi / 2)
+    def preview_index(self):
+        # The slider selects a view of the chosen side.
+        num_x, num_y = self.get_side_map()[self.camera_side]
+        return self.get_side_offset(self.camera_side) + int(self.camera_preview_index * 0.01 * (num_x * num_y - 1))
 
+    def pose_array(self):
+        # TODO: implement cube-map render
+        side_map = self.get_side_map()
+        poses = PoseArray.concatenate([self.side_pose_array(s, *side_map[s]) for s in self.SIDES])
+        # The faces stay axis aligned, so only the positions change with the size.
+        poses.positions *= self.get_size()
+        return poses
+
+    def side_pose_array(self, side, num_x, num_y):
+        x, y = grid_indices(num_x, num_y)
+        base_x = x / (self.num_cams_x - 1)
+        base_y = y / (self.num_cams_y - 1)
+        base_z = y / (self.num_cams_z - 1)
+
+        positions = np.empty((len(x), 3))
+        rotations = np.zeros((len(x), 3))
+        if side == 'f':
+            positions[:, 0] = -0.5 + base_x
+            positions[:, 1] = 0.5
+            positions[:, 2] = 0.5 - base_z
+            rotations[:, 0] = 0.5 * math.pi
+        elif side == 'b':
+            positions[:, 0] = 0.5 - base_x
+            positions[:, 1] = -0.5
+            positions[:, 2] = 0.5 - base_z
+            rotations[:, 0] = 0.5 * math.pi
+            rotations[:, 2] = math.pi
+        elif side == 'l':
+            positions[:, 0] = -0.5
+            positions[:, 1] = -0.5 + x / (self.num_cams_y - 1)
+            positions[:, 2] = 0.5 - base_z
+            rotations[:, 0] = 0.5 * math.pi
+            rotations[:, 2] = math.pi / 2
         elif side == 'r':
-            return CameraPosition("view_{}{:04d}f".format(side, y * self.num_cams_y + x),
-                                   0.5,
-                                   0.5 - x * base_y,
-                                   0.5 - y * base_z,
-                                  alpha=0.5 * math.pi,
-                                  phi=-math.pi / 2)
-
+            positions[:, 0] = 0.5
+            positions[:, 1] = 0.5 - x / (self.num_cams_y - 1)
+            positions[:, 2] = 0.5 - base_z
+            rotations[:, 0] = 0.5 * math.pi
+            rotations[:, 2] = -math.pi / 2
         elif side == 'u':
-            return CameraPosition("view_{}{:04d}f".format(side, y * self.num_cams_x + x),
-                                   0.5 - x * base_x,
-                                  -0.5 + y * base_y,
-                                   0.5,
-                                  alpha=math.pi)
-
+            positions[:, 0] = 0.5 - base_x
+            positions[:, 1] = -0.5 + base_y
+            positions[:, 2] = 0.5
+            rotations[:, 0] = math.pi
         elif side == 'd':
-            return CameraPosition("view_{}{:04d}f".format(side, y * self.num_cams_x + x),
-                                  -0.5 + x * base_x,
-                                   0.5 - y * base_y,
-                                  -0.5
-                                  )
+            positions[:, 0] = -0.5 + base_x
+            positions[:, 1] = 0.5 - base_y
+            positions[:, 2] = -0.5
+
+        return PoseArray(positions, rotations, np.arange(len(x)), np.full(len(x), side))
@@ -2,7 +2,8 @@ import random
 import math
 import bpy
 import bmesh
-from .camera_position import CameraPosition
+import numpy as np
+from .pose_array import PoseArray, grid_indices
 
 from mathutils import Color
 from .lightfield import LightfieldPropertyGroup
@@ -111,18 +112,25 @@ class LightfieldCylinder(LightfieldPropertyGroup):
                 'front': "{}_Front".format(base),
                 'edges': "{}_Edges".format(base)}
 
-    def position_generator(self):
-        # TODO: implement cube-map render
-        for y in range(self.num_cams_y):
-            for r in range(self.num_cams_radius):
-                yield self.get_camera_pos(y, r)
+    def grid_layout(self):
+        return [{'side': '', 'shape': [self.num_cams_radius, self.num_cams_y], 'offset': 0}]
+
+    def pose_key(self):
+        return self.num_cams_radius, self.num_cams_y, self.face_inside, self.size_x, self.size_y, self.size_z
 
-    def get_camera_pos(self, y, r):
-        base_y = 1 / (self.num_cams_y - 1)
+    def pose_array(self):
+        # TODO: implement cube-map render
+        r, y = grid_indices(self.num_cams_radius, self.num_cams_y)
         angle = r * 2 * math.pi / self.num_cams_radius
-        return CameraPosition("view_{:04d}f".format(y * self.num_cams_radius + r),
-                               0.5 * math.sin(angle),
-                               0.5 * math.cos(angle),
-                               0.5 - y * base_y,
-                              alpha=0.5*math.pi,
-                              phi=-angle + (math.pi if self.face_inside else 0))
+        positions = np.empty((len(r), 3))
+        positions[:, 0] = 0.5 * np.sin(angle)
+        positions[:, 1] = 0.5 * np.cos(angle)
+        positions[:, 2] = 0.5 - y / (self.num_cams_y - 1)
+        positions *= self.get_size()
+        # Cameras look along the normal of the (elliptic) cylinder.
+        normal_angle = np.arctan2(np.sin(angle) / self.size_x, np.cos(angle) / self.size_y)
+        normal_angle += 2 * math.pi * np.round((angle - normal_angle) / (2 * math.pi))
+        rotations = np.zeros((len(r), 3))
+        rotations[:, 0] = 0.5 * math.pi
+        rotations[:, 2] = -normal_angle + (math.pi if self.face_inside else 0)
+        return PoseArray(positions, rotations, np.arange(len(r)))
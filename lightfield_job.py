@@ -0,0 +1,14 @@
+# Command line entry point for rendering a lightfield from a json job manifest:
+#   blender --background scene.blend --python lightfield_job.py -- job.json [--result result.json]
+# Blender exits with the exit code of the job, see cli.py.
+# This file is run as a script, not imported as part of the add-on.
+import os
+import sys
+
+import addon_utils
+
+package = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+if not addon_utils.check(package)[1]:
+    addon_utils.enable(package, default_set=False)
+
+sys.exit(sys.modules[package].cli.main(sys.argv[sys.argv.index("--") + 1:]))
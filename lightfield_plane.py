@@ -2,10 +2,11 @@ import math
 import random
 import bpy
 import bmesh
+import numpy as np
 from mathutils import Color
 
 from .lightfield import LightfieldPropertyGroup
-from .camera_position import CameraPosition
+from .pose_array import PoseArray, grid_indices
 
 
 class LightfieldPlane(LightfieldPropertyGroup):
@@ -80,18 +81,19 @@ class LightfieldPlane(LightfieldPropertyGroup):
                 'space': "{}_Space".format(base),
                 'front': "{}_Front".format(base)}
 
-    def position_generator(self):
-        cube = self.cube_camera
-        for y in range(self.num_cams_y):
-            for x in range(self.num_cams_x):
-                # TODO: implement cube_camera in plane lightfield
-                yield self.get_camera_pos(x, y)
-
-    def get_camera_pos(self, x, y):
-        base_x = 1 / (self.num_cams_x - 1)
-        base_y = 1 / (self.num_cams_y - 1)
-        return CameraPosition("view_{:04d}f".format(y * self.num_cams_x + x),
-                              -0.5 + x * base_x,
-                              0.0,
-                              0.5 - y * base_y,
-                              alpha=0.5*math.pi)
+    def grid_layout(self):
+        return [{'side': '', 'shape': [self.num_cams_x, self.num_cams_y], 'offset': 0}]
+
+    def pose_key(self):
+        return self.num_cams_x, self.num_cams_y, self.size_x, self.size_z
+
+    def pose_array(self):
+        x, y = grid_indices(self.num_cams_x, self.num_cams_y)
+        # TODO: implement cube_camera in plane lightfield
+        positions = np.zeros((len(x), 3))
+        positions[:, 0] = -0.5 + x / (self.num_cams_x - 1)
+        positions[:, 2] = 0.5 - y / (self.num_cams_y - 1)
+        positions *= self.get_size()
+        rotations = np.zeros((len(x), 3))
+        rotations[:, 0] = 0.5 * math.pi
+        return PoseArray(positions, rotations, np.arange(len(x)))
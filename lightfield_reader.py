@@ -0,0 +1,333 @@
+"""
+Standalone reader for rendered light fields, usable in plain Python without Blender.
+
+Copy this file together with manifest.py, pack_file.py and image_io.py, or put the add-on
+directory on sys.path, and open the output directory of a frame:
+
+    from lightfield_reader import LightfieldDataset
+
+    lf = LightfieldDataset("output/Lightfield/")
+    lf.world_matrices      # N x 4 x 4 camera to world matrices
+    image = lf[0]          # first view
+    image = lf[2, 1]       # view at column 2, row 1 of the grid
+    for index, image in lf.iter_images(prefetch=8):
+        ...
+
+Only NumPy is required. PNG images are decoded with imageio or Pillow when one of
+them is installed; OpenEXR images with ZIP, ZIPS or no compression are decoded
+without extra packages.
+"""
+import collections
+import concurrent.futures
+import csv
+import io
+import json
+import os
+import struct
+
+import numpy as np
+
+# Relative imports only work when the add-on is loaded as a package in Blender.
+try:
+    from . import image_io, manifest, pack_file
+except ImportError:
+    import image_io
+    import manifest
+    import pack_file
+
+CONFIG_MANIFEST = "lightfield.npz"
+CONFIG_JSON = "lightfield.json"
+CONFIG_CSV = "lightfield.cfg"
+PACK = "lightfield.pack"
+
+
+def read_json_config(path):
+    """
+    Read lightfield.json, including the frames of a render that did not finish.
+
+    :return: Config dictionary.
+    """
+    with open(path, mode='r') as json_file:
+        cfg = json.load(json_file)
+    # Views of an unfinished render are listed in a sidecar.
+    frames_path = os.path.splitext(path)[0] + ".frames.jsonl"
+    if os.path.exists(frames_path):
+        with open(frames_path, mode='r') as frames_file:
+            cfg['frames'].extend(json.loads(line) for line in frames_file if line.endswith("\n"))
+    return cfg
+
+
+def is_manifest_current(directory):
+    """
+    Whether the manifest of a frame directory holds its config. The manifest is written after
+    lightfield.json, so an older manifest belongs to an earlier render, and while the sidecar
+    of an unfinished render exists, its views are only listed in the json and the sidecar.
+
+    :return: True if lightfield.npz can be read instead of lightfield.json.
+    """
+    path_manifest = os.path.join(directory, CONFIG_MANIFEST)
+    path_json = os.path.join(directory, CONFIG_JSON)
+    if not os.path.exists(path_manifest):
+        return False
+    if os.path.exists(os.path.splitext(path_json)[0] + ".frames.jsonl"):
+        return False
+    return not os.path.exists(path_json) or os.path.getmtime(path_manifest) >= os.path.getmtime(path_json)
+
+
+def read_csv_config(path):
+    """
+    Read lightfield.cfg into the layout of lightfield.json.
+    World matrices are computed from the positions and rotations.
+    The cfg does not hold the number of cameras per axis, so the config has no grid.
+
+    :return: Config dictionary.
+    """
+    with open(path, mode='r', newline='') as csv_file:
+        rows = list(csv.reader(csv_file, delimiter=','))
+    camera = dict(zip(rows[0], rows[1]))
+    for key, value in camera.items():
+        try:
+            camera[key] = float(value)
+        except ValueError:
+            pass
+    cfg = {
+        'camera': camera,
+        'lf_type': rows[2][0],
+        'resolution': [int(v) for v in rows[3]],
+        'sensor_size': [float(v) for v in rows[5]],
+    }
+    start = rows.index(["projection_matrix"]) + 1
+    if camera['type'] == 'PERSP':
+        camera['projection_matrix'] = [[float(v) for v in row] for row in rows[start:start + 4]]
+    frames_start = rows.index(["name", "x", "y", "z", "rot_x", "rot_y", "rot_z"]) + 1
+    cfg['frames'] = [{'name': row[0],
+                      'position': [float(v) for v in row[1:4]],
+                      'rotation': [float(v) for v in row[4:7]]}
+                     for row in rows[frames_start:] if row]
+    return cfg
+
+
+def read_config_arrays(path):
+    """
+    Read a config into arrays, memory-mapping the binary manifest when there is one.
+
+    :param path: Path of lightfield.npz, lightfield.json or lightfield.cfg.
+    :return: Header dictionary and dictionary of arrays, as manifest.load_manifest() returns them.
+    """
+    if path.endswith(".npz"):
+        return manifest.load_manifest(path)
+    cfg = read_json_config(path) if path.endswith(".json") else read_csv_config(path)
+
+    # The frames of a json config without frames are in the manifest.
+    path_manifest = os.path.join(os.path.dirname(path), cfg.get('manifest', CONFIG_MANIFEST))
+    if 'manifest' in cfg and os.path.exists(path_manifest):
+        if not cfg['frames']:
+            return manifest.load_manifest(path_manifest)
+        cfg['frames'] = manifest.read_frame_records(path_manifest) + cfg['frames']
+
+    frames = cfg.pop('frames')
+    positions = np.array([frame['position'] for frame in frames], dtype=np.float64).reshape(-1, 3)
+    rotations = np.array([frame['rotation'] for frame in frames], dtype=np.float64).reshape(-1, 3)
+    if frames and 'world_matrix' in frames[0]:
+        world_matrices = np.array([frame['world_matrix'] for frame in frames], dtype=np.float64)
+    else:
+        world_matrices = np.zeros((len(frames), 4, 4))
+        world_matrices[:, :3, :3] = manifest.euler_to_matrix(rotations)
+        world_matrices[:, :3, 3] = positions
+        world_matrices[:, 3, 3] = 1.0
+    arrays = {
+        'names': np.array([frame['name'] for frame in frames], dtype=str),
+        'positions': positions,
+        'rotations': rotations,
+        'world_matrices': world_matrices,
+    }
+    if 'projection_matrix' in cfg['camera']:
+        arrays['projection_matrix'] = np.array(cfg['camera']['projection_matrix'], dtype=np.float64)
+        arrays['intrinsics'] = manifest.intrinsics_from_projection(arrays['projection_matrix'], cfg['resolution'])
+    return cfg, arrays
+
+
+def decode_image(data, extension):
+    """
+    Decode an image file.
+
+    :param data: Contents of the image file.
+    :param extension: '.png' or '.exr'.
+    :return: height x width x channels array.
+    """
+    if extension == ".exr":
+        try:
+            return image_io.read_exr(io.BytesIO(data))[1]
+        except ValueError:
+            # Other compressions need imageio.
+            pass
+    try:
+        import imageio.v3 as iio
+        return np.asarray(iio.imread(bytes(data), extension=extension))
+    except ImportError:
+        pass
+    try:
+        from PIL import Image
+        return np.asarray(Image.open(io.BytesIO(data)))
+    except ImportError:
+        raise ImportError("Install imageio or Pillow to decode {} images".format(extension))
+
+
+class LightfieldDataset:
+    """
+    The views of one rendered frame of a light field.
+
+    Camera data is loaded into arrays when the dataset is opened; images are only
+    read when they are asked for, from the image directory or from lightfield.pack.
+
+    Conventions:
+        world_matrices   camera to world, Blender cameras look along -Z with +Y up
+        intrinsics       3 x 3 pixel matrix for cameras with x right, y down, z forward
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Output directory of a frame, or the path of its lightfield.npz, lightfield.json
+            or lightfield.cfg. For a directory, the first of these that exists is read,
+            skipping a manifest that is not current, see is_manifest_current().
+        """
+        if os.path.isdir(path):
+            directory = path
+            names = (CONFIG_MANIFEST, CONFIG_JSON, CONFIG_CSV) if is_manifest_current(directory) \
+                else (CONFIG_JSON, CONFIG_CSV)
+            for name in names:
+                path = os.path.join(directory, name)
+                if os.path.exists(path):
+                    break
+        else:
+            directory = os.path.dirname(path)
+        self.directory = directory
+        header, arrays = read_config_arrays(path)
+
+        self.camera = header['camera']
+        self.lf_type = header['lf_type']
+        self.resolution = tuple(header['resolution'])
+        self.sensor_size = tuple(header['sensor_size'])
+        # None when the config does not describe the grid, as for lightfield.cfg.
+        self.grid = header.get('grid')
+
+        self.names = arrays['names']
+        self.positions = arrays['positions']
+        self.rotations = arrays['rotations']
+        self.world_matrices = arrays['world_matrices']
+        self.projection_matrix = arrays.get('projection_matrix')
+        self.intrinsics = arrays.get('intrinsics')
+        self.indices = None
+
+        self.pack = None
+        if os.path.exists(os.path.join(directory, PACK)):
+            self.pack = pack_file.PackReader(os.path.join(directory, PACK))
+        self.extension = ".png"
+        for extension in (".png", ".exr"):
+            if os.path.isdir(os.path.join(directory, extension[1:])):
+                self.extension = extension
+        if self.pack is not None and self.pack.names():
+            magic = bytes(self.pack.view(self.pack.names()[0])[:4])
+            self.extension = ".exr" if magic == struct.pack('<i', image_io.EXR_MAGIC) else ".png"
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, key):
+        return self.load_image(self.get_index(key))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_indices(self):
+        """Dictionary from view name to index, built on first use."""
+        if self.indices is None:
+            self.indices = {str(name): i for i, name in enumerate(self.names)}
+        return self.indices
+
+    def get_index(self, key):
+        """
+        Index of a view.
+
+        :param key: Index, name, grid coordinate (x, y) or (side, x, y).
+        :return: Index in the arrays of the dataset.
+        """
+        if isinstance(key, str):
+            return self.get_indices()[key]
+        if isinstance(key, tuple):
+            return self.grid_index(*key)
+        return range(len(self))[key]
+
+    def grid_index(self, *coordinate):
+        """
+        Index of the view at a grid coordinate.
+
+        :param coordinate: (x, y), or (side, x, y) for cuboids.
+        :return: Index in the arrays of the dataset.
+        """
+        if self.grid is None:
+            raise ValueError("Light fields read from lightfield.cfg have no grid, "
+                             "read lightfield.json or lightfield.npz for grid coordinates")
+        side, x, y = coordinate if len(coordinate) == 3 else ('',) + coordinate
+        for grid in self.grid:
+            if grid['side'] == side:
+                columns, rows = grid['shape']
+                if not (0 <= x < columns and 0 <= y < rows):
+                    raise IndexError("Grid coordinate ({}, {}) out of range".format(x, y))
+                name = "view_{}{:04d}f".format(side, y * columns + x)
+                return self.get_indices()[name]
+        raise KeyError("No grid {!r} in this light field".format(side))
+
+    def image_path(self, key):
+        """Path of the image of a view, when images are stored as separate files."""
+        return os.path.join(self.directory, self.extension[1:], self.names[self.get_index(key)] + self.extension)
+
+    def read_bytes(self, key):
+        """
+        Contents of the image file of a view, without decoding.
+
+        :return: bytes or memoryview.
+        """
+        name = str(self.names[self.get_index(key)])
+        if self.pack is not None and name in self.pack:
+            return self.pack.view(name)
+        with open(self.image_path(name), mode='rb') as f:
+            return f.read()
+
+    def load_image(self, key):
+        """
+        Decode the image of a view.
+
+        :return: height x width x channels array.
+        """
+        return decode_image(self.read_bytes(key), self.extension)
+
+    def iter_images(self, indices=None, prefetch=4, num_threads=2):
+        """
+        Iterate over the images of views, loading the next ones in background threads.
+        At most prefetch images are held in memory besides the one being used.
+
+        :param indices: Keys of the views, all views by default.
+        :param prefetch: Number of images loaded ahead.
+        :param num_threads: Number of loading threads.
+        :return: Generator of (index, image).
+        """
+        indices = [self.get_index(key) for key in (range(len(self)) if indices is None else indices)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+            pending = collections.deque()
+            for index in indices:
+                pending.append((index, executor.submit(self.load_image, index)))
+                if len(pending) > prefetch:
+                    index, future = pending.popleft()
+                    yield index, future.result()
+            while pending:
+                index, future = pending.popleft()
+                yield index, future.result()
+
+    def close(self):
+        if self.pack is not None:
+            self.pack.close()
+            self.pack = None
@@ -1,12 +1,16 @@
 import random
 import bpy
-from .camera_position import CameraPosition
+import numpy as np
+from .pose_array import PoseArray, normal_rotations
+from . import icosphere
 
-from mathutils import Color, Vector, Matrix
+from mathutils import Color
 from .lightfield import LightfieldPropertyGroup
 
 
 class LightfieldSphere(LightfieldPropertyGroup):
+    # The space visual does not need to be as dense as the camera grid.
+    MAX_SPACE_SUBDIVISIONS = 6
 
     def construct(self):
         visuals = self.default_construct()
@@ -33,32 +37,6 @@ class LightfieldSphere(LightfieldPropertyGroup):
 
         return [grid, space, front]
 
-    def create_grid(self):
-        """
-        Create the visual grid indicating all the camera positions.
-
-        :return: Object containing grid.
-        """
-        name = self.construct_names()['grid']
-
-        # Remember selected objects
-        # selected = bpy.context.selected_objects
-
-        # Object data
-        bpy.ops.mesh.primitive_ico_sphere_add(location=(0.0, 0.0, 0.0), subdivisions=self.num_cams_subdiv, radius=0.5)
-        grid = bpy.context.active_object
-        bpy.ops.object.editmode_toggle()
-
-        bpy.ops.mesh.delete(type='EDGE_FACE')
-        bpy.ops.object.editmode_toggle()
-        grid.name = name
-        # Unlink the object from its current collection
-        grid.users_collection[0].objects.unlink(grid)
-
-        grid.hide_render = True
-
-        return grid
-
     def create_space(self):
         """
         Create visual that represents the space the lightfield is occupying.
@@ -67,7 +45,8 @@ class LightfieldSphere(LightfieldPropertyGroup):
         """
 
         name = self.construct_names()['space']
-        bpy.ops.mesh.primitive_ico_sphere_add(location=(0.0, 0.0, 0.0), subdivisions=self.num_cams_subdiv, radius=0.5)
+        subdivisions = min(self.num_cams_subdiv, self.MAX_SPACE_SUBDIVISIONS)
+        bpy.ops.mesh.primitive_ico_sphere_add(location=(0.0, 0.0, 0.0), subdivisions=subdivisions, radius=0.5)
         space = bpy.context.object
         bpy.ops.object.shade_smooth()
         space.name = name
@@ -96,34 +75,15 @@ class LightfieldSphere(LightfieldPropertyGroup):
                 'front': "{}_Front".format(base),
                 'edges': "{}_Edges".format(base)}
 
-    def position_generator(self):
+    def pose_key(self):
+        return self.num_cams_subdiv, self.face_inside, self.size_x, self.size_y, self.size_z
+
+    def pose_array(self):
         # TODO: implement cube-map render
-        for index in range(len(self.obj_grid.data.vertices)):
-            yield self.get_camera_pos(index)
-
-    def get_camera_pos(self, index):
-        vertex = self.obj_grid.data.vertices[index]
-
-        normal = vertex.normal
-
-        z = Vector([0.0, 0.0, 1.0])
-        side = z.cross(normal)
-        if side.length <= 0.0001:
-            z = Vector([0.0, 1.0, 0.0])
-            side = z.cross(normal)
-
-        up = side.cross(normal)
-
-        basis = Matrix.Identity(3)
-        basis.col[0] = side if self.face_inside else -side
-        basis.col[1] = -up
-        basis.col[2] = normal if self.face_inside else -normal
-        euler = basis.to_euler()
-
-        return CameraPosition("view_{:04d}f".format(index),
-                              vertex.co[0],
-                              vertex.co[1],
-                              vertex.co[2],
-                              alpha=euler[0],
-                              theta=euler[1],
-                              phi=euler[2])
+        vertices = icosphere.icosphere_vertices(self.num_cams_subdiv)
+        size = self.get_size()
+        # Cameras look along the normal of the (ellipsoidal) sphere.
+        normals = vertices / size
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        rotations = normal_rotations(normals, self.face_inside)
+        return PoseArray(0.5 * vertices * size, rotations, np.arange(len(vertices)))
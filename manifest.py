@@ -0,0 +1,149 @@
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+# Members of the manifest:
+#   header              json of the config without frames, as a 0-d string array
+#   names               N view names
+#   positions           N x 3 world locations
+#   rotations           N x 3 world euler rotations
+#   world_matrices      N x 4 x 4 camera to world matrices
+#   projection_matrix   4 x 4, perspective cameras only
+#   intrinsics          3 x 3 pixel intrinsics, perspective cameras only
+# The members are stored without compression, so they can be memory-mapped.
+
+
+def get_path_manifest(path_json):
+    """Return the path of the binary manifest belonging to a json config file."""
+    return os.path.splitext(path_json)[0] + ".npz"
+
+
+def euler_to_matrix(rotations):
+    """
+    Rotation matrices of XYZ euler angles, as Blender composes them.
+
+    :param rotations: N x 3 angles in radians.
+    :return: N x 3 x 3 matrices.
+    """
+    cx, cy, cz = np.cos(rotations).T
+    sx, sy, sz = np.sin(rotations).T
+    matrices = np.empty((len(rotations), 3, 3))
+    matrices[:, 0, 0] = cy * cz
+    matrices[:, 0, 1] = sx * sy * cz - cx * sz
+    matrices[:, 0, 2] = cx * sy * cz + sx * sz
+    matrices[:, 1, 0] = cy * sz
+    matrices[:, 1, 1] = sx * sy * sz + cx * cz
+    matrices[:, 1, 2] = cx * sy * sz - sx * cz
+    matrices[:, 2, 0] = -sy
+    matrices[:, 2, 1] = sx * cy
+    matrices[:, 2, 2] = cx * cy
+    return matrices
+
+
+def intrinsics_from_projection(projection_matrix, resolution):
+    """
+    Pixel intrinsics of a perspective camera, for cameras with x right, y down and z forward.
+
+    :param projection_matrix: 4 x 4 projection matrix of the Blender camera.
+    :param resolution: Width and height in pixels.
+    :return: 3 x 3 matrix.
+    """
+    p = np.asarray(projection_matrix, dtype=np.float64)
+    width, height = resolution
+    return np.array([[p[0, 0] * width / 2, 0.0, (1 - p[0, 2]) * width / 2],
+                     [0.0, p[1, 1] * height / 2, (1 + p[1, 2]) * height / 2],
+                     [0.0, 0.0, 1.0]])
+
+
+def write_manifest(path, header, frames):
+    """
+    Write the poses of all views as arrays, replacing the file at once.
+
+    :param path: Path of the manifest.
+    :param header: Json config without frames.
+    :param frames: Frame records as in lightfield.json.
+    :return: Nothing.
+    """
+    write_manifest_arrays(path, header,
+                          [frame['name'] for frame in frames],
+                          [frame['position'] for frame in frames],
+                          [frame['rotation'] for frame in frames],
+                          [frame['world_matrix'] for frame in frames])
+
+
+def write_manifest_arrays(path, header, names, positions, rotations, world_matrices):
+    """
+    Write the poses of all views, given as arrays, replacing the file at once.
+
+    :return: Nothing.
+    """
+    arrays = {
+        'header': np.array(json.dumps(header)),
+        'names': np.array(names, dtype=str),
+        'positions': np.asarray(positions, dtype=np.float64).reshape(-1, 3),
+        'rotations': np.asarray(rotations, dtype=np.float64).reshape(-1, 3),
+        'world_matrices': np.asarray(world_matrices, dtype=np.float64).reshape(-1, 4, 4),
+    }
+    projection_matrix = header.get('camera', {}).get('projection_matrix')
+    if projection_matrix is not None:
+        arrays['projection_matrix'] = np.array(projection_matrix, dtype=np.float64)
+        arrays['intrinsics'] = intrinsics_from_projection(projection_matrix, header['resolution'])
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode='wb') as tmp_file:
+        np.savez(tmp_file, **arrays)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path, mmap=True):
+    """
+    Load a manifest. Arrays are memory-mapped, so loading takes about as long
+    for a million views as for ten.
+
+    :param path: Path of the manifest.
+    :param mmap: Map the arrays instead of reading them.
+    :return: Header dictionary and dictionary of arrays.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, mode='rb') as f:
+        for info in archive.infolist():
+            key = info.filename[:-len(".npy")]
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[key] = np.lib.format.read_array(member)
+                continue
+            # The array data follows the local file header and the npy header.
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            if np.lib.format.read_magic(f) == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError("Manifest member {} holds Python objects".format(key))
+            if 0 in shape:
+                arrays[key] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[key] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                        order='F' if fortran_order else 'C')
+    header = json.loads(str(arrays.pop('header')[()]))
+    return header, arrays
+
+
+def read_frame_records(path):
+    """
+    Frame records of a manifest, in the layout of lightfield.json.
+
+    :return: List of frame dictionaries.
+    """
+    _, arrays = load_manifest(path, mmap=False)
+    return [{'name': str(name), 'position': position.tolist(), 'rotation': rotation.tolist(),
+             'world_matrix': world_matrix.tolist()}
+            for name, position, rotation, world_matrix in
+            zip(arrays['names'], arrays['positions'], arrays['rotations'], arrays['world_matrices'])]
@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+import time
+
+import bpy
+from . import render_journal, render_session
+
+
+class MultiViewBatch:
+    """
+    Render several views of a lightfield in a single render job, using Blender's multi-view.
+
+    Every view of a batch gets its own temporary camera object, named after a shared
+    base name plus the camera suffix of a custom render view. The scene is synced
+    once per batch instead of once per view.
+    Blender writes one image per render view, with the suffix inserted before the
+    extension; those images are renamed to the names of the lightfield views.
+    """
+
+    def __init__(self, lf, batch_size):
+        self.lf = lf
+        self.batch_size = batch_size
+        scene = bpy.context.scene
+        rb = scene.render
+
+        # Store now to reset later.
+        self.old_camera = scene.camera
+        self.old_use_multiview = rb.use_multiview
+        self.old_views_format = rb.views_format
+        self.old_image_views_format = rb.image_settings.views_format
+        self.old_view_use = [(view, view.use) for view in rb.views]
+
+        rb.use_multiview = True
+        rb.views_format = 'MULTIVIEW'
+        rb.image_settings.views_format = 'INDIVIDUAL'
+        for view, _ in self.old_view_use:
+            view.use = False
+
+        base = lf.obj_camera.name + "_batch"
+        self.cameras = []
+        self.views = []
+        for i in range(batch_size):
+            suffix = "_{:04d}".format(i)
+            camera = bpy.data.objects.new(name=base + suffix, object_data=lf.data_camera)
+            if camera.name != base + suffix:
+                bpy.data.objects.remove(camera)
+                self.close()
+                raise NameError("Object {} already exists, cannot set up multi-view cameras".format(base + suffix))
+            lf.obj_camera.users_collection[0].objects.link(camera)
+            camera.parent = lf.obj_empty
+            camera.hide_select = True
+            self.cameras.append(camera)
+
+            view = rb.views.new(base + suffix)
+            view.camera_suffix = suffix
+            self.views.append(view)
+
+        scene.camera = self.cameras[0]
+
+    def render(self, session, indices, extension):
+        """
+        Render a batch of views in one render job.
+
+        :param session: RenderSession of the frame.
+        :param indices: Indices of at most batch_size views.
+        :param extension: File extension of the images.
+        :return: Nothing.
+        """
+        lf = self.lf
+        poses = session.poses
+        output_directory = session.image_directory
+        frame_number = session.frame_number
+        for i, view in enumerate(self.views):
+            view.use = i < len(indices)
+
+        names = []
+        for camera, index in zip(self.cameras, indices):
+            pos = poses.camera_position(index)
+            camera.location = pos.location()
+            camera.rotation_euler = pos.rotation()
+            names.append(pos.name)
+        bpy.context.view_layer.update()
+
+        records = [session.append(index) for index in indices]
+
+        batch_filepath = os.path.join(output_directory, "lightfield_batch" + extension)
+        bpy.context.scene.render.filepath = batch_filepath
+        start = time.perf_counter()
+        bpy.ops.render.render(write_still=True)
+        render_time = time.perf_counter() - start
+
+        stem, ext = os.path.splitext(batch_filepath)
+        for view, record in zip(self.views, records):
+            filepath = os.path.join(output_directory, record['name'] + extension)
+            os.replace(stem + view.camera_suffix + ext, filepath)
+            lf.store_image(record['name'], filepath, render_time / len(names), record, frame_number)
+
+    def close(self):
+        """
+        Remove the temporary cameras and views, and restore the multi-view settings.
+
+        :return: Nothing.
+        """
+        scene = bpy.context.scene
+        rb = scene.render
+        scene.camera = self.old_camera
+
+        for view in self.views:
+            rb.views.remove(view)
+        self.views = []
+        for camera in self.cameras:
+            bpy.data.objects.remove(camera)
+        self.cameras = []
+
+        for view, use in self.old_view_use:
+            view.use = use
+        rb.use_multiview = self.old_use_multiview
+        rb.views_format = self.old_views_format
+        rb.image_settings.views_format = self.old_image_views_format
+
+
+def benchmark(lf, num_views=16, batch_size=None, frame_number=None):
+    """
+    Measure the render time per view of the same views, rendered one by one and in multi-view batches.
+    Run from the Python console of Blender; the images are rendered to a temporary directory
+    that is removed afterwards, and the render settings are restored.
+
+    :param num_views: Number of views rendered both ways, from the first view.
+    :param batch_size: Number of views per multi-view render job, the batch size of the scene if None.
+    :return: Seconds per view, one by one and in batches.
+    """
+    scene = bpy.context.scene
+    rb = scene.render
+    frame_number = scene.frame_current if frame_number is None else frame_number
+    batch_size = batch_size or scene.lightfield_batch_size
+    extension = lf.get_extension()
+
+    old_settings = (scene.camera, rb.filepath, rb.use_file_extension, rb.image_settings.file_format,
+                    rb.image_settings.use_zbuffer, scene.lightfield_donotoverwrite, lf.output_directory,
+                    lf.pack_output)
+    directory = tempfile.mkdtemp(prefix="lightfield_benchmark_")
+    times = {}
+    try:
+        lf.set_render_properties()
+        rb.use_file_extension = False
+        scene.lightfield_donotoverwrite = False
+        lf.pack_output = False
+        for mode in ('view', 'batch'):
+            lf.output_directory = os.path.join(directory, mode)
+            session = render_session.RenderSession(lf, frame_number).begin()
+            session.update_poses()
+            os.makedirs(session.image_directory, exist_ok=True)
+            indices = list(range(min(num_views, len(session.poses))))
+            start = time.perf_counter()
+            try:
+                if mode == 'view':
+                    for i in indices:
+                        lf.render_view(session, i, extension)
+                else:
+                    batch = MultiViewBatch(lf, min(batch_size, len(indices)))
+                    try:
+                        for first in range(0, len(indices), batch_size):
+                            batch.render(session, indices[first:first + batch_size], extension)
+                    finally:
+                        batch.close()
+            finally:
+                session.finish()
+            times[mode] = (time.perf_counter() - start) / len(indices)
+    finally:
+        (scene.camera, rb.filepath, rb.use_file_extension, rb.image_settings.file_format,
+         rb.image_settings.use_zbuffer, scene.lightfield_donotoverwrite, lf.output_directory,
+         lf.pack_output) = old_settings
+        render_journal.forget_journals()
+        shutil.rmtree(directory, ignore_errors=True)
+    print("Per view: one by one {:.3f} s, multi-view batches of {} {:.3f} s".format(
+        times['view'], batch_size, times['batch']))
+    return times['view'], times['batch']
@@ -28,6 +28,7 @@ class OBJECT_OT_lightfield_add(bpy.types.Operator):
         lf = (utils.get_lightfield_class(self.action))(scn.lightfield.add())
         lf.index = scn.lightfield_index
         lf.construct()
+        utils.rebuild_lightfield_indices(scn)
         return {'FINISHED'}
 
 
@@ -57,6 +58,7 @@ class LIGHTFIELD_OT_move(bpy.types.Operator):
                 item.index += 1
                 item_next.index -= 1
                 scn.lightfield.move(idx, idx + 1)
+                utils.rebuild_lightfield_indices(scn)
                 scn.lightfield_index += 1
 
             elif self.direction == 'UP' and idx >= 1:
@@ -64,6 +66,7 @@ class LIGHTFIELD_OT_move(bpy.types.Operator):
                 item.index -= 1
                 item_prev.index += 1
                 scn.lightfield.move(idx, idx - 1)
+                utils.rebuild_lightfield_indices(scn)
                 scn.lightfield_index -= 1
         return {"FINISHED"}
 
@@ -109,8 +112,22 @@ class LIGHTFIELD_OT_update(bpy.types.Operator):
     bl_label = """Update the light field setup"""
     bl_options = {'REGISTER'}
 
+    # Name of the lightfield empty, the active lightfield if empty.
+    lightfield = bpy.props.StringProperty()
+
     def execute(self, context):
-        lf = utils.get_active_lightfield(context)
+        if self.lightfield:
+            lf = utils.get_lightfield_by_name(context, self.lightfield)
+        else:
+            lf = utils.get_active_lightfield(context)
+        if lf is None:
+            # The lightfield was removed before its update ran.
+            return {'CANCELLED'}
+        # A resized rig keeps its number of cameras, so the grid is rewritten in place.
+        if lf.obj_grid and len(lf.obj_grid.data.vertices) == len(lf.pose_table()):
+            lf.write_grid(lf.obj_grid.data)
+            return {'FINISHED'}
+
         collection = utils.get_lightfield_collection()
 
         name = None
@@ -129,14 +146,6 @@ class LIGHTFIELD_OT_update(bpy.types.Operator):
 
         bpy.context.view_layer.objects.active = lf.obj_empty
 
-        scene = bpy.context.scene
-        rb = scene.render
-        if context.scene.camera == lf.obj_camera:
-            # The camera is this one, update the resolution
-            rb.resolution_x = lf.res_x
-            rb.resolution_y = lf.res_y
-
-
         return {'FINISHED'}
 
 
@@ -146,39 +155,19 @@ class LIGHTFIELD_OT_update_preview(bpy.types.Operator):
     bl_label = """Update the light field preview"""
     bl_options = {'REGISTER'}
 
-    def execute(self, context):
-        lf = context.scene.lightfield[context.scene.lightfield_index]
-        lf = (utils.get_lightfield_class(lf.lf_type))(lf)
+    # Name of the lightfield empty, the selected lightfield if empty.
+    lightfield = bpy.props.StringProperty()
 
-        if lf.lf_type == 'PLANE':
-            # Percentage part in the x direction
-            sides = [lf.num_cams_x, lf.num_cams_y]
-            num_cameras = sides[0] * sides[1]
-            cam_idx = int(lf.camera_preview_index * 0.01 * (num_cameras - 1))
-            cam_idx_x = cam_idx % sides[0]
-            cam_idx_y = cam_idx // sides[0]
-            pos = lf.get_camera_pos(cam_idx_x, cam_idx_y)
-        elif lf.lf_type == 'CUBOID':
-            side_map = lf.get_side_map()
-            sides = side_map[lf.camera_side]
-            num_cameras = sides[0] * sides[1]
-            cam_idx = int(lf.camera_preview_index * 0.01 * (num_cameras - 1))
-            cam_idx_x = cam_idx % sides[0]
-            cam_idx_y = cam_idx // sides[0]
-
-            pos = lf.get_camera_pos(lf.camera_side, cam_idx_x, cam_idx_y)
-        elif lf.lf_type == 'CYLINDER':
-            sides = [lf.num_cams_radius, lf.num_cams_y]
-            num_cameras = sides[0] * sides[1]
-            cam_idx = int(lf.camera_preview_index * 0.01 * (num_cameras - 1))
-            cam_idx_r = cam_idx % sides[0]
-            cam_idx_y = cam_idx // sides[0]
-            pos = lf.get_camera_pos(cam_idx_y, cam_idx_r)
-        elif lf.lf_type == 'SPHERE':
-            index = int((lf.camera_preview_index * 0.01) * (len(lf.obj_grid.data.vertices) - 1))
-            pos = lf.get_camera_pos(index)
+    def execute(self, context):
+        if self.lightfield:
+            lf = utils.get_lightfield_by_name(context, self.lightfield)
+            if lf is None:
+                return {'CANCELLED'}
         else:
-            raise KeyError()
+            lf = context.scene.lightfield[context.scene.lightfield_index]
+            lf = (utils.get_lightfield_class(lf.lf_type))(lf)
+
+        pos = lf.pose_at(lf.preview_index())
 
         lf.obj_camera.location = pos.location()
         lf.obj_camera.rotation_euler = pos.rotation()
@@ -192,8 +181,16 @@ class LIGHTFIELD_OT_update_camera(bpy.types.Operator):
     bl_label = """Update the light field camera"""
     bl_options = {'REGISTER'}
 
+    # Name of the lightfield empty, the active lightfield if empty.
+    lightfield = bpy.props.StringProperty()
+
     def execute(self, context):
-        lf = utils.get_active_lightfield(context)
+        if self.lightfield:
+            lf = utils.get_lightfield_by_name(context, self.lightfield)
+        else:
+            lf = utils.get_active_lightfield(context)
+        if lf is None:
+            return {'CANCELLED'}
         if lf.cube_camera:
             lf.dummy_focal_length = lf.data_camera.lens
             lf.data_camera.angle = math.pi / 2
@@ -203,19 +200,6 @@ class LIGHTFIELD_OT_update_camera(bpy.types.Operator):
         return {'FINISHED'}
 
 
-class LIGHTFIELD_OT_update_size(bpy.types.Operator):
-    """Update the light field setup size"""
-    bl_idname = "lightfield.update_size"
-    bl_label = """Update the light field size"""
-    bl_options = {'REGISTER'}
-
-    def execute(self, context):
-        lf = utils.get_active_lightfield(context)
-        collection = utils.get_lightfield_collection()
-
-        return {'FINISHED'}
-
-
 class LIGHTFIELD_OT_render(bpy.types.Operator):
     """Update the light field setup"""
     bl_idname = "lightfield.render"
@@ -256,6 +240,7 @@ class OBJECT_OT_lightfield_delete(bpy.types.Operator):
         for i in range(lf.index + 1, len(lightfields)):
             lightfields[i].index -= 1
         lightfields.remove(lf.index)
+        utils.rebuild_lightfield_indices(context.scene)
         if context.scene.lightfield_index >= len(lightfields):
             context.scene.lightfield_index = len(lightfields) - 1
 
@@ -285,11 +270,11 @@ class LIGHTFIELD_OT_delete_override(bpy.types.Operator):
         return context.active_object is not None
 
     def execute(self, context):
-        lfs = [lf.obj_empty for lf in context.scene.lightfield]
         for o in context.selected_objects:
-            if o in lfs:
+            lightfield = utils.find_lightfield(context.scene, o)
+            if lightfield is not None:
                 bpy.ops.object.lightfield_delete('EXEC_DEFAULT',
-                                                 index=context.scene.lightfield[lfs.index(o)].index,
+                                                 index=lightfield.index,
                                                  confirm=self.confirm)
             else:
                 bpy.data.objects.remove(o, do_unlink=True)
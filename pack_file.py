@@ -0,0 +1,264 @@
+import collections
+import io
+import mmap
+import os
+import struct
+import zlib
+
+# Packs can be read without Blender, by putting this file and image_io.py next to a script.
+try:
+    from . import image_io
+except ImportError:
+    import image_io
+
+# File layout:
+#   header    magic, version, number of index slots, offset of the index, offset of the data
+#   index     one fixed-size entry per view of the rig, in pose order
+#   data      image files, appended in the order they finish
+# An entry is only written after its image data, and carries a checksum of itself, so
+# empty or torn entries are recognised and a crash never exposes a partial image.
+PACK_MAGIC = b'LFPACK\x00\x00'
+PACK_VERSION = 1
+HEADER = struct.Struct('<8sIIQQ')
+# name, offset, length, width, height, position xyz, rotation xyz, image crc32, entry crc32
+ENTRY = struct.Struct('<64sQQII6dII')
+MAX_NAME_LENGTH = 63
+
+PackEntry = collections.namedtuple('PackEntry', ['name', 'offset', 'length', 'width', 'height',
+                                                 'position', 'rotation', 'crc32'])
+
+# Pack writers that are currently open, keyed by their path.
+_open_writers = {}
+
+
+def image_size(data):
+    """
+    Width and height of a PNG or OpenEXR image.
+
+    :param data: Contents of the image file.
+    :return: (width, height), (0, 0) for other formats.
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return struct.unpack_from('>II', data, 16)
+    if data[:4] == struct.pack('<i', image_io.EXR_MAGIC):
+        attributes = image_io.read_exr_header(io.BytesIO(data))
+        x_min, y_min, x_max, y_max = struct.unpack('<iiii', attributes['dataWindow'][1])
+        return x_max - x_min + 1, y_max - y_min + 1
+    return 0, 0
+
+
+def unpack_entry(raw):
+    """
+    Decode an index entry.
+
+    :return: PackEntry, or None for an empty or torn entry.
+    """
+    values = ENTRY.unpack(raw)
+    if values[-1] != zlib.crc32(raw[:-4]) or values[2] == 0:
+        return None
+    return PackEntry(values[0].rstrip(b'\x00').decode(), values[1], values[2], values[3], values[4],
+                     values[5:8], values[8:11], values[11])
+
+
+class PackWriter:
+    """
+    Incremental writer of the packed images of one frame.
+    Opening an existing pack for the same views continues it.
+    """
+
+    def __init__(self, path, names):
+        """
+        :param path: Path of the pack.
+        :param names: Names of all views, in pose order.
+        """
+        names = list(names)
+        self.path = path
+        self.slots = {name: i for i, name in enumerate(names)}
+        self.capacity = len(names)
+        self.index_offset = HEADER.size
+        self.data_offset = self.index_offset + self.capacity * ENTRY.size
+        self.entries = {}
+
+        if not self.reopen(names):
+            with open(path, mode='wb') as f:
+                f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, self.capacity, self.index_offset, self.data_offset))
+                f.truncate(self.data_offset)
+        self.file = open(path, mode='r+b')
+        # Drop image data that has no entry, left behind by an interrupted write.
+        self.end = max([self.data_offset] + [e.offset + e.length for e in self.entries.values()])
+        self.file.truncate(self.end)
+
+    def reopen(self, names):
+        """
+        Read the entries of an existing pack for the same views.
+
+        :return: Whether the existing pack can be continued.
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, mode='rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or HEADER.unpack(header)[:3] != (PACK_MAGIC, PACK_VERSION, self.capacity):
+                return False
+            index = f.read(self.capacity * ENTRY.size)
+        for i in range(len(index) // ENTRY.size):
+            entry = unpack_entry(index[i * ENTRY.size:(i + 1) * ENTRY.size])
+            if entry is None:
+                continue
+            if entry.name != names[i]:
+                self.entries = {}
+                return False
+            self.entries[entry.name] = entry
+        return True
+
+    def contains(self, name):
+        """Whether the image of the view is in the pack."""
+        return name in self.entries
+
+    def add(self, name, data, position, rotation):
+        """
+        Append the image of a view and fill in its entry.
+
+        :param name: Name of the view.
+        :param data: Contents of the image file.
+        :param position: Location in world space.
+        :param rotation: Euler rotation in world space.
+        :return: Nothing.
+        """
+        slot = self.slots[name]
+        encoded_name = name.encode()
+        if len(encoded_name) > MAX_NAME_LENGTH:
+            raise ValueError("View name {} is too long for a pack".format(name))
+        width, height = image_size(data)
+        image_crc = zlib.crc32(data)
+
+        self.file.seek(self.end)
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        raw = ENTRY.pack(encoded_name, self.end, len(data), width, height, *position, *rotation, image_crc, 0)
+        raw = raw[:-4] + struct.pack('<I', zlib.crc32(raw[:-4]))
+        self.file.seek(self.index_offset + slot * ENTRY.size)
+        self.file.write(raw)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        self.entries[name] = unpack_entry(raw)
+        self.end += len(data)
+
+    def add_file(self, name, filepath, position, rotation):
+        """
+        Append an image file to the pack.
+
+        :return: Nothing.
+        """
+        with open(filepath, mode='rb') as f:
+            self.add(name, f.read(), position, rotation)
+
+    def close(self):
+        self.file.close()
+
+
+class PackReader:
+    """
+    Random access to the images of a pack, without Blender.
+    The file is memory-mapped and images are returned as memoryviews into it.
+
+    with PackReader("lightfield.pack") as pack:
+        data = pack.view("view_0000f")
+    """
+
+    def __init__(self, path):
+        self.file = open(path, mode='rb')
+        header = self.file.read(HEADER.size)
+        magic, version, self.capacity, self.index_offset, self.data_offset = HEADER.unpack(header)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.file.close()
+            raise ValueError("{} is not a lightfield pack".format(path))
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.indices = None
+
+    def __len__(self):
+        return self.capacity
+
+    def __contains__(self, name):
+        return name in self.get_indices()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def entry(self, index):
+        """
+        Entry of the view at a pose index.
+
+        :return: PackEntry, or None if the view is not in the pack.
+        """
+        start = self.index_offset + index * ENTRY.size
+        return unpack_entry(self.map[start:start + ENTRY.size])
+
+    def get_indices(self):
+        """Dictionary from view name to pose index, read on first use."""
+        if self.indices is None:
+            self.indices = {}
+            for i in range(self.capacity):
+                entry = self.entry(i)
+                if entry is not None:
+                    self.indices[entry.name] = i
+        return self.indices
+
+    def names(self):
+        """Names of the views in the pack, in pose order."""
+        return sorted(self.get_indices(), key=self.get_indices().get)
+
+    def index_of(self, name):
+        return self.get_indices()[name]
+
+    def view(self, key, verify=False):
+        """
+        Image file of a view.
+
+        :param key: Pose index or name of the view.
+        :param verify: Check the image against its checksum.
+        :return: memoryview of the image file.
+        """
+        index = self.index_of(key) if isinstance(key, str) else key
+        entry = self.entry(index)
+        if entry is None:
+            raise KeyError(key)
+        data = memoryview(self.map)[entry.offset:entry.offset + entry.length]
+        if verify and zlib.crc32(data) != entry.crc32:
+            raise ValueError("Image of view {} is damaged".format(entry.name))
+        return data
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def get_writer(path, names):
+    """
+    Return the open pack writer for the given file, opening or continuing it on first use.
+
+    :param path: Path of the pack.
+    :param names: Callable returning the names of all views, in pose order.
+    :return: The writer.
+    """
+    writer = _open_writers.get(path)
+    if writer is None:
+        writer = PackWriter(path, names())
+        _open_writers[path] = writer
+    return writer
+
+
+def close_writers():
+    """
+    Close all open pack writers.
+
+    :return: Nothing.
+    """
+    while _open_writers:
+        _open_writers.popitem()[1].close()
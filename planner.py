@@ -0,0 +1,84 @@
+import os
+
+import bpy
+
+from . import manifest, pack_file, render_session
+
+# Channels of the color modes of Blender's image settings.
+COLOR_MODE_CHANNELS = {'BW': 1, 'RGB': 3, 'RGBA': 4}
+
+
+def image_size_estimate(lf):
+    """
+    Uncompressed size of one image with the current image settings, an upper bound
+    for PNG images and uncompressed OpenEXR images.
+
+    :return: Size in bytes.
+    """
+    settings = bpy.context.scene.render.image_settings
+    channels = COLOR_MODE_CHANNELS.get(settings.color_mode, 4)
+    if settings.file_format == 'OPEN_EXR':
+        channels += 1 if settings.use_zbuffer else 0
+        bytes_per_channel = 2 if settings.color_depth == '16' else 4
+    else:
+        bytes_per_channel = 2 if settings.color_depth == '16' else 1
+    return lf.res_x * lf.res_y * channels * bytes_per_channel
+
+
+def format_size(num_bytes):
+    """Human readable size."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if num_bytes < 1024:
+            return "{:.1f} {}".format(num_bytes, unit)
+        num_bytes /= 1024
+    return "{:.1f} TiB".format(num_bytes)
+
+
+def plan_render(lf):
+    """
+    Dry run: write the config and directories of every frame without rendering.
+
+    Poses are computed with array operations from the transform of the lightfield, so the
+    camera is never moved and the scene is only evaluated once per frame.
+
+    :return: Dictionary with the number of frames, views and files, and the disk footprint.
+    """
+    scene = bpy.context.scene
+    image_size = image_size_estimate(lf)
+
+    frames = lf.get_frame_numbers()
+    num_views = 0
+    config_size = 0
+    for frame in frames:
+        # Only the transform of the lightfield needs to be evaluated.
+        scene.frame_set(frame)
+        session = render_session.RenderSession(lf, frame).begin()
+        if not lf.pack_output:
+            os.makedirs(session.image_directory, exist_ok=True)
+        session.update_poses()
+        session.finish(all_poses=True)
+
+        num_views = len(session.poses)
+        for path in (session.path_json, session.path_csv, manifest.get_path_manifest(session.path_json)):
+            config_size += os.path.getsize(path)
+
+    # Views are packed into one file per frame.
+    if lf.pack_output:
+        num_images = len(frames)
+        images_size = len(frames) * (pack_file.HEADER.size + num_views * (pack_file.ENTRY.size + image_size))
+    else:
+        num_images = len(frames) * num_views
+        images_size = num_images * image_size
+
+    plan = {
+        'frames': len(frames),
+        'views': num_views,
+        'image_files': num_images,
+        'config_files': 3 * len(frames),
+        'config_bytes': config_size,
+        'image_bytes': images_size,
+    }
+    print("Dry run: {} frame(s) of {} views".format(plan['frames'], plan['views']))
+    print("  {} config files, {}".format(plan['config_files'], format_size(config_size)))
+    print("  {} image files, at most {} uncompressed".format(num_images, format_size(images_size)))
+    return plan
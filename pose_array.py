@@ -0,0 +1,164 @@
+import numpy as np
+
+from .camera_position import CameraPosition
+
+
+class PoseArray:
+    """
+    All camera poses of a lightfield, stored as contiguous arrays.
+
+    Positions and XYZ euler rotations are N x 3 arrays in the local space of the
+    lightfield. View names are only formatted when they are asked for.
+    """
+
+    def __init__(self, positions, rotations, indices, sides=None):
+        """
+        :param positions: N x 3 camera locations.
+        :param rotations: N x 3 camera euler rotations.
+        :param indices: N view indices, as used in the view names.
+        :param sides: Optional N side characters (cuboid), prefixed to the view index.
+        """
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64)
+        self.rotations = np.ascontiguousarray(rotations, dtype=np.float64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int64)
+        self.sides = sides
+        self.side_offsets = None
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.camera_position(i)
+
+    def name(self, i):
+        """Name of the i-th view."""
+        side = self.sides[i] if self.sides is not None else ''
+        return "view_{}{:04d}f".format(side, self.indices[i])
+
+    def names(self):
+        """Generator over the names of all views."""
+        for i in range(len(self)):
+            yield self.name(i)
+
+    def index_of(self, name):
+        """
+        Position of the view with the given name.
+        The view index in the name is used directly, so no table of names is built.
+
+        :param name: Name of a view, e.g. view_0012f or view_f0012f.
+        :return: Index in the arrays.
+        """
+        if not (name.startswith("view_") and name.endswith("f")):
+            raise KeyError(name)
+        label = name[len("view_"):-1]
+        digits = label.lstrip("abcdefghijklmnopqrstuvwxyz")
+        side = label[:len(label) - len(digits)]
+        if not digits.isdigit():
+            raise KeyError(name)
+        number = int(digits)
+
+        # Views of a side are stored in order of their index, after the views of the previous sides.
+        if self.side_offsets is None:
+            self.side_offsets = {'': 0}
+            if self.sides is not None:
+                sides, offsets = np.unique(self.sides, return_index=True)
+                self.side_offsets = dict(zip(sides.tolist(), offsets.tolist()))
+        i = self.side_offsets.get(side, -1) + number
+        if side in self.side_offsets and 0 <= i < len(self) and self.name(i) == name:
+            return i
+        matches = np.flatnonzero(self.indices == number)
+        for i in matches.tolist():
+            if self.name(i) == name:
+                return i
+        raise KeyError(name)
+
+    def name_array(self):
+        """Names of all views as an array of strings, formatted at once."""
+        names = np.char.mod('%04d', self.indices)
+        if self.sides is not None:
+            names = np.char.add(np.asarray(self.sides, dtype=str), names)
+        return np.char.add(np.char.add('view_', names), 'f')
+
+    def camera_position(self, i):
+        """Pose of the i-th view as a CameraPosition."""
+        x, y, z = self.positions[i].tolist()
+        alpha, theta, phi = self.rotations[i].tolist()
+        return CameraPosition(self.name(i), x, y, z, alpha=alpha, theta=theta, phi=phi)
+
+    @staticmethod
+    def concatenate(pose_arrays):
+        """Join several pose arrays into one, in order."""
+        sides = None
+        if any(p.sides is not None for p in pose_arrays):
+            sides = np.concatenate([p.sides if p.sides is not None else np.full(len(p), '')
+                                    for p in pose_arrays])
+        return PoseArray(np.concatenate([p.positions for p in pose_arrays]),
+                         np.concatenate([p.rotations for p in pose_arrays]),
+                         np.concatenate([p.indices for p in pose_arrays]),
+                         sides)
+
+
+def grid_indices(num_x, num_y):
+    """
+    Row-major grid coordinates of num_x * num_y views.
+
+    :return: Arrays of x and y coordinates.
+    """
+    y, x = np.divmod(np.arange(num_x * num_y), num_x)
+    return x, y
+
+
+def euler_from_basis(basis):
+    """
+    Convert rotation matrices to XYZ euler angles, like mathutils' Matrix.to_euler().
+
+    :param basis: N x 3 x 3 matrices, columns are the rotated axes (need not be normalized).
+    :return: N x 3 euler angles.
+    """
+    m = basis / np.linalg.norm(basis, axis=1, keepdims=True)
+    cy = np.hypot(m[:, 0, 0], m[:, 1, 0])
+
+    eul1 = np.stack([np.arctan2(m[:, 2, 1], m[:, 2, 2]),
+                     np.arctan2(-m[:, 2, 0], cy),
+                     np.arctan2(m[:, 1, 0], m[:, 0, 0])], axis=1)
+    eul2 = np.stack([np.arctan2(-m[:, 2, 1], -m[:, 2, 2]),
+                     np.arctan2(-m[:, 2, 0], -cy),
+                     np.arctan2(-m[:, 1, 0], -m[:, 0, 0])], axis=1)
+
+    # Gimbal lock: the rotation around Z is folded into X.
+    locked = cy <= 16 * np.finfo(np.float32).eps
+    eul1[locked] = np.stack([np.arctan2(-m[locked, 1, 2], m[locked, 1, 1]),
+                             np.arctan2(-m[locked, 2, 0], cy[locked]),
+                             np.zeros(np.count_nonzero(locked))], axis=1)
+    eul2[locked] = eul1[locked]
+
+    # Pick the smallest of both solutions.
+    use_eul2 = np.abs(eul1).sum(axis=1) > np.abs(eul2).sum(axis=1)
+    return np.where(use_eul2[:, None], eul2, eul1)
+
+
+def normal_rotations(normals, face_inside):
+    """
+    Rotations of cameras looking along (or against) the given surface normals.
+
+    :param normals: N x 3 unit normals.
+    :param face_inside: Look against the normal instead of along it.
+    :return: N x 3 euler angles.
+    """
+    z = np.zeros_like(normals)
+    z[:, 2] = 1.0
+    side = np.cross(z, normals)
+    # Fall back to the Y axis when the normal is (anti)parallel to Z.
+    degenerate = np.linalg.norm(side, axis=1) <= 0.0001
+    y = np.zeros((np.count_nonzero(degenerate), 3))
+    y[:, 1] = 1.0
+    side[degenerate] = np.cross(y, normals[degenerate])
+
+    up = np.cross(side, normals)
+
+    basis = np.empty((len(normals), 3, 3))
+    basis[:, :, 0] = side if face_inside else -side
+    basis[:, :, 1] = -up
+    basis[:, :, 2] = normals if face_inside else -normals
+    return euler_from_basis(basis)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+
+# Journals that are in use, keyed by their path.
+_journals = {}
+
+
+def file_checksum(path):
+    """SHA-1 of a file, read in blocks."""
+    sha1 = hashlib.sha1()
+    with open(path, mode='rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+class RenderJournal:
+    """
+    Per-frame record of the views whose image was completely written.
+
+    Each line of the journal holds the name, file name, size, checksum and render
+    time of one finished view. A record is only appended after the image was
+    renamed to its final name, so a crash can never mark a partial image as done.
+    Render nodes of a distributed render append to the same journal; lines that were
+    garbled by concurrent writes are skipped, and their views are rendered again.
+    """
+
+    def __init__(self, path, image_directory):
+        """
+        :param path: Path of the journal file.
+        :param image_directory: Directory holding the images of the frame.
+        """
+        self.path = path
+        self.image_directory = image_directory
+        self.completed = self.load()
+
+    def load(self):
+        """
+        Read the journal and check the recorded images with a single directory scan.
+
+        :return: Dictionary from view name to journal record, for views that are still valid.
+        """
+        records = {}
+        if os.path.exists(self.path):
+            with open(self.path, mode='r') as journal_file:
+                for line in journal_file:
+                    # A trailing record that was cut off by a crash is ignored.
+                    if not line.endswith("\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                        records[record['name']] = record
+                    except (ValueError, TypeError, KeyError):
+                        continue
+
+        sizes = {}
+        if records and os.path.isdir(self.image_directory):
+            with os.scandir(self.image_directory) as entries:
+                sizes = {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+
+        return {name: record for name, record in records.items()
+                if sizes.get(record.get('file')) == record.get('size')}
+
+    def is_done(self, name):
+        """Whether the image of the view was completely written by an earlier render."""
+        return name in self.completed
+
+    def record(self, name, filepath, render_time):
+        """
+        Record a view whose image was written to its final path.
+
+        :param name: Name of the view.
+        :param filepath: Path of the image.
+        :param render_time: Render time in seconds.
+        :return: Nothing.
+        """
+        record = {
+            'name': name,
+            'file': os.path.basename(filepath),
+            'size': os.path.getsize(filepath),
+            'sha1': file_checksum(filepath),
+            'render_time': render_time,
+        }
+        with open(self.path, mode='a') as journal_file:
+            journal_file.write(json.dumps(record) + "\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        self.completed[name] = record
+
+
+def get_journal(path, image_directory):
+    """
+    Return the journal at the given path, loading it on first use.
+
+    :return: The journal.
+    """
+    journal = _journals.get(path)
+    if journal is None or journal.image_directory != image_directory:
+        journal = RenderJournal(path, image_directory)
+        _journals[path] = journal
+    return journal
+
+
+def forget_journals():
+    """Drop the loaded journals, so the next render checks the files on disk again."""
+    _journals.clear()
@@ -0,0 +1,253 @@
+import os
+import time
+
+import bpy
+import numpy as np
+
+from . import config_writer, manifest, pose_array
+
+
+def sensor_size(lf):
+    """
+    Size of the sensor in millimetres, as used for the resolution of the lightfield.
+
+    :return: [width, height].
+    """
+    cam = lf.data_camera
+    if cam.sensor_fit == 'AUTO':
+        size = cam.sensor_width
+        res = max(lf.res_x, lf.res_y)
+        return [size * lf.res_x / res, size * lf.res_y / res]
+    elif cam.sensor_fit == 'HORIZONTAL':
+        size = cam.sensor_width
+        return [size, size * lf.res_y / lf.res_x]
+    elif cam.sensor_fit == 'VERTICAL':
+        size = cam.sensor_height
+        return [size * lf.res_x / lf.res_y, size]
+    raise Exception("Unknown sensor fit")
+
+
+def build_config(lf, context):
+    """
+    Header of the json and csv config of a lightfield.
+
+    :return: Json config without frames, and the header rows of the csv config.
+    """
+    cam = lf.data_camera
+    sensor = sensor_size(lf)
+
+    cfg = {
+        'camera': {
+            'type': cam.type,
+        },
+        'lf_type': lf.lf_type,
+        'resolution': [lf.res_x, lf.res_y],
+        'sensor_size': sensor,
+        'grid': lf.grid_layout(),
+    }
+    camera_meta_fields = ["type"]
+    camera_meta = [cam.type]
+    if cam.type == 'PANO':
+        if context.engine != 'CYCLES':
+            raise Exception("Panoramic lenses only supported in Cycles")
+        ccam = cam.cycles
+        fields = ['panorama_type']
+        if ccam.panorama_type == 'FISHEYE_EQUIDISTANT':
+            fields.append('fisheye_fov')
+        elif ccam.panorama_type == 'FISHEYE_EQUISOLID':
+            fields.extend(['fisheye_lens', 'fisheye_fov'])
+        elif ccam.panorama_type == 'EQUIRECTANGULAR':
+            fields.extend(['latitude_min', 'latitude_max', 'longitude_min', 'longitude_max'])
+        for field in fields:
+            cfg['camera'][field] = getattr(ccam, field)
+            camera_meta_fields.append(field)
+            camera_meta.append(getattr(ccam, field))
+    else:
+        camera_meta_fields.append("lens_unit")
+        camera_meta.append(cam.lens_unit)
+        if cam.lens_unit == 'MILLIMETERS':
+            camera_meta_fields.append("lens")
+            camera_meta.append(cam.lens)
+        elif cam.lens_unit == 'FOV':
+            camera_meta_fields.append("angle")
+            camera_meta.append(cam.angle)
+
+    # The projection matrix is computed once, for the json and the csv.
+    render = context.scene.render
+    projection_matrix = lf.obj_camera.calc_matrix_camera(
+        context.evaluated_depsgraph_get(),
+        x=render.resolution_x,
+        y=render.resolution_y,
+        scale_x=render.pixel_aspect_x,
+        scale_y=render.pixel_aspect_y)
+    projection_rows = [[projection_matrix[r][c] for c in range(4)] for r in range(4)]
+
+    if cam.type == 'PERSP':
+        cfg['camera']['lens_unit'] = cam.lens_unit
+        if cam.lens_unit == 'MILLIMETERS':
+            cfg['camera']['focal_length'] = cam.lens
+        elif cam.lens_unit == 'FOV':
+            # TODO this is ambiguous.
+            cfg['camera']['angle'] = cam.angle
+        cfg['camera']['projection_matrix'] = projection_rows
+
+    # Header rows of the csv file.
+    rows = [
+        camera_meta_fields,
+        camera_meta,
+        [lf.lf_type],
+        [lf.res_x, lf.res_y],
+        ["sensor_width", "sensor_height"],
+        sensor,
+        ["projection_matrix"],
+    ]
+    rows.extend(projection_rows)
+    rows.append(["name", "x", "y", "z", "rot_x", "rot_y", "rot_z"])
+    return cfg, rows
+
+
+def local_matrices(poses, scale):
+    """
+    Matrices of camera poses in the local space of the lightfield.
+
+    :param poses: PoseArray of the lightfield.
+    :param scale: Scale of the camera object.
+    :return: N x 4 x 4 matrices.
+    """
+    matrices = np.zeros((len(poses), 4, 4))
+    matrices[:, :3, :3] = manifest.euler_to_matrix(poses.rotations) * np.array(scale)
+    matrices[:, :3, 3] = poses.positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+class RenderSession:
+    """
+    Everything the render loop needs for one frame of a lightfield, resolved once:
+    the output paths, the config header with the projection matrix, the open config
+    writer and the world poses of all views. Views are recorded with plain method
+    calls instead of an operator per view.
+    """
+
+    def __init__(self, lf, frame_number):
+        self.lf = lf
+        self.frame_number = frame_number
+        self.output_directory = lf.get_output_directory(frame_number=frame_number)
+        self.image_directory = lf.get_output_image_directory(frame_number=frame_number)
+        self.path_json = lf.get_path_config_file_json(frame_number)
+        self.path_csv = lf.get_path_config_file(frame_number)
+
+        self.poses = None
+        self.local = None
+        self.world = None
+
+        self.header = None
+        self.projection_matrix = None
+        self.intrinsics = None
+        self.writer = None
+
+    def begin(self, source_frame=None):
+        """
+        Start the config of the frame, truncating existing files.
+
+        :param source_frame: Identical earlier frame whose images this frame reuses, recorded in the json config.
+        :return: The session.
+        """
+        os.makedirs(self.output_directory, exist_ok=True)
+        self.header, csv_rows = build_config(self.lf, bpy.context)
+        if source_frame is not None:
+            self.header['source_frame'] = source_frame
+        self.projection_matrix = self.header['camera'].get('projection_matrix')
+        if self.projection_matrix is not None:
+            self.intrinsics = manifest.intrinsics_from_projection(self.projection_matrix, self.header['resolution'])
+        self.writer = config_writer.open_writer(self.path_json, self.path_csv, self.header, csv_rows,
+                                                write_frames_json=self.lf.export_json)
+        return self
+
+    def update_poses(self):
+        """
+        Compute the world poses of all views from the transform of the lightfield,
+        for the frame the scene is evaluated at.
+
+        :return: Nothing.
+        """
+        lf = self.lf
+        # The local poses only depend on the lightfield settings, not on the frame.
+        if self.poses is None:
+            self.poses = lf.pose_table()
+            self.local = (self.poses.name_array(), local_matrices(self.poses, lf.obj_camera.scale))
+        names, local = self.local
+        base = np.array(lf.obj_empty.matrix_world) @ np.array(lf.obj_camera.matrix_parent_inverse)
+        world_matrices = base @ local
+        self.world = (names,
+                      np.ascontiguousarray(world_matrices[:, :3, 3]),
+                      pose_array.euler_from_basis(world_matrices[:, :3, :3]),
+                      world_matrices)
+
+    def record(self, i):
+        """
+        Config record of the i-th view, see update_poses().
+
+        :return: Dictionary with name, position, rotation and world matrix.
+        """
+        names, positions, rotations, world_matrices = self.world
+        return {
+            'name': str(names[i]),
+            'position': positions[i].tolist(),
+            'rotation': rotations[i].tolist(),
+            'world_matrix': world_matrices[i].tolist(),
+        }
+
+    def append(self, i):
+        """
+        Add the i-th view to the config.
+
+        :return: Its record.
+        """
+        record = self.record(i)
+        self.writer.append(**record)
+        return record
+
+    def finish(self, all_poses=False):
+        """
+        Finalise the config of the frame.
+
+        :param all_poses: Write the poses of all views at once, instead of the appended ones.
+        :return: Nothing.
+        """
+        config_writer.close_writer(self.path_json, self.world if all_poses else None)
+
+
+def benchmark(lf, num_views=1000, frame_number=None):
+    """
+    Measure the Python overhead of recording a view, through the operator and through a session.
+    Run from the Python console of Blender; the config of the frame is rewritten.
+
+    :return: Seconds per view of both paths.
+    """
+    scene = bpy.context.scene
+    frame_number = scene.frame_current if frame_number is None else frame_number
+    session = RenderSession(lf, frame_number).begin()
+    session.update_poses()
+    num_views = min(num_views, len(session.poses))
+    old_location = lf.obj_camera.location.copy()
+    old_rotation = lf.obj_camera.rotation_euler.copy()
+    try:
+        start = time.perf_counter()
+        for i in range(num_views):
+            lf.set_camera(session.poses.camera_position(i))
+            bpy.ops.lightfield.export_config_append(filename=session.poses.name(i), frame_number=frame_number)
+        operator_time = (time.perf_counter() - start) / num_views
+
+        start = time.perf_counter()
+        for i in range(num_views):
+            lf.set_camera(session.poses.camera_position(i))
+            session.append(i)
+        session_time = (time.perf_counter() - start) / num_views
+    finally:
+        session.finish()
+        lf.obj_camera.location = old_location
+        lf.obj_camera.rotation_euler = old_rotation
+    print("Per view: operator {:.1f} us, session {:.1f} us".format(operator_time * 1e6, session_time * 1e6))
+    return operator_time, session_time
+
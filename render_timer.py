@@ -0,0 +1,56 @@
+import time
+
+import bpy
+
+
+class RenderTimer:
+    """
+    Measure how long each render job spends synchronizing the scene versus sampling.
+
+    The render handlers mark the start and end of a job; the first render statistics
+    message that mentions samples marks the end of the scene sync.
+    """
+
+    def __init__(self):
+        self.sync_times = []
+        self.sample_times = []
+        self.render_start = None
+        self.sample_start = None
+
+    def start(self):
+        bpy.app.handlers.render_pre.append(self.on_render_pre)
+        bpy.app.handlers.render_stats.append(self.on_render_stats)
+        bpy.app.handlers.render_post.append(self.on_render_post)
+
+    def stop(self):
+        bpy.app.handlers.render_pre.remove(self.on_render_pre)
+        bpy.app.handlers.render_stats.remove(self.on_render_stats)
+        bpy.app.handlers.render_post.remove(self.on_render_post)
+
+    def on_render_pre(self, *args):
+        self.render_start = time.perf_counter()
+        self.sample_start = None
+
+    def on_render_stats(self, stats, *args):
+        if self.sample_start is None and "sample" in str(stats).lower():
+            self.sample_start = time.perf_counter()
+
+    def on_render_post(self, *args):
+        if self.render_start is None:
+            return
+        end = time.perf_counter()
+        sample_start = self.sample_start or end
+        self.sync_times.append(sample_start - self.render_start)
+        self.sample_times.append(end - sample_start)
+        print("Sync %.3f s, sampling %.3f s" % (self.sync_times[-1], self.sample_times[-1]))
+        self.render_start = None
+
+    def summary(self):
+        """Human readable averages over all measured render jobs."""
+        count = len(self.sync_times)
+        if count == 0:
+            return "No render jobs measured"
+        sync = sum(self.sync_times)
+        sample = sum(self.sample_times)
+        return "%d render jobs: sync %.3f s (%.3f s per job), sampling %.3f s (%.3f s per job)" % (
+            count, sync, sync / count, sample, sample / count)
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import shutil
+
+import bpy
+from . import encoder
+
+# Modifiers whose result depends on the frame through a cache or a simulation, not through animated properties.
+DYNAMIC_MODIFIERS = {'PARTICLE_SYSTEM', 'CLOTH', 'SOFT_BODY', 'FLUID', 'DYNAMIC_PAINT', 'OCEAN', 'EXPLODE',
+                     'MESH_CACHE', 'MESH_SEQUENCE_CACHE', 'NODES'}
+
+
+def animated_ids():
+    """
+    Data-blocks that can hold animation, including the node trees embedded in materials,
+    worlds, lights and scenes.
+
+    :return: Generator over data-blocks with animation data.
+    """
+    collections = (bpy.data.objects, bpy.data.meshes, bpy.data.curves, bpy.data.shape_keys, bpy.data.materials,
+                   bpy.data.textures, bpy.data.node_groups, bpy.data.worlds, bpy.data.lights, bpy.data.cameras,
+                   bpy.data.scenes)
+    for collection in collections:
+        for id_data in collection:
+            for data in (id_data, getattr(id_data, 'node_tree', None)):
+                if data is not None and data.animation_data is not None:
+                    yield data
+
+
+def animated_values(id_data, depsgraph, frame):
+    """
+    Values of the animated properties of a data-block at the current frame.
+
+    :return: List of values.
+    """
+    animation_data = id_data.animation_data
+    actions = [animation_data.action] + [strip.action for track in animation_data.nla_tracks
+                                         for strip in track.strips]
+    values = [fcurve.evaluate(frame) for action in actions if action is not None for fcurve in action.fcurves]
+    # Drivers can depend on anything, their results are read from the evaluated data.
+    evaluated = id_data.evaluated_get(depsgraph)
+    for fcurve in animation_data.drivers:
+        try:
+            value = evaluated.path_resolve(fcurve.data_path)
+            values.append(value[fcurve.array_index] if hasattr(value, '__getitem__') else value)
+        except (ValueError, TypeError, IndexError):
+            # Not readable, so assume it changes.
+            values.append(frame)
+    return values
+
+
+def scene_fingerprint(scene, camera=None):
+    """
+    Cheap fingerprint of the evaluated scene at the current frame: the transforms, visibility and
+    materials of all objects and the values of all animated properties. Frames with the same
+    fingerprint render the same images. Anything that changes in a way that is not covered,
+    such as simulations, image sequences and geometry nodes, makes every frame different.
+
+    :param camera: Camera moving between the views, left out.
+    :return: Hex digest.
+    """
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    frame = scene.frame_current
+    sha1 = hashlib.sha1()
+
+    for obj in depsgraph.objects:
+        if camera is not None and obj.name == camera.name:
+            continue
+        values = [obj.name, obj.hide_render]
+        values.extend(v for row in obj.matrix_world for v in row)
+        values.extend(slot.material.name if slot.material else None for slot in obj.material_slots)
+        if any(modifier.type in DYNAMIC_MODIFIERS for modifier in obj.modifiers):
+            values.append(frame)
+        sha1.update(repr(values).encode())
+
+    for id_data in animated_ids():
+        sha1.update(repr([id_data.name] + animated_values(id_data, depsgraph, frame)).encode())
+
+    if any(image.users and image.source in {'SEQUENCE', 'MOVIE'} for image in bpy.data.images) or \
+            any(clip.users for clip in bpy.data.movieclips) or \
+            any(cache_file.users for cache_file in bpy.data.cache_files):
+        sha1.update(repr(frame).encode())
+    return sha1.hexdigest()
+
+
+def link_file(source, target):
+    """
+    Make target refer to the same image as source, with a hard link where the file system
+    supports it and a copy otherwise. The target is replaced atomically.
+
+    :return: Nothing.
+    """
+    partial_target = target + ".part"
+    if os.path.exists(partial_target):
+        os.remove(partial_target)
+    try:
+        os.link(source, partial_target)
+    except OSError:
+        shutil.copyfile(source, partial_target)
+    os.replace(partial_target, target)
+
+
+def link_frame(lf, session, source_directory, extension):
+    """
+    Give a frame the images of an identical earlier frame instead of rendering it.
+    Views whose image is missing in the earlier frame are rendered.
+
+    :param lf: Lightfield being rendered.
+    :param session: RenderSession of the frame, begun with the source frame.
+    :param source_directory: Image directory of the earlier frame.
+    :param extension: File extension of the images.
+    :return: Nothing.
+    """
+    # The images of the earlier frame may still be encoding.
+    pool = encoder.get_pool()
+    if pool is not None:
+        pool.wait()
+
+    scene = bpy.context.scene
+    frame_number = session.frame_number
+    os.makedirs(session.image_directory, exist_ok=True)
+    try:
+        for i in range(len(session.poses)):
+            name = session.poses.name(i)
+            source = os.path.join(source_directory, name + extension)
+            if not os.path.exists(source):
+                lf.render_view(session, i, extension)
+                continue
+            record = session.append(i)
+            if scene.lightfield_donotoverwrite and lf.is_image_done(name, frame_number):
+                continue
+            target = os.path.join(session.image_directory, name + extension)
+            link_file(source, target)
+            lf.store_image(name, target, 0.0, record, frame_number)
+    finally:
+        session.finish()
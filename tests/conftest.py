@@ -0,0 +1,12 @@
+import os
+import sys
+import types
+
+# The add-on modules use relative imports, and the package __init__ needs Blender.
+# Register the add-on directory as a package without running its __init__, so the
+# modules that do not need Blender can be tested in plain Python.
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if 'lightfield_addon' not in sys.modules:
+    package = types.ModuleType('lightfield_addon')
+    package.__path__ = [ADDON_DIRECTORY]
+    sys.modules['lightfield_addon'] = package
@@ -0,0 +1,84 @@
+import json
+import sys
+
+import pytest
+
+from lightfield_addon import farm_protocol
+
+# Stands in for farm_worker.py: answers like a Blender worker, and exits in the middle
+# of its second command when asked to crash.
+FAKE_WORKER = """
+import json, sys, time
+crash = sys.argv[1] == 'crash'
+for n, line in enumerate(sys.stdin):
+    command = line.split()
+    if command[0] == 'QUIT':
+        break
+    print("Fra:1 Mem:12.00M | Rendering")
+    time.sleep(0.01)
+    if crash and n == 1:
+        sys.exit(3)
+    if command[0] == 'FRAME':
+        print("LIGHTFIELD FRAME " + json.dumps({'frame': int(command[1]), 'views': 4}))
+    else:
+        frame, start, stop = (int(c) for c in command[1:])
+        for i in range(start, stop):
+            print("LIGHTFIELD VIEW " + json.dumps({'name': 'view_%04df' % i, 'frame': frame}))
+    print("LIGHTFIELD READY", flush=True)
+"""
+
+
+def start_workers(*modes):
+    return [farm_protocol.WorkerProcess([sys.executable, '-c', FAKE_WORKER, mode]) for mode in modes]
+
+
+def close_workers(workers):
+    for worker in workers:
+        worker.close()
+
+
+def test_make_chunks():
+    assert farm_protocol.make_chunks([0, 1, 2, 3, 4], 2) == [(0, 2), (2, 4), (4, 5)]
+    assert farm_protocol.make_chunks([0, 1, 3, 4, 5, 9], 4) == [(0, 2), (3, 6), (9, 10)]
+    assert farm_protocol.make_chunks([], 4) == []
+
+
+def test_chunk_of_crashed_worker_is_requeued():
+    workers = start_workers('ok', 'crash', 'ok')
+    records = []
+    try:
+        farm_protocol.run_queue(workers, farm_protocol.make_chunks(range(40), 3),
+                                lambda worker, chunks, results: farm_protocol.serve(worker, chunks, results, 7),
+                                records.append, "failed")
+    finally:
+        close_workers(workers)
+    assert [worker.alive for worker in workers] == [True, False, True]
+    assert sorted(record['name'] for record in records) == ['view_%04df' % i for i in range(40)]
+    assert all(record['frame'] == 7 for record in records)
+
+
+def test_frame_of_crashed_worker_is_requeued():
+    workers = start_workers('crash', 'ok')
+    finished = []
+    try:
+        farm_protocol.run_queue(workers, [1, 2, 3, 4, 5], farm_protocol.serve_frames, finished.append, "failed")
+    finally:
+        close_workers(workers)
+    assert sorted(result['frame'] for result in finished) == [1, 2, 3, 4, 5]
+    assert not workers[0].alive
+
+
+def test_all_workers_crashed():
+    workers = start_workers('crash', 'crash')
+    try:
+        with pytest.raises(RuntimeError, match="all gone"):
+            farm_protocol.run_queue(workers, farm_protocol.make_chunks(range(40), 2),
+                                    lambda worker, chunks, results: farm_protocol.serve(worker, chunks, results, 1),
+                                    lambda record: None, "all gone")
+    finally:
+        close_workers(workers)
+
+
+def test_messages_skip_blender_output(capsys):
+    farm_protocol.send_message('RESULT', json.dumps({'exit_code': 0}))
+    assert capsys.readouterr().out == 'LIGHTFIELD RESULT {"exit_code": 0}\n'
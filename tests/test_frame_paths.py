@@ -0,0 +1,17 @@
+import os
+
+from lightfield_addon import frame_paths
+
+
+def test_partial_filepath(tmp_path):
+    directory = str(tmp_path / "f00001" / ".view_animation_x")
+    path = frame_paths.partial_filepath(directory, "view_0003f", ".png")
+    assert path == os.path.join(directory, "view_0003f_#####.part.png")
+    # Only the file name holds the placeholder.
+    assert "#" not in os.path.dirname(path)
+
+
+def test_image_filepath(tmp_path):
+    image_directory = str(tmp_path / "f00012" / "png")
+    assert frame_paths.image_filepath(image_directory, "view_0003f", ".png") == \
+        os.path.join(str(tmp_path), "f00012", "png", "view_0003f.png")
@@ -0,0 +1,115 @@
+import struct
+import types
+import zlib
+
+import numpy as np
+import pytest
+
+from lightfield_addon import encoder, image_io
+
+
+def write_tga(path, pixels, top_down=False):
+    """Write an uncompressed TGA the way Blender's 'TARGA_RAW' does, blue before red."""
+    height, width, channels = pixels.shape
+    data = pixels.copy()
+    if channels >= 3:
+        data[..., [0, 2]] = data[..., [2, 0]]
+    if not top_down:
+        data = data[::-1]
+    header = struct.pack('<BBBHHBHHHHBB', 0, 0, 2 if channels >= 3 else 3, 0, 0, 0, 0, 0,
+                         width, height, 8 * channels, 0x20 if top_down else 0)
+    with open(path, mode='wb') as f:
+        f.write(header + data.tobytes())
+
+
+def read_png(path):
+    """Decode an 8-bit PNG written by PngWriter."""
+    with open(path, mode='rb') as f:
+        data = f.read()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    pos = 8
+    chunks = {}
+    while pos < len(data):
+        length, = struct.unpack_from('>I', data, pos)
+        kind = data[pos + 4:pos + 8]
+        body = data[pos + 8:pos + 8 + length]
+        crc, = struct.unpack_from('>I', data, pos + 8 + length)
+        assert crc == zlib.crc32(body, zlib.crc32(kind)) & 0xffffffff
+        chunks[kind] = chunks.get(kind, b'') + body
+        pos += 12 + length
+    assert b'IEND' in chunks
+    width, height, depth, color_type = struct.unpack('>IIBB', chunks[b'IHDR'][:10])
+    channels = {v: k for k, v in image_io.PNG_COLOR_TYPES.items()}[color_type]
+    raw = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8).reshape(height, 1 + width * channels)
+    assert (raw[:, 0] == 1).all()
+    # Undo the 'Sub' filter.
+    rows = raw[:, 1:].reshape(height, width, channels)
+    return np.cumsum(rows, axis=1, dtype=np.uint8)
+
+
+@pytest.mark.parametrize('channels', [1, 3, 4])
+@pytest.mark.parametrize('top_down', [False, True])
+def test_tga_to_png(tmp_path, channels, top_down):
+    pixels = np.random.default_rng(channels).integers(0, 256, (5, 7, channels), dtype=np.uint8)
+    write_tga(str(tmp_path / "view.tga"), pixels, top_down)
+
+    reader = image_io.TgaReader(str(tmp_path / "view.tga"))
+    writer = image_io.PngWriter(str(tmp_path / "view.png"), reader.width, reader.height, reader.channels, 9)
+    for y in range(reader.height):
+        writer.write_row(reader.read_row(y))
+    writer.close()
+    reader.close()
+
+    np.testing.assert_array_equal(read_png(str(tmp_path / "view.png")), pixels)
+
+
+@pytest.mark.parametrize('compression', sorted(encoder.EXR_CODECS.values()))
+def test_exr_round_trip(tmp_path, compression):
+    channels = [('A', image_io.EXR_HALF), ('B', image_io.EXR_HALF), ('G', image_io.EXR_FLOAT),
+                ('R', image_io.EXR_FLOAT)]
+    height, width = 37, 11
+    # Smooth values compress, noise is stored as is; both are in the image.
+    image = np.random.default_rng(compression).random((height, width, len(channels))).astype(np.float32)
+    image[:20] = np.linspace(0, 1, width, dtype=np.float32)[None, :, None]
+    image[..., :2] = image[..., :2].astype(np.float16)
+
+    path = str(tmp_path / "view.exr")
+    writer = image_io.ExrWriter(path, width, height, channels, compression)
+    for y in range(height):
+        writer.write_row(b''.join(image[y, :, c].astype(image_io.EXR_TYPE_DTYPES[t]).tobytes()
+                                  for c, (_, t) in enumerate(channels)))
+    writer.close()
+
+    reader = image_io.ExrReader(path)
+    assert reader.compression == compression
+    assert reader.channels == channels
+    reader.close()
+    names, read = image_io.read_exr(path)
+    assert names == ['A', 'B', 'G', 'R']
+    np.testing.assert_array_equal(read, image)
+
+
+def test_encode_image_png(tmp_path):
+    pixels = np.random.default_rng(0).integers(0, 256, (4, 3, 3), dtype=np.uint8)
+    source = str(tmp_path / "view_0000f.png.raw.tga")
+    write_tga(source, pixels)
+    encoder.encode_image(source, str(tmp_path / "view_0000f.png"), 6, None)
+    assert not (tmp_path / "view_0000f.png.raw.tga").exists()
+    np.testing.assert_array_equal(read_png(str(tmp_path / "view_0000f.png")), pixels)
+
+
+@pytest.mark.parametrize('file_format, color_depth, exr_codec, expected', [
+    ('PNG', '8', 'ZIP', True),
+    ('PNG', '16', 'ZIP', False),
+    ('JPEG', '8', 'ZIP', False),
+    ('BMP', '8', 'ZIP', False),
+    ('TIFF', '8', 'ZIP', False),
+    ('OPEN_EXR', '16', 'ZIP', True),
+    ('OPEN_EXR', '32', 'NONE', True),
+    ('OPEN_EXR', '16', 'PIZ', False),
+    ('OPEN_EXR', '16', 'DWAA', False),
+    ('OPEN_EXR_MULTILAYER', '32', 'ZIP', False),
+])
+def test_can_encode(file_format, color_depth, exr_codec, expected):
+    settings = types.SimpleNamespace(file_format=file_format, color_depth=color_depth, exr_codec=exr_codec)
+    assert encoder.can_encode(settings) == expected
@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pytest
+
+from lightfield_addon import job_manifest, pose_array
+
+
+def write_job(tmp_path, job):
+    path = str(tmp_path / "job.json")
+    with open(path, mode='w') as f:
+        f.write(job if isinstance(job, str) else json.dumps(job))
+    return path
+
+
+def test_load_job(tmp_path):
+    job = job_manifest.load_job(write_job(tmp_path, {'lightfield': "LF", 'resolution': [640, "480"], 'samples': 16}))
+    assert job['resolution'] == [640, 480]
+    assert job['samples'] == 16
+
+
+@pytest.mark.parametrize('job', [
+    "{not json",
+    [],
+    {'frames': [1]},
+    {'lightfield': "LF", 'unknown': 1},
+    {'lightfield': "LF", 'distributed': True, 'views': [0]},
+    {'lightfield': "LF", 'resolution': 1920},
+    {'lightfield': "LF", 'resolution': "1920x1080"},
+    {'lightfield': "LF", 'resolution': [1920]},
+    {'lightfield': "LF", 'resolution': ["a", 2]},
+    {'lightfield': "LF", 'resolution': [1920, None]},
+    {'lightfield': "LF", 'resolution': [0, 1080]},
+    {'lightfield': "LF", 'samples': "many"},
+    {'lightfield': "LF", 'samples': [16]},
+    {'lightfield': "LF", 'samples': True},
+    {'lightfield': "LF", 'samples': 0},
+])
+def test_invalid_job(tmp_path, job):
+    with pytest.raises(job_manifest.JobError):
+        job_manifest.load_job(write_job(tmp_path, job))
+
+
+def test_missing_job(tmp_path):
+    with pytest.raises(job_manifest.JobError):
+        job_manifest.load_job(str(tmp_path / "missing.json"))
+
+
+def test_select_range():
+    frames = [1, 2, 3, 4, 5, 6]
+    assert job_manifest.select_range(None, frames, 'frames') == frames
+    assert job_manifest.select_range([5, 2], frames, 'frames') == [5, 2]
+    assert job_manifest.select_range({'start': 2, 'stop': 5}, frames, 'frames') == [2, 3, 4]
+    assert job_manifest.select_range({'start': 2, 'end': 5}, frames, 'frames') == [2, 3, 4, 5]
+    assert job_manifest.select_range({'step': 2}, frames, 'frames') == [1, 3, 5]
+    assert job_manifest.select_range({}, [], 'frames') == []
+
+
+@pytest.mark.parametrize('spec', [[7], 3, "1-3", {'step': 0}, {'start': "a"}, {'end': None}])
+def test_invalid_range(spec):
+    with pytest.raises(job_manifest.JobError):
+        job_manifest.select_range(spec, [1, 2, 3], 'frames')
+
+
+def test_select_views():
+    poses = pose_array.PoseArray(np.zeros((4, 3)), np.zeros((4, 3)), np.arange(4))
+    assert job_manifest.select_views(None, poses) == [0, 1, 2, 3]
+    assert job_manifest.select_views(["view_0002f", 0], poses) == [2, 0]
+    assert job_manifest.select_views({'start': 1, 'end': 2}, poses) == [1, 2]
+    with pytest.raises(job_manifest.JobError):
+        job_manifest.select_views(["view_0009f"], poses)
+    with pytest.raises(job_manifest.JobError):
+        job_manifest.select_views(["camera"], poses)
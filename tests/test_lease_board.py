@@ -0,0 +1,96 @@
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from lightfield_addon import lease_board
+
+NUM_VIEWS = 50
+BATCH_SIZE = 4
+DURATION = 1.0
+
+
+def render_node(directory, node, output_path):
+    """Render all batches of a frame the way leases.render_distributed() does, without rendering."""
+    board = lease_board.LeaseBoard(directory, NUM_VIEWS, BATCH_SIZE, DURATION, node)
+    claimed_views = []
+    complete = False
+    while not board.is_finished():
+        claimed = board.claim_next()
+        while claimed is not None:
+            lease, batch = claimed
+            renewer = lease_board.LeaseRenewer(lease, DURATION / 3)
+            renewer.start()
+            try:
+                claimed_views.extend(range(*batch))
+                time.sleep(0.01)
+                board.mark_done(board.batch_name(batch), [{'index': i} for i in range(*batch)])
+            finally:
+                renewer.stop()
+                lease.release()
+            claimed = board.claim_next()
+        if board.all_done() and not board.is_finished():
+            lease = board.claim(lease_board.CONFIG_LEASE)
+            if lease is not None:
+                records = [record for batch in board.batches for record in board.read_done(board.batch_name(batch))]
+                complete = [record['index'] for record in records] == list(range(NUM_VIEWS))
+                board.mark_done(lease_board.CONFIG_LEASE, {'node': node})
+                lease.release()
+                board.remove()
+        if not board.is_finished():
+            time.sleep(0.05)
+    with open(output_path, mode='w') as f:
+        json.dump({'views': claimed_views, 'complete': complete}, f)
+
+
+def test_nodes_share_a_board(tmp_path):
+    try:
+        context = multiprocessing.get_context('fork')
+    except ValueError:
+        pytest.skip("Needs fork")
+    directory = str(tmp_path / "leases")
+
+    # A node that crashed right after claiming the first batch.
+    crashed = lease_board.LeaseBoard(directory, NUM_VIEWS, BATCH_SIZE, DURATION, "crashed")
+    lease, batch = crashed.claim_next()
+    assert batch == (0, BATCH_SIZE)
+
+    outputs = [str(tmp_path / "node{}.json".format(n)) for n in range(4)]
+    processes = [context.Process(target=render_node, args=(directory, "node{}".format(n), output))
+                 for n, output in enumerate(outputs)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    results = []
+    for output in outputs:
+        with open(output, mode='r') as f:
+            results.append(json.load(f))
+    views = sorted(view for result in results for view in result['views'])
+    # Every view was claimed exactly once, the expired lease of the first batch included.
+    assert views == list(range(NUM_VIEWS))
+    assert sum(result['complete'] for result in results) == 1
+    assert not os.path.exists(directory)
+
+
+def test_board_of_finished_run(tmp_path):
+    directory = str(tmp_path / "leases")
+    board = lease_board.LeaseBoard(directory, 2, 2, DURATION, "a")
+    lease, batch = board.claim_next()
+    board.mark_done(board.batch_name(batch), [])
+    lease.release()
+    board.mark_done(lease_board.CONFIG_LEASE, {'node': "a"})
+    board.remove()
+    assert board.is_finished()
+
+    # The next render of the frame starts a new run, the old board stays finished.
+    new_board = lease_board.LeaseBoard(directory, 2, 2, DURATION, "b")
+    assert new_board.run != board.run
+    assert not new_board.is_finished()
+    assert board.is_finished()
+    assert board.claim_next() is None
+    assert new_board.claim_next() is not None
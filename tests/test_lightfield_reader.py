@@ -0,0 +1,91 @@
+import csv
+import os
+
+import pytest
+
+from lightfield_addon import config_writer, lightfield_reader
+
+
+def write_cfg(path, names):
+    rows = [
+        ["type", "lens_unit", "lens"],
+        ["PERSP", "MILLIMETERS", "50.0"],
+        ["PLANE"],
+        ["64", "48"],
+        ["sensor_width", "sensor_height"],
+        ["36.0", "27.0"],
+        ["projection_matrix"],
+        ["2.7", "0", "0", "0"],
+        ["0", "3.6", "0", "0"],
+        ["0", "0", "-1.0", "-0.2"],
+        ["0", "0", "-1", "0"],
+        ["name", "x", "y", "z", "rot_x", "rot_y", "rot_z"],
+    ]
+    rows.extend([name, i, 0, 0, 1.5707963, 0, 0] for i, name in enumerate(names))
+    with open(path, mode='w', newline='') as cfg_file:
+        csv.writer(cfg_file).writerows(rows)
+
+
+def test_cfg_has_no_grid(tmp_path):
+    names = ["view_{:04d}f".format(i) for i in range(4)]
+    write_cfg(str(tmp_path / "lightfield.cfg"), names)
+
+    lf = lightfield_reader.LightfieldDataset(str(tmp_path))
+    assert len(lf) == 4
+    assert lf.get_index("view_0002f") == 2
+    assert lf.get_index(-1) == 3
+    with pytest.raises(ValueError, match="no grid"):
+        lf.get_index((1, 0))
+
+
+def make_header():
+    return {
+        'camera': {'type': 'PERSP', 'projection_matrix': [[2.7, 0, 0, 0], [0, 3.6, 0, 0],
+                                                           [0, 0, -1.0, -0.2], [0, 0, -1, 0]]},
+        'lf_type': 'PLANE',
+        'resolution': [64, 48],
+        'sensor_size': [36.0, 27.0],
+        'grid': [{'side': '', 'shape': [2, 1], 'offset': 0}],
+    }
+
+
+def write_config(directory, names, close=True):
+    writer = config_writer.ConfigWriter(str(directory / "lightfield.json"), str(directory / "lightfield.cfg"))
+    writer.begin(make_header(), [["PLANE"], ["name", "x", "y", "z", "rot_x", "rot_y", "rot_z"]])
+    for i, name in enumerate(names):
+        writer.append(name, [i, 0, 0], [0, 0, 0], [[1, 0, 0, i], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+    if close:
+        writer.close()
+    else:
+        writer.flush()
+    return writer
+
+
+def test_new_config_replaces_manifest(tmp_path):
+    write_config(tmp_path, ["view_0000f", "view_0001f"])
+    assert (tmp_path / "lightfield.npz").exists()
+    assert lightfield_reader.is_manifest_current(str(tmp_path))
+
+    # An unfinished render of the frame is read from the json and its sidecar.
+    writer = write_config(tmp_path, ["view_0001f"], close=False)
+    assert not (tmp_path / "lightfield.npz").exists()
+    lf = lightfield_reader.LightfieldDataset(str(tmp_path))
+    assert list(lf.names) == ["view_0001f"]
+
+    writer.close()
+    lf = lightfield_reader.LightfieldDataset(str(tmp_path))
+    assert list(lf.names) == ["view_0001f"]
+
+
+def test_stale_manifest_is_skipped(tmp_path):
+    write_config(tmp_path, ["view_0000f", "view_0001f"])
+    stale = (tmp_path / "lightfield.npz").read_bytes()
+    write_config(tmp_path, ["view_0001f", "view_0000f"])
+
+    # A manifest left behind by an earlier render, older than the json.
+    (tmp_path / "lightfield.npz").write_bytes(stale)
+    json_time = os.path.getmtime(str(tmp_path / "lightfield.json"))
+    os.utime(str(tmp_path / "lightfield.npz"), (json_time - 10, json_time - 10))
+    assert not lightfield_reader.is_manifest_current(str(tmp_path))
+    lf = lightfield_reader.LightfieldDataset(str(tmp_path))
+    assert list(lf.names) == ["view_0001f", "view_0000f"]
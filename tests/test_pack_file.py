@@ -0,0 +1,50 @@
+import struct
+import zlib
+
+import numpy as np
+
+from lightfield_addon import pack_file
+from lightfield_addon.pose_array import PoseArray, grid_indices
+
+
+def png_bytes(width, height):
+    """Smallest valid PNG header with the given size, enough for the pack index."""
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    chunk = struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr))
+    return b'\x89PNG\r\n\x1a\n' + chunk
+
+
+def make_poses(num_x, num_y):
+    x, y = grid_indices(num_x, num_y)
+    positions = np.zeros((len(x), 3))
+    return PoseArray(positions, np.zeros((len(x), 3)), np.arange(len(x)))
+
+
+def test_writer_from_pose_array(tmp_path):
+    poses = make_poses(3, 2)
+    path = str(tmp_path / "lightfield.pack")
+    writer = pack_file.get_writer(path, lambda: poses.name_array().tolist())
+    writer.add(poses.name(1), png_bytes(4, 3), [0.0, 1.0, 2.0], [0.0, 0.0, 0.0])
+    pack_file.close_writers()
+
+    # Continuing the pack reads the entries back against the names of the poses.
+    writer = pack_file.get_writer(path, lambda: poses.name_array().tolist())
+    assert writer.contains(poses.name(1))
+    assert not writer.contains(poses.name(0))
+    pack_file.close_writers()
+
+    with pack_file.PackReader(path) as pack:
+        entry = pack.entry(pack.index_of(poses.name(1)))
+        assert (entry.width, entry.height) == (4, 3)
+
+
+def test_writer_from_generator(tmp_path):
+    poses = make_poses(2, 2)
+    path = str(tmp_path / "lightfield.pack")
+    writer = pack_file.PackWriter(path, poses.names())
+    writer.add(poses.name(0), png_bytes(2, 2), [0.0, 0.0, 0.0], [0.0, 0.0, 0.0])
+    writer.close()
+
+    writer = pack_file.PackWriter(path, poses.names())
+    assert writer.contains(poses.name(0))
+    writer.close()
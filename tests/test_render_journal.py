@@ -0,0 +1,16 @@
+from lightfield_addon import render_journal
+
+
+def test_garbled_lines_are_skipped(tmp_path):
+    for name in ("view_0000f", "view_0001f"):
+        (tmp_path / (name + ".png")).write_bytes(b"image")
+    journal = render_journal.RenderJournal(str(tmp_path / "lightfield.journal"), str(tmp_path))
+    journal.record("view_0000f", str(tmp_path / "view_0000f.png"), 1.0)
+    # Two nodes appending at once can interleave their records.
+    with open(journal.path, mode='a') as journal_file:
+        journal_file.write('{"name": "view_0002f", "fi{"name": "x"}\n')
+        journal_file.write('7\n')
+    journal.record("view_0001f", str(tmp_path / "view_0001f.png"), 1.0)
+
+    journal = render_journal.RenderJournal(journal.path, str(tmp_path))
+    assert sorted(journal.completed) == ["view_0000f", "view_0001f"]
@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+
+import bpy
+from . import image_io
+
+
+def tile_bounds(size, count):
+    """
+    Split a number of pixels into nearly equal parts.
+
+    :return: count + 1 pixel boundaries.
+    """
+    return [size * i // count for i in range(count + 1)]
+
+
+def tile_borders(x_start, x_stop, y_start, y_stop, width, height):
+    """
+    Render border of a tile, in the order of CameraPosition.borders().
+    Blender truncates border * resolution to whole pixels, so the borders are put
+    halfway a pixel to select exactly the given pixels.
+
+    :param x_start: First pixel column.
+    :param x_stop: Column after the last one.
+    :param y_start: First pixel row, counted from the top.
+    :param y_stop: Row after the last one.
+    :return: [min_x, max_x, min_y, max_y]
+    """
+    # Render borders count rows from the bottom.
+    return [(x_start + 0.5) / width,
+            min(1.0, (x_stop + 0.5) / width),
+            (height - y_stop + 0.5) / height,
+            min(1.0, (height - y_start + 0.5) / height)]
+
+
+class TiledRender:
+    """
+    Render a view in tiles, using render borders with crop, and stitch the tiles into the final image.
+
+    The tiles of one strip are rendered to temporary files that can be read a row at a time:
+    uncompressed TGA when the output is PNG, uncompressed float EXR when the output is EXR.
+    The strip is then appended row by row to the final image, so at most the tiles of a
+    single strip are ever in memory or on disk.
+    """
+
+    def __init__(self, tiles_x, tiles_y):
+        self.tiles_x = tiles_x
+        self.tiles_y = tiles_y
+
+    def render(self, filepath):
+        """
+        Render the scene camera to an image file.
+
+        :param filepath: Path of the image.
+        :return: Nothing.
+        """
+        rb = bpy.context.scene.render
+        settings = rb.image_settings
+        width = rb.resolution_x * rb.resolution_percentage // 100
+        height = rb.resolution_y * rb.resolution_percentage // 100
+        is_exr = settings.file_format == 'OPEN_EXR'
+        if not is_exr and settings.color_depth != '8':
+            raise ValueError("Tiled rendering only supports 8-bit PNG images")
+
+        # Store now to reset later.
+        old_borders = [rb.border_min_x, rb.border_max_x, rb.border_min_y, rb.border_max_y]
+        old_use_border = rb.use_border
+        old_crop_to_border = rb.use_crop_to_border
+        old_filepath = rb.filepath
+        old_file_format = settings.file_format
+        old_color_depth = settings.color_depth
+        old_exr_codec = settings.exr_codec
+        compress_level = image_io.png_compress_level(settings.compression)
+
+        directory = tempfile.mkdtemp(prefix="lightfield_tiles_", dir=os.path.dirname(filepath))
+        rb.use_border = True
+        rb.use_crop_to_border = True
+        if is_exr:
+            settings.color_depth = '32'
+            settings.exr_codec = 'NONE'
+        else:
+            settings.file_format = 'TARGA_RAW'
+
+        writer = None
+        try:
+            xs = tile_bounds(width, self.tiles_x)
+            ys = tile_bounds(height, self.tiles_y)
+            for j in range(self.tiles_y):
+                paths = []
+                for i in range(self.tiles_x):
+                    print("Rendering tile %d/%d..." % (j * self.tiles_x + i + 1, self.tiles_x * self.tiles_y))
+                    rb.border_min_x, rb.border_max_x, rb.border_min_y, rb.border_max_y = \
+                        tile_borders(xs[i], xs[i + 1], ys[j], ys[j + 1], width, height)
+                    rb.filepath = os.path.join(directory, "tile_{:04d}".format(i) + (".exr" if is_exr else ".tga"))
+                    bpy.ops.render.render(write_still=True)
+                    paths.append(rb.filepath)
+
+                readers = [(image_io.ExrReader if is_exr else image_io.TgaReader)(path) for path in paths]
+                try:
+                    if writer is None:
+                        writer = self.open_writer(filepath, width, height, readers[0], old_color_depth,
+                                                  compress_level)
+                    for y in range(ys[j + 1] - ys[j]):
+                        writer.write_row(self.stitch_row(readers, y, writer))
+                finally:
+                    for reader in readers:
+                        reader.close()
+                for path in paths:
+                    os.remove(path)
+            writer.close()
+        finally:
+            if writer is not None and not writer.file.closed:
+                writer.file.close()
+            shutil.rmtree(directory, ignore_errors=True)
+
+            rb.border_min_x, rb.border_max_x, rb.border_min_y, rb.border_max_y = old_borders
+            rb.use_border = old_use_border
+            rb.use_crop_to_border = old_crop_to_border
+            rb.filepath = old_filepath
+            settings.file_format = old_file_format
+            settings.color_depth = old_color_depth
+            settings.exr_codec = old_exr_codec
+
+    @staticmethod
+    def open_writer(filepath, width, height, reader, color_depth, compress_level):
+        """
+        Writer for the final image, with the channels of the rendered tiles.
+
+        :return: PngWriter or ExrWriter.
+        """
+        if isinstance(reader, image_io.TgaReader):
+            return image_io.PngWriter(filepath, width, height, reader.channels, compress_level)
+        # Tiles are rendered as float, colors go back to half float when that was requested.
+        # Blender always stores depth as float.
+        channels = [(name, image_io.EXR_HALF if color_depth == '16' and name != 'Z' else pixel_type)
+                    for name, pixel_type in reader.channels]
+        return image_io.ExrWriter(filepath, width, height, channels)
+
+    @staticmethod
+    def stitch_row(readers, y, writer):
+        """
+        Join the rows of the tiles of a strip into a row of the final image.
+
+        :return: Row bytes for the writer.
+        """
+        if isinstance(writer, image_io.PngWriter):
+            return b''.join(reader.read_row(y) for reader in readers)
+        # EXR rows hold one channel after the other.
+        rows = [image_io.convert_exr_row(reader.read_row(y), reader.width, reader.channels, writer.channels)
+                for reader in readers]
+        parts = []
+        offsets = [0] * len(readers)
+        for _, pixel_type in writer.channels:
+            for k, reader in enumerate(readers):
+                size = reader.width * image_io.EXR_TYPE_SIZES[pixel_type]
+                parts.append(rows[k][offsets[k]:offsets[k] + size])
+                offsets[k] += size
+        return b''.join(parts)
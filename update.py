@@ -1,39 +1,138 @@
+import functools
+
 import bpy
 
+# Derived state of a lightfield, recomputed when the properties it depends on change.
+GRID = 'GRID'                        # mesh showing the camera positions and rotations
+PREVIEW = 'PREVIEW'                  # pose of the camera in the viewport
+CAMERA = 'CAMERA'                    # lens of the camera, for cube cameras
+SPACE = 'SPACE'                      # scale of the visuals of the space the rig occupies
+RENDER_SETTINGS = 'RENDER_SETTINGS'  # resolution of the scene while the lightfield camera is active
+
+# What each property of LightfieldPropertyGroup invalidates. Configs are built from the
+# current properties at every render, so they never need to be recomputed here.
+DEPENDENCIES = {
+    'num_cams_x': {GRID, PREVIEW},
+    'num_cams_y': {GRID, PREVIEW},
+    'num_cams_z': {GRID, PREVIEW},
+    'num_cams_radius': {GRID, PREVIEW},
+    'num_cams_subdiv': {GRID, PREVIEW},
+    'face_inside': {GRID, PREVIEW},
+    'size_x': {SPACE, GRID, PREVIEW},
+    'size_y': {SPACE, GRID, PREVIEW},
+    'size_z': {SPACE, GRID, PREVIEW},
+    'cube_camera': {CAMERA},
+    'res_x': {RENDER_SETTINGS},
+    'res_y': {RENDER_SETTINGS},
+    'camera_side': {PREVIEW},
+    'camera_facing': {PREVIEW},
+    'camera_preview_index': {PREVIEW},
+}
+
+# Seconds a setting has to stay unchanged before the grid of the rig is rebuilt.
+REBUILD_DELAY = 0.25
+
+# Timers of rebuilds that have not run yet, keyed by the name of the lightfield empty.
+_pending_rebuilds = {}
+
 
 def update_print_test():
     print('test')
 
 
-def update_num_cameras(self, context):
-    bpy.ops.lightfield.update('EXEC_DEFAULT')
+def on_change(name):
+    """
+    Update callback of a lightfield property, recomputing only what depends on it.
 
+    :param name: Name of the property in DEPENDENCIES.
+    :return: Callback for the update argument of the property.
+    """
+    artefacts = DEPENDENCIES[name]
+    return lambda self, context: invalidate(self, context, artefacts)
 
-def update_cube_camera(self, context):
-    bpy.ops.lightfield.update_camera('EXEC_DEFAULT')
 
+def invalidate(lf, context, artefacts):
+    """
+    Recompute the given derived state of a lightfield.
+    The grid is updated once the settings stop changing, together with the preview pose
+    that depends on the same settings.
 
-def notify_active_object():
-    ob = bpy.context.active_object
-    if (not ob) or (not ob.type == 'EMPTY'):
+    :param lf: LightfieldPropertyGroup that changed.
+    :param artefacts: Set of GRID, PREVIEW, CAMERA, SPACE and RENDER_SETTINGS.
+    :return: Nothing.
+    """
+    if not lf.obj_empty:
+        # Still being constructed.
         return
+    if SPACE in artefacts:
+        lf.apply_size()
+    if GRID in artefacts:
+        schedule_rebuild(lf.obj_empty.name)
+    elif PREVIEW in artefacts and lf.obj_empty.name not in _pending_rebuilds:
+        bpy.ops.lightfield.update_preview('EXEC_DEFAULT', lightfield=lf.obj_empty.name)
+    if CAMERA in artefacts:
+        bpy.ops.lightfield.update_camera('EXEC_DEFAULT', lightfield=lf.obj_empty.name)
+    if RENDER_SETTINGS in artefacts and lf.obj_camera and context.scene.camera == lf.obj_camera:
+        context.scene.render.resolution_x = lf.res_x
+        context.scene.render.resolution_y = lf.res_y
+
+
+def schedule_rebuild(name):
+    """
+    Rebuild the grid of a lightfield once its settings stop changing.
+    A rebuild that is still waiting is cancelled, so dragging a slider only rebuilds once.
+
+    :param name: Name of the lightfield empty.
+    :return: Nothing.
+    """
+    cancel_rebuild(name)
+    timer = functools.partial(run_rebuild, name)
+    _pending_rebuilds[name] = timer
+    bpy.app.timers.register(timer, first_interval=REBUILD_DELAY)
+
+
+def cancel_rebuild(name):
+    """
+    Cancel the waiting rebuild of a lightfield, if any.
+
+    :return: Nothing.
+    """
+    timer = _pending_rebuilds.pop(name, None)
+    if timer is not None and bpy.app.timers.is_registered(timer):
+        bpy.app.timers.unregister(timer)
+
+
+def cancel_rebuilds():
+    """
+    Cancel all waiting rebuilds.
+
+    :return: Nothing.
+    """
+    for name in list(_pending_rebuilds):
+        cancel_rebuild(name)
+
+
+def run_rebuild(name):
+    """
+    Timer callback rebuilding the grid of a lightfield.
+
+    :return: None, so the timer does not repeat.
+    """
+    _pending_rebuilds.pop(name, None)
+    bpy.ops.lightfield.update('EXEC_DEFAULT', lightfield=name)
+    bpy.ops.lightfield.update_preview('EXEC_DEFAULT', lightfield=name)
+    return None
+
+
+def notify_active_object():
+    from . import utils
     scn = bpy.context.scene
-    lf = scn.lightfield
-    for lightfield in lf:
-        if lightfield.obj_empty == ob:
-            scn.lightfield_index = lightfield.index
-            break
+    lightfield = utils.find_lightfield(scn, bpy.context.active_object)
+    if lightfield is not None:
+        scn.lightfield_index = lightfield.index
 
 def update_lightfield_index(self, context):
     scn = bpy.context.scene
     if scn.lightfield_autoselect:
         print("Autoselect")
         bpy.ops.lightfield.select('EXEC_DEFAULT')
-
-
-def update_preview(self, context):
-    bpy.ops.lightfield.update_preview('EXEC_DEFAULT')
-
-
-def update_size():
-    bpy.ops.lightfield.update_size('EXEC_DEFAULT')
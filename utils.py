@@ -7,29 +7,75 @@ from .lightfield_sphere import LightfieldSphere
 
 # from .lightfield_sphere import LightfieldSphere
 
+# Number of lightfields and position of every lightfield in scene.lightfield, keyed by the
+# scene and then by the empty of the lightfield (both by pointer). Rebuilt when lightfields are added, removed
+# or moved, and after loading a file or undo, which reallocate the objects.
+_lightfield_indices = {}
+
+
+def rebuild_lightfield_indices(scene=None):
+    """
+    Rebuild the lookup from lightfield empties to lightfields.
+
+    :param scene: Scene to rebuild, all scenes if None.
+    :return: Nothing.
+    """
+    if scene is None:
+        _lightfield_indices.clear()
+    for scn in (bpy.data.scenes if scene is None else [scene]):
+        _lightfield_indices[scn.as_pointer()] = (len(scn.lightfield),
+                                                 {lightfield.obj_empty.as_pointer(): i
+                                                  for i, lightfield in enumerate(scn.lightfield)
+                                                  if lightfield.obj_empty})
+
+
+def find_lightfield(scene, obj):
+    """
+    Get the entry of scene.lightfield whose empty is the given object, in constant time.
+
+    :return: LightfieldPropertyGroup/None
+    """
+    if obj is None or obj.type != 'EMPTY':
+        return None
+    scene_key = scene.as_pointer()
+    # Lightfields added or removed by a script.
+    if _lightfield_indices.get(scene_key, (-1,))[0] != len(scene.lightfield):
+        rebuild_lightfield_indices(scene)
+    i = _lightfield_indices[scene_key][1].get(obj.as_pointer())
+    if i is None:
+        return None
+    if i < len(scene.lightfield) and scene.lightfield[i].obj_empty == obj:
+        return scene.lightfield[i]
+    # Out of date, e.g. the lightfields were changed by a script.
+    rebuild_lightfield_indices(scene)
+    i = _lightfield_indices[scene_key][1].get(obj.as_pointer())
+    return scene.lightfield[i] if i is not None else None
+
+
 def get_active_lightfield(context):
     """
     Get the active lightfield object, or None if not active
     :return: lightfield/None
     """
-    obj = bpy.context.active_object
-    if not obj:
+    lightfield = find_lightfield(bpy.context.scene, bpy.context.active_object)
+    if lightfield is None:
         return None
+    try:
+        return (get_lightfield_class(lightfield.lf_type))(lightfield)
+    except LookupError:
+        return None
+
 
-    for lightfield in bpy.context.scene.lightfield:
-        if lightfield.obj_empty == obj:
-            if lightfield.lf_type == 'PLANE':
-                lf = (LightfieldPlane)(lightfield)
-            elif lightfield.lf_type == 'CUBOID':
-                lf = (LightfieldCuboid)(lightfield)
-            elif lightfield.lf_type == 'CYLINDER':
-                lf = (LightfieldCylinder)(lightfield)
-            elif lightfield.lf_type == 'SPHERE':
-                lf = (LightfieldSphere)(lightfield)
-            else:
-                return None
-            return lf
-    return None
+def get_lightfield_by_name(context, name):
+    """
+    Get the lightfield whose empty has the given name.
+
+    :return: lightfield/None
+    """
+    lightfield = find_lightfield(context.scene, bpy.data.objects.get(name))
+    if lightfield is None:
+        return None
+    return (get_lightfield_class(lightfield.lf_type))(lightfield)
 
 
 def get_lightfield_class(enum_name):